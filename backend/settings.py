@@ -3,6 +3,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 load_dotenv()
 
@@ -11,6 +12,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Environment detection
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
 
+# 'wsgi' (gunicorn sync workers) or 'asgi' (uvicorn workers); see gunicorn.conf.py
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+
 # Security
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-for-dev')
 
@@ -26,7 +30,8 @@ if ENVIRONMENT == 'production':
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600
+            # Under ASGI every request gets its own connection, so persistent ones are never reused
+            conn_max_age=0 if SERVER_MODE == 'asgi' else 600
         )
     }
     STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -47,6 +52,41 @@ else:
         }
     }
 
+# psycopg 3 connection pool (Postgres only): every worker process shares
+# DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE open connections between
+# its threads or ASGI requests instead of holding one per thread or request.
+# Django requires CONN_MAX_AGE = 0 when a pool is used.
+DATABASE_POOL = os.environ.get('DATABASE_POOL', 'false').lower() == 'true'
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 1)),
+    'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+    'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+}
+
+# Read replicas, as comma-separated database URLs; they become replica1,
+# replica2, ... and serve the read-only endpoints through
+# todo.routers.ReplicaRouter. To try the routing locally, point one at the
+# development database itself (sqlite:///db.sqlite3). Users who just wrote are
+# kept on the primary by a flag in the default cache, which every worker only
+# sees when REDIS_URL shares that cache, so production refuses to start without it.
+DATABASE_REPLICA_URLS = list(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')))
+if DATABASE_REPLICA_URLS and ENVIRONMENT == 'production' and not os.environ.get('REDIS_URL'):
+    raise ImproperlyConfigured("DATABASE_REPLICA_URLS needs REDIS_URL so read-your-writes holds across workers")
+for number, url in enumerate(DATABASE_REPLICA_URLS, 1):
+    DATABASES[f'replica{number}'] = dj_database_url.parse(
+        url.strip(), conn_max_age=DATABASES['default'].get('CONN_MAX_AGE', 0)
+    )
+    # Tests and benchmark_api read the primary's test database through it
+    DATABASES[f'replica{number}']['TEST'] = {'MIRROR': 'default'}
+
+if DATABASE_POOL:
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.postgresql':
+            database.setdefault('OPTIONS', {})['pool'] = DATABASE_POOL_OPTIONS
+            database['CONN_MAX_AGE'] = 0
+
+DATABASE_ROUTERS = ['todo.routers.ReplicaRouter']
+
 # Application definition
 INSTALLED_APPS = [
     'jazzmin',
@@ -64,8 +104,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'todo.middleware.AdmissionControlMiddleware',
+    'todo.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'todo.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,6 +117,8 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'backend.urls'
+# backend.asgi serves the read-heavy endpoints with async views from this URLconf
+ASGI_URLCONF = 'backend.asgi_urls'
 
 TEMPLATES = [
     {
@@ -100,6 +144,11 @@ CSRF_COOKIE_SECURE = ENVIRONMENT == 'production'
 SESSION_COOKIE_SAMESITE = 'None'
 CSRF_COOKIE_SAMESITE = 'None'
 
+# ModelBackend that also loads the profile, which the token response includes
+AUTHENTICATION_BACKENDS = [
+    'todo.backends.ProfileModelBackend',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -114,6 +163,33 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
+# Caches: the default cache holds auth users and per-user response versions,
+# the responses cache holds rendered API bodies. LocMemCache evicts least
+# recently used entries past MAX_ENTRIES; REDIS_URL shares both caches
+# across workers (configure Redis with an LRU maxmemory-policy).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': alias,
+        }
+        for alias in ('default', 'responses')
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'todo-default',
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'todo-responses',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+CACHES['responses']['TIMEOUT'] = 300
+
 # Static files
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -123,13 +199,118 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework and JWT settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'todo.authentication.CookieJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
+    ],
+    # orjson-backed when installed, DRF's own JSON classes otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'todo.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'todo.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets per user (per client address when anonymous); the token
+    # and register views use the login and register scopes instead
+    'DEFAULT_THROTTLE_CLASSES': [
+        'todo.throttling.ReadWriteRateThrottle',
+    ],
+    # Proxies in front of the app that append to X-Forwarded-For (Render's
+    # load balancer in production). Throttles key anonymous clients on the
+    # address that many hops from the end, so clients cannot pick their own
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1 if ENVIRONMENT == 'production' else 0)),
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.environ.get('TODO_THROTTLE_LOGIN', '10/min'),
+        'register': os.environ.get('TODO_THROTTLE_REGISTER', '20/hour'),
+        'reads': os.environ.get('TODO_THROTTLE_READS', '600/min'),
+        'writes': os.environ.get('TODO_THROTTLE_WRITES', '120/min'),
+    },
 }
 
+# Serve the task summary from incrementally maintained per-user counters
+# instead of aggregating the todo table on every request
+TODO_SUMMARY_COUNTERS = os.environ.get('TODO_SUMMARY_COUNTERS', 'true').lower() == 'true'
+
+# Upper bound on creates + updates + deletes accepted by /api/tasks/bulk/
+TODO_BULK_MAX_OPERATIONS = int(os.environ.get('TODO_BULK_MAX_OPERATIONS', 1000))
+
+# Seconds an authenticated user stays cached by its JWT user_id claim;
+# entries are evicted whenever the user is saved or deleted. 0 disables it.
+JWT_USER_CACHE_TIMEOUT = int(os.environ.get('JWT_USER_CACHE_TIMEOUT', 60))
+
+# Pub/sub used by the /api/todos/events/ change feed. LocalBroker only reaches
+# listeners in the same process; swap in a shared broker for multiple workers.
+TODO_EVENT_BROKER = os.environ.get('TODO_EVENT_BROKER', 'todo.events.LocalBroker')
+TODO_EVENT_HEARTBEAT = 15
+
+# Delta sync (/api/tasks/?since=<watermark>): rows per response, and how long
+# deletions are remembered before older watermarks require a full resync
+TODO_SYNC_PAGE_SIZE = 500
+TODO_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TODO_TOMBSTONE_RETENTION_DAYS', 30))
+# Seconds a caught-up watermark stays behind the newest change, which must
+# exceed the longest transaction that writes todos
+TODO_SYNC_SAFETY_MARGIN = int(os.environ.get('TODO_SYNC_SAFETY_MARGIN', 60))
+
+# Requests running more queries than this are logged as likely N+1 patterns
+# by RequestMetricsMiddleware (0 disables the check)
+TODO_QUERY_BUDGET = int(os.environ.get('TODO_QUERY_BUDGET', 25))
+
+# Most results returned by the ranked ?q= search of /api/tasks/
+TODO_SEARCH_MAX_RESULTS = 50
+
+# Rows fetched per database round trip while streaming /api/tasks/export/
+TODO_EXPORT_CHUNK_SIZE = int(os.environ.get('TODO_EXPORT_CHUNK_SIZE', 2000))
+
+# Rows validated and inserted per batch by /api/tasks/import/ and import_todos,
+# and the largest file the endpoint accepts
+TODO_IMPORT_BATCH_SIZE = int(os.environ.get('TODO_IMPORT_BATCH_SIZE', 500))
+TODO_IMPORT_MAX_BYTES = int(os.environ.get('TODO_IMPORT_MAX_BYTES', 50 * 1024 * 1024))
+# Larger uploads are stored in the database as JobInput parts and imported by a background job
+TODO_IMPORT_INLINE_MAX_BYTES = int(os.environ.get('TODO_IMPORT_INLINE_MAX_BYTES', 1024 * 1024))
+
+# Database-backed job queue run by `manage.py run_worker`: seconds a worker
+# holds a claimed job before another may retry it, attempts before a job
+# fails, base retry delay in seconds (doubled per attempt), idle poll
+# interval and how long finished jobs are kept
+TODO_JOB_VISIBILITY_TIMEOUT = int(os.environ.get('TODO_JOB_VISIBILITY_TIMEOUT', 300))
+TODO_JOB_MAX_ATTEMPTS = int(os.environ.get('TODO_JOB_MAX_ATTEMPTS', 3))
+TODO_JOB_RETRY_DELAY = int(os.environ.get('TODO_JOB_RETRY_DELAY', 30))
+TODO_JOB_POLL_INTERVAL = float(os.environ.get('TODO_JOB_POLL_INTERVAL', 1))
+TODO_JOB_RETENTION_DAYS = int(os.environ.get('TODO_JOB_RETENTION_DAYS', 7))
+
+# Seconds a user's reads stay on the primary after they change their data;
+# must be longer than the replicas' lag
+TODO_READ_YOUR_WRITES_SECONDS = int(os.environ.get('TODO_READ_YOUR_WRITES_SECONDS', 5))
+
+# Days after today whose todos are listed as upcoming on the agenda
+TODO_AGENDA_UPCOMING_DAYS = int(os.environ.get('TODO_AGENDA_UPCOMING_DAYS', 7))
+
+# Rate limiting: the throttles keep their buckets in this process unless
+# TODO_THROTTLE_CACHE names a cache alias to share them across workers
+# (the default one when REDIS_URL is set)
+TODO_THROTTLE_ENABLED = os.environ.get('TODO_THROTTLE_ENABLED', 'true').lower() == 'true'
+TODO_THROTTLE_CACHE = os.environ.get('TODO_THROTTLE_CACHE', 'default' if os.environ.get('REDIS_URL') else '') or None
+
+# Requests one process serves at once; past that it answers 503 at once
+# instead of queueing behind a saturated event loop (0 disables the limit).
+# Only meaningful under ASGI: a sync worker holds one request at a time and
+# the rest wait in gunicorn's listen backlog, out of the middleware's sight
+TODO_MAX_CONCURRENT_REQUESTS = int(os.environ.get(
+    'TODO_MAX_CONCURRENT_REQUESTS', 100 if SERVER_MODE == 'asgi' else 0
+))
+
+# Response cache alias and the largest rendered body it will store. Only on
+# with REDIS_URL: per-process caches cannot see other workers' invalidations
+TODO_RESPONSE_CACHE_ENABLED = bool(os.environ.get('REDIS_URL')) and (
+    os.environ.get('TODO_RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+)
+TODO_RESPONSE_CACHE_ALIAS = 'responses'
+TODO_RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('TODO_RESPONSE_CACHE_MAX_BYTES', 256 * 1024))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
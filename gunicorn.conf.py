@@ -0,0 +1,19 @@
+"""
+gunicorn settings, read from the project root (see Procfile).
+
+SERVER_MODE=asgi serves backend.asgi from uvicorn workers, where one process
+keeps serving other requests while some wait on the database; the default
+serves backend.wsgi from sync workers, one request per process at a time.
+Worker count and port come from WEB_CONCURRENCY and PORT as usual.
+"""
+import os
+
+if os.environ.get('SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'backend.wsgi:application'
+    # Sync workers queue excess connections in the listen backlog, where the
+    # admission control middleware cannot see them; keep it short so excess
+    # load fails fast instead of waiting out the timeout
+    backlog = int(os.environ.get('GUNICORN_BACKLOG', 64))
@@ -1,12 +1,47 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Profile, Todo
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from django.utils import timezone
+from .jobs import enqueue
+from .models import Job, User, Profile, Todo
+from .pagination import EstimatedCountPaginator
+from .search import filter_search
+
+
+def email_match(field, term):
+    """Case-insensitive email equality written to use the LOWER(email) index from migration 0012"""
+    return Q(Exact(Lower(field), Lower(Value(term)))) & ~Q(**{field: ''})
+
 
 # Customizing the admin interface for Todo model
 class TodoAdmin(admin.ModelAdmin):
-    list_display = ('title', 'description', 'status', 'priority', 'due_date', 'created_at')
+    list_display = ('title', 'description', 'user', 'status', 'priority', 'due_date', 'created_at')
     list_filter = ('status', 'priority', 'due_date')
-    search_fields = ('title', 'description', 'user__email')
+    list_select_related = ('user',)
+    # Served by the due_date index; the model's ('-due_date', 'priority') ordering needs a full sort
+    ordering = ('-due_date', '-id')
+    search_fields = ('title', 'description', '=user__email')
+    search_help_text = "Words in the title or description, or an owner's exact email address"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['rebuild_owner_counters']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Owner email through its LOWER() index, anything else through the full-text index"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if '@' in search_term and ' ' not in search_term:
+            return queryset.filter(email_match('user__email', search_term)), False
+        return filter_search(queryset, search_term), False
+
+    @admin.action(description="Rebuild summary counters of the selected todos' owners in the background")
+    def rebuild_owner_counters(self, request, queryset):
+        user_ids = sorted(set(queryset.exclude(user=None).values_list('user_id', flat=True)))
+        job = enqueue('todos.rebuild_task_counters', user=request.user, user_ids=user_ids)
+        self.message_user(request, f"Queued job {job.pk} to rebuild counters for {len(user_ids)} users")
 
 # Registering the Todo model with the customized TodoAdmin
 admin.site.register(Todo, TodoAdmin)
@@ -35,7 +70,39 @@ class UserAdmin(BaseUserAdmin):
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'full_name', 'verified')
     list_editable = ('verified',)
-    search_fields = ('user__email', 'full_name')
+    list_select_related = ('user',)
+    search_fields = ('=user__email',)
+    search_help_text = "An exact email address"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Owner email through its LOWER() index; full_name has no index to search by"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(email_match('user__email', search_term)), False
 
 # Registering the Profile model with the customized ProfileAdmin
-admin.site.register(Profile, ProfileAdmin)
\ No newline at end of file
+admin.site.register(Profile, ProfileAdmin)
+
+
+# Background jobs are created by the application; the admin only inspects and requeues them
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'user', 'run_at', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    list_select_related = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ('name', 'payload', 'user', 'attempts', 'locked_by', 'locked_until',
+                       'progress', 'result', 'error', 'created_at', 'finished_at')
+    actions = ['requeue']
+
+    @admin.action(description="Requeue the selected jobs")
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status='running').update(
+            status='queued', attempts=0, run_at=timezone.now(), locked_by='', locked_until=None, finished_at=None
+        )
+        self.message_user(request, f"Requeued {count} jobs")
+
+admin.site.register(Job, JobAdmin)
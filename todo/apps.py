@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'todo'
+
+    def ready(self):
+        # Connect signal receivers that live outside models.py and register background tasks
+        from . import authentication, caching, events, routers, search, tasks  # noqa: F401
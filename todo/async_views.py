@@ -0,0 +1,196 @@
+"""
+Async versions of the read-heavy endpoints, served by backend.asgi.
+
+The ASGI application resolves requests against backend.asgi_urls, which
+puts these views in front of the regular URLconf. They authenticate the JWT
+themselves and use the async ORM and cache APIs, so a request waiting on
+the database does not hold a worker, and one process keeps serving other
+requests meanwhile. Writes, the browsable API and the search, delta sync
+and range variants of the task list are handed to the synchronous views.
+"""
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, Throttled
+from rest_framework.request import Request
+
+from . import views
+from .authentication import CookieJWTAuthentication
+from .caching import acache_response, aget_cached_response, aresponse_cache_key, build_response
+from .conditional import atodo_list_state, day_boundary, make_etag, not_modified, set_validators
+from .models import Profile, TaskCounter, Todo, alocal_today, asummarize_todos, counters_enabled
+from .pagination import TodoCursorPagination
+from .renderers import FastJSONRenderer, dumps
+from .routers import achoose_replica, replica_reads
+from .serializers import ProfileSerializer, TodoListSerializer, TodoSerializer, UserSerializer
+from .throttling import ReadWriteRateThrottle
+
+User = get_user_model()
+
+JSON_MEDIA_TYPE = 'application/json'
+
+task_list_view = views.TodoViewSet.as_view(
+    {'get': 'list', 'post': 'create'}, basename='task', detail=False
+)
+task_detail_view = views.TodoViewSet.as_view(
+    {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'},
+    basename='task', detail=True
+)
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """The response FastJSONRenderer would produce for data"""
+    return HttpResponse(dumps(data), content_type=JSON_MEDIA_TYPE, status=status)
+
+
+def unauthorized(detail):
+    response = json_response(
+        detail if isinstance(detail, dict) else {'detail': detail}, status=status.HTTP_401_UNAUTHORIZED
+    )
+    response['WWW-Authenticate'] = CookieJWTAuthentication().authenticate_header(None)
+    return response
+
+
+def throttled(wait):
+    """The response DRF gives a throttled request"""
+    exc = Throttled(wait)
+    response = json_response({'detail': exc.detail}, status=exc.status_code)
+    if wait is not None:
+        response['Retry-After'] = '%d' % math.ceil(wait)
+    return response
+
+
+def wants_plain_json(request):
+    """False when DRF would pick the browsable API or an indented rendering"""
+    accept = request.headers.get('Accept', '')
+    return 'format' not in request.GET and 'text/html' not in accept and 'indent' not in accept
+
+
+def async_api_view(sync_view, sync_params=()):
+    """
+    Serve authenticated GETs that pass the reads throttle with the decorated
+    coroutine, which is called with the user after the request and reads
+    from a replica; other methods, other renderings and requests with any
+    of sync_params go to sync_view in a thread.
+    """
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if (request.method != 'GET' or not wants_plain_json(request)
+                    or any(param in request.GET for param in sync_params)):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            try:
+                auth = await CookieJWTAuthentication().aauthenticate(request)
+            except AuthenticationFailed as exc:
+                return unauthorized(exc.detail)
+            if auth is None:
+                return unauthorized(NotAuthenticated.default_detail)
+            throttle = ReadWriteRateThrottle()
+            drf_request = Request(request)
+            drf_request.user = auth[0]
+            if not await throttle.aallow_request(drf_request, None):
+                return throttled(throttle.wait())
+            # Every view here only reads
+            with replica_reads(await achoose_replica(auth[0].pk)):
+                return await view(request, auth[0], *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+@async_api_view(views.get_authenticated_user)
+async def get_authenticated_user(request, user):
+    """Async get_authenticated_user"""
+    key = await aresponse_cache_key(request, user)
+    cached = await aget_cached_response(key)
+    if cached is not None:
+        return build_response(cached)
+    # UserSerializer reads user.profile, which must not be a lazy query here
+    User.profile.related.set_cached_value(user, await Profile.objects.filter(user=user).afirst())
+    response = json_response({"status": "success", "data": UserSerializer(user).data})
+    return await acache_response(response, key)
+
+
+@async_api_view(views.get_user_profile)
+async def get_user_profile(request, user):
+    """Async get_user_profile"""
+    key = await aresponse_cache_key(request, user)
+    cached = await aget_cached_response(key)
+    if cached is not None:
+        return build_response(cached)
+    try:
+        profile = await Profile.objects.aget(user=user)
+    except Profile.DoesNotExist:
+        return json_response(
+            {"status": "error", "message": "Profile does not exist", "data": None},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    response = json_response({"status": "success", "data": ProfileSerializer(profile).data})
+    return await acache_response(response, key)
+
+
+@async_api_view(views.task_summary)
+async def task_summary(request, user):
+    """Async task_summary"""
+    state = await atodo_list_state(user)
+    etag = make_etag(user.pk, state['count'], state['last_modified'], day_boundary(), JSON_MEDIA_TYPE)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    if counters_enabled():
+        summary = await TaskCounter.asummary_for(user)
+    else:
+        summary = await asummarize_todos(user)
+    return set_validators(json_response({"status": "success", "data": summary}), etag)
+
+
+@async_api_view(task_list_view, sync_params=('q', 'since', 'start', 'end'))
+async def task_list(request, user):
+    """Async TodoViewSet.list for the paginated list"""
+    boundary = day_boundary()
+    key = await aresponse_cache_key(request, user, parts=(boundary,))
+    cached = await aget_cached_response(key)
+    if cached is not None:
+        return not_modified(request, cached.etag) or set_validators(build_response(cached), cached.etag)
+
+    state = await atodo_list_state(user)
+    etag = make_etag(
+        user.pk, state['count'], state['last_modified'], boundary, request.get_full_path(), JSON_MEDIA_TYPE
+    )
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    rows = (
+        Todo.objects.filter(user=user)
+        .with_overdue(await alocal_today(user))
+        .values(*TodoListSerializer.row_fields)
+    )
+    paginator = TodoCursorPagination()
+    page = await paginator.apaginate_queryset(rows, Request(request))
+    context = {'native_datetimes': FastJSONRenderer.native_datetimes}
+    response = json_response(paginator.get_paginated_data(TodoListSerializer(page, many=True, context=context).data))
+    await acache_response(response, key, etag)
+    return set_validators(response, etag)
+
+
+@async_api_view(task_detail_view)
+async def task_detail(request, user, pk):
+    """Async TodoViewSet.retrieve"""
+    try:
+        instance = await Todo.objects.aget(pk=pk, user=user)
+    except Todo.DoesNotExist:
+        return json_response({'detail': 'No Todo matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+    boundary = day_boundary()
+    last_modified = max(instance.updated_at, boundary)
+    etag = make_etag(instance.pk, instance.updated_at, boundary, JSON_MEDIA_TYPE)
+    cached = not_modified(request, etag, last_modified)
+    if cached is not None:
+        return cached
+    serializer = TodoSerializer(instance, context={'today': await alocal_today(user)})
+    return set_validators(json_response(serializer.data), etag, last_modified)
@@ -1,13 +1,173 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import CSRFCheck
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Profile
+
+User = get_user_model()
+
+
+def cached_user_key(user_id):
+    return f'todo:jwt-user:{user_id}'
+
 
 class CookieJWTAuthentication(JWTAuthentication):
-    def authenticate(self, request):
+    """
+    JWT from the Authorization header, or else from the access cookie.
+    Browsers attach the cookie to cross-site requests too, so requests it
+    authenticates must pass the CSRF check, as with SessionAuthentication.
+    """
+
+    def get_request_token(self, request):
+        """The raw access token from the Authorization header or the access cookie"""
         header = self.get_header(request)
         if header is None:
-            raw_token = request.COOKIES.get('access')
-        else:
-            raw_token = self.get_raw_token(header)
+            return request.COOKIES.get('access')
+        return self.get_raw_token(header)
+
+    def authenticate(self, request):
+        raw_token = self.get_request_token(request)
         if raw_token is None:
             return None
         validated_token = self.get_validated_token(raw_token)
-        return self.get_user(validated_token), validated_token
+        user = self.get_user(validated_token)
+        if self.get_header(request) is None:
+            self.enforce_csrf(request)
+        return user, validated_token
+
+    def enforce_csrf(self, request):
+        """Reject an unsafe request without a valid CSRF token, as SessionAuthentication.enforce_csrf does"""
+        def dummy_get_response(request):
+            return None
+
+        check = CSRFCheck(dummy_get_response)
+        # Populates request.META['CSRF_COOKIE'], which process_view compares against
+        check.process_request(request)
+        reason = check.process_view(request, None, (), {})
+        if reason:
+            raise PermissionDenied(f'CSRF Failed: {reason}')
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views. Token validation needs no database
+        and the user usually comes from the cache, so most calls never wait
+        on a query. The async views only serve safe methods, which need no
+        CSRF check.
+        """
+        raw_token = self.get_request_token(request)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user from the cache, falling back to the
+        database. The profile is loaded with it, since the user's time zone
+        decides which todos are overdue.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = cached_user_key(user_id)
+        user = cache.get(key) if settings.JWT_USER_CACHE_TIMEOUT else None
+        if user is None:
+            try:
+                user = User.objects.select_related('profile').get(**{api_settings.USER_ID_FIELD: user_id})
+            except User.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if settings.JWT_USER_CACHE_TIMEOUT:
+                cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        """Async get_user"""
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = cached_user_key(user_id)
+        user = await cache.aget(key) if settings.JWT_USER_CACHE_TIMEOUT else None
+        if user is None:
+            try:
+                user = await User.objects.select_related('profile').aget(**{api_settings.USER_ID_FIELD: user_id})
+            except User.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if settings.JWT_USER_CACHE_TIMEOUT:
+                await cache.aset(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        return self.check_user(user, validated_token)
+
+    def check_user(self, user, validated_token):
+        """The checks JWTAuthentication.get_user makes after loading a user"""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
+
+
+def evict_cached_user_on_commit(user_id):
+    # After the commit, or a concurrent request could cache the old row again
+    key = cached_user_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    evict_cached_user_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def evict_cached_user_profile(sender, instance, **kwargs):
+    if instance.user_id:
+        evict_cached_user_on_commit(instance.user_id)
+
+
+class PrecheckedRefreshToken(RefreshToken):
+    """RefreshToken that leaves the blacklist check to MyTokenRefreshSerializer, which folds it into its user lookup"""
+
+    def check_blacklist(self):
+        pass
+
+
+def prune_expired_tokens(batch_size=1000):
+    """
+    Delete expired outstanding refresh tokens and their blacklist entries.
+
+    Works through them batch_size at a time, each batch in its own short
+    transaction, and returns the number of outstanding tokens deleted.
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,453 @@
+"""
+Repeatable latency/throughput benchmarks for the API hot paths.
+
+Runs against a throwaway test database created from the configured default
+database (SQLite in development, Postgres when DATABASE_URL points at one),
+so benchmarking never touches real data. Used by ``manage.py benchmark_api``.
+"""
+import asyncio
+import io
+import itertools
+import json
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIHandler
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .models import Profile, Todo
+from .renderers import FastJSONParser, FastJSONRenderer
+from .serializers import TodoListSerializer
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = 'Bench-Password-123'
+
+# Read endpoints with async views, compared by run_concurrency
+CONCURRENCY_SCENARIOS = ('tasks_list', 'tasks_detail', 'task_summary', 'profile', 'user')
+
+
+@contextmanager
+def benchmark_database():
+    """Create a test database for the duration of the block and destroy it afterwards"""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    # Replicas are test mirrors of the primary, as under the test runner
+    for alias in connections:
+        if connections[alias].settings_dict['TEST'].get('MIRROR') == DEFAULT_DB_ALIAS:
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(users, todos_per_user):
+    """Create users with profiles and todos spread over a year; returns the users"""
+    password = make_password(BENCHMARK_PASSWORD)
+    accounts = User.objects.bulk_create([
+        User(username=f'bench{i}', email=f'bench{i}@example.com', password=password)
+        for i in range(users)
+    ])
+    Profile.objects.bulk_create([Profile(user=user) for user in accounts])
+
+    statuses = [status for status, _ in Todo.STATUS_CHOICES]
+    priorities = [priority for priority, _ in Todo.PRIORITY_CHOICES]
+    today = timezone.localdate()
+    for user in accounts:
+        Todo.objects.bulk_create([
+            Todo(
+                user=user,
+                title=f'Benchmark task {i}',
+                description='Seeded by benchmark_api',
+                status=statuses[i % len(statuses)],
+                priority=priorities[i % len(priorities)],
+                due_date=None if i % 10 == 0 else today + timedelta(days=i % 365 - 180),
+            )
+            for i in range(todos_per_user)
+        ], batch_size=1000)
+    return accounts
+
+
+class Scenario:
+    """One endpoint exercised round-robin across the seeded users"""
+
+    def __init__(self, name, method, path, body=None, authenticated=True, expect=(200,)):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.authenticated = authenticated
+        self.expect = expect
+
+    def get_path(self, context, n):
+        return self.path(context, n) if callable(self.path) else self.path
+
+    def get_headers(self, context, n):
+        if not self.authenticated:
+            return {}
+        return {'Authorization': f"Bearer {context['tokens'][n % len(context['tokens'])]}"}
+
+    def request(self, client, context, n):
+        kwargs = {'headers': self.get_headers(context, n)}
+        if self.body is not None:
+            body = self.body(context, n) if callable(self.body) else self.body
+            kwargs.update(data=json.dumps(body), content_type='application/json')
+        return getattr(client, self.method)(self.get_path(context, n), **kwargs)
+
+
+def _todo_detail_path(context, n):
+    ids = context['todo_ids'][n % len(context['todo_ids'])]
+    return f'/api/tasks/{ids[n % len(ids)]}/'
+
+
+def default_scenarios():
+    counter = itertools.count()
+    return [
+        Scenario('tasks_list', 'get', '/api/tasks/'),
+        Scenario('tasks_detail', 'get', _todo_detail_path),
+        Scenario('tasks_create', 'post', '/api/tasks/', body={
+            'title': 'Benchmark create', 'category': 'Work', 'due_date': '2030-01-01'
+        }, expect=(201,)),
+        Scenario('task_summary', 'get', '/api/todos/summary/'),
+        Scenario('profile', 'get', '/api/profile/'),
+        Scenario('user', 'get', '/api/user/'),
+        Scenario('token', 'post', '/api/token/', authenticated=False, body=lambda context, n: {
+            'username': context['users'][n % len(context['users'])].username,
+            'password': BENCHMARK_PASSWORD,
+        }),
+        Scenario('register', 'post', '/api/register/', authenticated=False, body=lambda context, n: {
+            'username': f'newbench{next(counter)}',
+            'email': f'newbench{n}-{time.monotonic_ns()}@example.com',
+            'password': BENCHMARK_PASSWORD,
+            'password2': BENCHMARK_PASSWORD,
+        }, expect=(201,)),
+        # Each refresh token can only be rotated once, so every request gets its own
+        Scenario('token_refresh', 'post', '/api/token/refresh/', authenticated=False, body=lambda context, n: {
+            'refresh': context['refresh_tokens'][n],
+        }),
+        # Rejected by the uniqueness check: the validation-only path of registration
+        Scenario('register_taken', 'post', '/api/register/', authenticated=False, body=lambda context, n: {
+            'username': context['users'][n % len(context['users'])].username.upper(),
+            'email': f'taken{n}@example.com',
+            'password': BENCHMARK_PASSWORD,
+            'password2': BENCHMARK_PASSWORD,
+        }, expect=(400,)),
+    ]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(latencies):
+    return {
+        'p50': round(percentile(latencies, 50), 3),
+        'p90': round(percentile(latencies, 90), 3),
+        'p99': round(percentile(latencies, 99), 3),
+        'mean': round(statistics.fmean(latencies), 3),
+        'max': round(max(latencies), 3),
+    }
+
+
+def run_scenario(scenario, context, requests, warmup):
+    client = Client()
+    for n in range(warmup):
+        scenario.request(client, context, n)
+
+    latencies, queries, errors, cache_hits = [], [], 0, 0
+    started = time.perf_counter()
+    for n in range(requests):
+        # Replicas included
+        with ExitStack() as stack:
+            captured = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            begin = time.perf_counter()
+            response = scenario.request(client, context, warmup + n)
+            latencies.append((time.perf_counter() - begin) * 1000)
+        queries.append(sum(len(capture.captured_queries) for capture in captured))
+        if response.status_code not in scenario.expect:
+            errors += 1
+        # run() disables the response cache; a hit here would mean the numbers measure the cache
+        if response.has_header('X-Response-Cache'):
+            cache_hits += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'errors': errors,
+        'response_cache_hits': cache_hits,
+        'latency_ms': latency_summary(latencies),
+        'queries_per_request': round(statistics.fmean(queries), 2),
+        'throughput_rps': round(requests / elapsed, 2),
+    }
+
+
+@contextmanager
+def slow_queries(delay):
+    """Make every query on every connection wait delay seconds first, like a database under load"""
+    def wait(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(wait)
+
+    # Connections opened from now on, including those of ASGI request contexts
+    connection_created.connect(install)
+    connection.execute_wrappers.append(wait)
+    try:
+        yield
+    finally:
+        connection.execute_wrappers.remove(wait)
+        connection_created.disconnect(install)
+
+
+async def asgi_get(application, path, headers):
+    """Send a GET through an ASGI application and return the response status"""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        'headers': [(b'host', b'testserver')] + [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+    }
+    received = []
+
+    async def receive():
+        if not received:
+            received.append(True)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects; the handler cancels this once it has responded
+        await asyncio.Event().wait()
+
+    statuses = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def run_sync_worker(scenario, context, requests, concurrency):
+    """
+    One request at a time through the WSGI stack, as a gunicorn sync worker
+    serves them. Latency is what each of `concurrency` clients that send
+    their next request as soon as the last one returns would see: request n
+    is sent when request n - concurrency completes, and waits behind the
+    requests ahead of it.
+    """
+    client = Client()
+    completed, errors = [], 0
+    started = time.perf_counter()
+    for n in range(requests):
+        response = scenario.request(client, context, n)
+        completed.append((time.perf_counter() - started) * 1000)
+        if response.status_code not in scenario.expect:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    latencies = [
+        done - (completed[n - concurrency] if n >= concurrency else 0)
+        for n, done in enumerate(completed)
+    ]
+    return {'errors': errors, 'latency_ms': latency_summary(latencies), 'throughput_rps': round(requests / elapsed, 2)}
+
+
+async def run_asgi(application, scenario, context, requests, concurrency):
+    """`requests` GETs through an ASGI application from `concurrency` clients at once"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(n):
+        nonlocal errors
+        async with semaphore:
+            begin = time.perf_counter()
+            status = await asgi_get(application, scenario.get_path(context, n), scenario.get_headers(context, n))
+            latencies.append((time.perf_counter() - begin) * 1000)
+        if status not in scenario.expect:
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {'errors': errors, 'latency_ms': latency_summary(latencies), 'throughput_rps': round(requests / elapsed, 2)}
+
+
+def run_concurrency(scenarios, context, requests, concurrency, query_delay):
+    """
+    Serve each read scenario in one process three ways while every query
+    takes query_delay seconds longer: a sync worker, the ASGI handler with
+    the sync views (each request on its own thread) and the ASGI handler
+    with the async views. run() has disabled the response cache, so every
+    request reaches the database.
+    """
+    from backend.asgi import AsyncViewsASGIHandler
+
+    modes = {
+        'asgi_sync_views': ASGIHandler,
+        'asgi_async_views': AsyncViewsASGIHandler,
+    }
+    results = {}
+    with slow_queries(query_delay):
+        for scenario in scenarios:
+            results[scenario.name] = {'sync_worker': run_sync_worker(scenario, context, requests, concurrency)}
+            for mode, handler in modes.items():
+                application = handler()
+                asyncio.run(run_asgi(application, scenario, context, concurrency, concurrency))
+                results[scenario.name][mode] = asyncio.run(
+                    run_asgi(application, scenario, context, requests, concurrency)
+                )
+    return {'concurrency': concurrency, 'query_delay_ms': query_delay * 1000, 'requests': requests, 'results': results}
+
+
+def todo_rows(count):
+    """values() rows shaped like the todo list query, built in memory"""
+    now = timezone.now()
+    today = now.date()
+    return [
+        {
+            'id': i, 'title': f'Benchmark task {i}', 'description': 'Seeded by benchmark_api',
+            'status': 'Open', 'priority': 'Medium', 'category': 'Work', 'custom_category': None,
+            'due_date': None if i % 10 == 0 else today + timedelta(days=i % 365 - 180),
+            'created_at': now - timedelta(minutes=i), 'updated_at': now, 'overdue': i % 3 == 0, 'user': 1,
+        }
+        for i in range(count)
+    ]
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - begin) * 1000)
+    return round(min(timings), 3)
+
+
+def run_rendering(rows=10000, repeat=5):
+    """Serialize, render and parse a rows-long todo list with DRF's JSON classes and the fast ones"""
+    data = todo_rows(rows)
+    results = {}
+    for name, renderer, parser in (
+        ('drf_json', JSONRenderer(), JSONParser()),
+        ('fast_json', FastJSONRenderer(), FastJSONParser()),
+    ):
+        context = {'native_datetimes': getattr(renderer, 'native_datetimes', False)}
+
+        def serialize_and_render():
+            body = {'next': None, 'results': TodoListSerializer(data, many=True, context=context).data}
+            return renderer.render(body, 'application/json')
+
+        content = serialize_and_render()
+        results[name] = {
+            'render_ms': _best_of(repeat, serialize_and_render),
+            'parse_ms': _best_of(repeat, lambda: parser.parse(io.BytesIO(content))),
+            'bytes': len(content),
+        }
+    return {'rows': rows, **results}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(users=5, todos_per_user=200, requests=50, warmup=5, only=None, scenarios=None, progress=None, render_rows=0,
+        concurrency=0, query_delay=0.02):
+    """Seed a throwaway database, run each scenario and return a JSON-serializable report"""
+    scenarios = [s for s in (scenarios or default_scenarios()) if not only or s.name in only]
+    # Measure the endpoints, not the rate limits or response cache hits
+    uncached = override_settings(
+        TODO_THROTTLE_ENABLED=False, TODO_MAX_CONCURRENT_REQUESTS=0, TODO_RESPONSE_CACHE_ENABLED=False
+    )
+    with benchmark_database(), uncached:
+        accounts = seed(users, todos_per_user)
+        context = {
+            'users': accounts,
+            'tokens': [str(AccessToken.for_user(user)) for user in accounts],
+            'refresh_tokens': [
+                str(RefreshToken.for_user(accounts[n % len(accounts)])) for n in range(warmup + requests)
+            ],
+            'todo_ids': [
+                list(Todo.objects.filter(user=user).values_list('id', flat=True)[:100])
+                for user in accounts
+            ],
+        }
+        results = {}
+        for scenario in scenarios:
+            if progress:
+                progress(scenario.name)
+            results[scenario.name] = run_scenario(scenario, context, requests, warmup)
+        if concurrency:
+            if progress:
+                progress('concurrency')
+            reads = [scenario for scenario in scenarios if scenario.name in CONCURRENCY_SCENARIOS]
+            concurrent = run_concurrency(reads, context, requests, concurrency, query_delay)
+        vendor = connection.vendor
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': timezone.now().isoformat(),
+            'database': vendor,
+            'users': users,
+            'todos_per_user': todos_per_user,
+            'requests': requests,
+            'warmup': warmup,
+        },
+        'results': results,
+    }
+    if concurrency:
+        report['concurrency'] = concurrent
+    if render_rows:
+        if progress:
+            progress('rendering')
+        report['rendering'] = run_rendering(render_rows)
+    return report
+
+
+def compare(report, baseline):
+    """Percent change of p50 latency and queries per request against a baseline report"""
+    deltas = {}
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        deltas[name] = {
+            'p50_change_pct': _change(previous['latency_ms']['p50'], result['latency_ms']['p50']),
+            'queries_change': round(result['queries_per_request'] - previous['queries_per_request'], 2),
+        }
+    return deltas
+
+
+def _change(before, after):
+    return round((after - before) / before * 100, 1) if before else None
@@ -0,0 +1,187 @@
+"""
+Per-user versioned cache of rendered API responses.
+
+Every user has a version number in the default cache. Cached bodies are
+stored in the ``responses`` cache under keys that embed that version, so
+bumping it (on any Todo, Profile or User write) orphans all of the user's
+cached responses at once; they then age out through the backend's LRU
+eviction. A hit is served as the stored bytes without touching the ORM or
+a serializer.
+
+The cache is only used when TODO_RESPONSE_CACHE_ENABLED, which settings
+turn on with a shared (Redis) cache: with per-process caches a write would
+bump the version in one worker while the others kept serving stale bodies.
+Keys are then None, and the lookups and stores below do nothing.
+"""
+import hashlib
+import time
+from collections import namedtuple
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from .models import Profile, Todo
+from .signals import bulk_in_progress, todos_bulk_changed
+
+User = get_user_model()
+
+CachedResponse = namedtuple('CachedResponse', ['content', 'content_type', 'etag', 'last_modified'])
+
+
+def response_cache():
+    return caches[settings.TODO_RESPONSE_CACHE_ALIAS]
+
+
+def response_cache_enabled():
+    return settings.TODO_RESPONSE_CACHE_ENABLED
+
+
+def _version_key(user_id):
+    return f'todo:resp-version:{user_id}'
+
+
+def user_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # Start from a fresh number so keys from before an eviction can never match again
+        cache.add(_version_key(user_id), time.time_ns(), None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+async def auser_version(user_id):
+    """Async user_version"""
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        await cache.aadd(_version_key(user_id), time.time_ns(), None)
+        version = await cache.aget(_version_key(user_id))
+    return version
+
+
+def bump_user_version(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def request_digest(request, parts=()):
+    accept = request.META.get('HTTP_ACCEPT', '')
+    key = '|'.join(str(part) for part in (request.get_full_path(), accept, *parts))
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def response_cache_key(request, per_user=True, parts=()):
+    """
+    Key for a GET response: path with query string, Accept header, the
+    user's version and any other parts the body depends on
+    """
+    if not response_cache_enabled():
+        return None
+    digest = request_digest(request, parts)
+    if not per_user:
+        return f'todo:resp:public:{digest}'
+    user_id = request.user.pk
+    return f'todo:resp:{user_id}:{user_version(user_id)}:{digest}'
+
+
+async def aresponse_cache_key(request, user, parts=()):
+    """Async response_cache_key for a per-user response; async views pass the user they authenticated"""
+    if not response_cache_enabled():
+        return None
+    return f'todo:resp:{user.pk}:{await auser_version(user.pk)}:{request_digest(request, parts)}'
+
+
+def get_cached_response(key):
+    return None if key is None else response_cache().get(key)
+
+
+async def aget_cached_response(key):
+    return None if key is None else await response_cache().aget(key)
+
+
+def build_response(cached):
+    response = HttpResponse(cached.content, content_type=cached.content_type)
+    response['X-Response-Cache'] = 'hit'
+    return response
+
+
+def cache_on_render(response, key, etag=None, last_modified=None):
+    """Store the response's rendered bytes under `key` once it is rendered, if it is a small 200"""
+    if key is None or response.status_code != 200:
+        return response
+
+    def store(rendered):
+        if len(rendered.content) <= settings.TODO_RESPONSE_CACHE_MAX_BYTES:
+            response_cache().set(
+                key,
+                CachedResponse(rendered.content, rendered['Content-Type'], etag, last_modified)
+            )
+
+    if hasattr(response, 'add_post_render_callback'):
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+    return response
+
+
+async def acache_response(response, key, etag=None, last_modified=None):
+    """Async cache_on_render for a response that is already rendered"""
+    if (key is not None and response.status_code == 200
+            and len(response.content) <= settings.TODO_RESPONSE_CACHE_MAX_BYTES):
+        await response_cache().aset(
+            key,
+            CachedResponse(response.content, response['Content-Type'], etag, last_modified)
+        )
+    return response
+
+
+def cached_response(per_user=True):
+    """Serve GET responses of a function view from the response cache"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            key = response_cache_key(request, per_user=per_user)
+            cached = get_cached_response(key)
+            if cached is not None:
+                return build_response(cached)
+            return cache_on_render(view(request, *args, **kwargs), key)
+        return wrapped
+    return decorator
+
+
+def invalidate_on_commit(user_id):
+    if user_id:
+        transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def invalidate_todo_responses(sender, instance, **kwargs):
+    if not bulk_in_progress():
+        invalidate_on_commit(instance.user_id)
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def invalidate_bulk_todo_responses(sender, user, **kwargs):
+    invalidate_on_commit(user.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_responses(sender, instance, **kwargs):
+    invalidate_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_responses(sender, instance, **kwargs):
+    invalidate_on_commit(instance.pk)
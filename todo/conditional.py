@@ -0,0 +1,57 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import Todo
+
+
+def todo_list_state(user):
+    """Row count and newest updated_at of a user's todos, read from the (user, updated_at) index"""
+    return Todo.objects.filter(user=user).aggregate(count=Count('id'), last_modified=Max('updated_at'))
+
+
+async def atodo_list_state(user):
+    """Async todo_list_state"""
+    return await Todo.objects.filter(user=user).aaggregate(count=Count('id'), last_modified=Max('updated_at'))
+
+
+def day_boundary():
+    """
+    Start of the current quarter hour. Every time zone's midnight falls on
+    one, so a validator that includes it changes whenever any user's day does.
+    """
+    now = timezone.now()
+    return now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the parts that determine a response body"""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Return a 304 response when If-None-Match / If-Modified-Since show the
+    client's copy is current, otherwise None. Only applies to GET and HEAD.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag/Last-Modified and ask clients to revalidate before reuse"""
+    if 200 <= response.status_code < 300:
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
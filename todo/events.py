@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Todo
+from .signals import bulk_in_progress, todos_bulk_changed
+
+
+class Subscription:
+    """A single listener's queue of events, consumed from its own event loop"""
+
+    def __init__(self, broker, user_id, max_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_size)
+
+    def deliver(self, event):
+        if self.queue.full():
+            # A slow client lost events; tell it to refetch instead of queueing forever
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {'type': 'resync'}
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    In-process pub/sub for todo change events.
+
+    Only subscribers in the publishing process see events, which is enough
+    for a single ASGI worker. Point TODO_EVENT_BROKER at a class with the same
+    subscribe/unsubscribe/publish interface to fan out across processes.
+    """
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        """Register a listener for a user's events; must be called from a running event loop"""
+        subscription = Subscription(self, user_id, self.max_queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            listeners = self._subscribers.get(subscription.user_id)
+            if listeners is not None:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        """Queue an event for every listener of a user; safe to call from any thread"""
+        with self._lock:
+            listeners = list(self._subscribers.get(user_id, ()))
+        for subscription in listeners:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The listener's loop has shut down
+                self.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.TODO_EVENT_BROKER)()
+
+
+def todo_event(event_type, pk, updated_at=None):
+    return {
+        'type': event_type,
+        'id': pk,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
+
+def publish_on_commit(user_id, events):
+    """Publish todo change events once the surrounding transaction commits"""
+    if not user_id or not events:
+        return
+
+    def publish():
+        broker = get_broker()
+        for event in events:
+            broker.publish(user_id, event)
+
+    transaction.on_commit(publish)
+
+
+@receiver(post_save, sender=Todo)
+def publish_todo_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or bulk_in_progress():
+        return
+    event_type = 'created' if created else 'updated'
+    publish_on_commit(instance.user_id, [todo_event(event_type, instance.pk, instance.updated_at)])
+
+
+@receiver(post_delete, sender=Todo)
+def publish_todo_deleted(sender, instance, **kwargs):
+    if bulk_in_progress():
+        return
+    publish_on_commit(instance.user_id, [todo_event('deleted', instance.pk)])
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def publish_bulk_changes(sender, user, created=(), updated=(), deleted=(), **kwargs):
+    events = [
+        todo_event(event_type, pk)
+        for event_type, ids in (('created', created), ('updated', updated), ('deleted', deleted))
+        for pk in ids
+    ]
+    publish_on_commit(user.pk, events)
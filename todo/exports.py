@@ -0,0 +1,185 @@
+"""
+Streaming exports of a user's todos as NDJSON, CSV or iCalendar (VTODO).
+
+Rows are read with QuerySet.iterator() (or aiterator() under ASGI) in chunks
+and encoded as they arrive, so memory stays flat however many todos a user
+has. Each format is an exporter with a header, a per-row encoder and a
+footer; iter_export() and aiter_export() drive them.
+"""
+import csv
+import io
+from datetime import timezone as dt_timezone
+
+from django.utils import timezone
+
+from .models import Todo
+from .renderers import dumps
+
+EXPORT_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'category', 'custom_category',
+    'due_date', 'created_at', 'updated_at'
+)
+
+# iCalendar VTODO equivalents of Todo.STATUS_CHOICES and Todo.PRIORITY_CHOICES (RFC 5545 3.8.1.11, 3.8.1.9)
+ICAL_STATUSES = {'Open': 'NEEDS-ACTION', 'In Progress': 'IN-PROCESS', 'Done': 'COMPLETED'}
+ICAL_PRIORITIES = {'High': 1, 'Medium': 5, 'Low': 9}
+
+# Spreadsheet apps run cells starting with these as formulas (CSV injection)
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_queryset(user):
+    return Todo.objects.filter(user=user).order_by('id').values(*EXPORT_FIELDS)
+
+
+class NDJSONExporter:
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def header(self):
+        return b''
+
+    def row(self, row):
+        return dumps(row) + b'\n'
+
+    def footer(self):
+        return b''
+
+
+class CSVExporter:
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def _flush(self):
+        value = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return value.encode()
+
+    def header(self):
+        self.writer.writerow(EXPORT_FIELDS)
+        return self._flush()
+
+    @staticmethod
+    def cell(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    def row(self, row):
+        self.writer.writerow([self.cell(row[field]) for field in EXPORT_FIELDS])
+        return self._flush()
+
+    def footer(self):
+        return b''
+
+
+def ical_escape(text):
+    """Escape a TEXT property value (RFC 5545 3.3.11)"""
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def ical_fold(line):
+    """Fold a content line into CRLF-terminated lines of at most 75 octets (RFC 5545 3.1)"""
+    parts, current, size, limit = [], [], 0, 75
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            parts.append(''.join(current))
+            # Continuation lines start with a space, which counts towards the limit
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ical_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+class ICalendarExporter:
+    content_type = 'text/calendar; charset=utf-8'
+    extension = 'ics'
+
+    def __init__(self, uid_domain):
+        self.uid_domain = uid_domain
+        self.stamp = ical_datetime(timezone.now())
+
+    def header(self):
+        return (
+            'BEGIN:VCALENDAR\r\n'
+            'VERSION:2.0\r\n'
+            'PRODID:-//backend-api-calender//Todo export//EN\r\n'
+            'CALSCALE:GREGORIAN\r\n'
+        ).encode()
+
+    def row(self, row):
+        lines = [
+            'BEGIN:VTODO',
+            f"UID:todo-{row['id']}@{self.uid_domain}",
+            f'DTSTAMP:{self.stamp}',
+            f"CREATED:{ical_datetime(row['created_at'])}",
+            f"LAST-MODIFIED:{ical_datetime(row['updated_at'])}",
+            f"SUMMARY:{ical_escape(row['title'])}",
+        ]
+        if row['description']:
+            lines.append(f"DESCRIPTION:{ical_escape(row['description'])}")
+        if row['due_date']:
+            lines.append(f"DUE;VALUE=DATE:{row['due_date'].strftime('%Y%m%d')}")
+        lines.append(f"STATUS:{ICAL_STATUSES.get(row['status'], 'NEEDS-ACTION')}")
+        lines.append(f"PRIORITY:{ICAL_PRIORITIES.get(row['priority'], 0)}")
+        category = row['custom_category'] if row['category'] == 'Other' and row['custom_category'] else row['category']
+        lines.append(f'CATEGORIES:{ical_escape(category)}')
+        lines.append('END:VTODO')
+        return ''.join(ical_fold(line) for line in lines).encode()
+
+    def footer(self):
+        return b'END:VCALENDAR\r\n'
+
+
+EXPORT_OUTPUTS = ('ndjson', 'csv', 'ics')
+
+
+def get_exporter(name, request):
+    """The exporter for an output name, or None if the name is unknown"""
+    if name == 'ndjson':
+        return NDJSONExporter()
+    if name == 'csv':
+        return CSVExporter()
+    if name == 'ics':
+        return ICalendarExporter(request.get_host().split(':')[0])
+    return None
+
+
+def iter_export(exporter, queryset, chunk_size):
+    """Encode queryset rows with exporter, yielding about chunk_size rows at a time"""
+    yield exporter.header()
+    buffer = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        buffer.append(exporter.row(row))
+        if len(buffer) >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+    yield b''.join(buffer) + exporter.footer()
+
+
+async def aiter_export(exporter, queryset, chunk_size):
+    """iter_export() for ASGI, reading rows with the async ORM"""
+    yield exporter.header()
+    buffer = []
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        buffer.append(exporter.row(row))
+        if len(buffer) >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+    yield b''.join(buffer) + exporter.footer()
@@ -0,0 +1,233 @@
+"""
+Streaming imports of todos from CSV files and iCalendar (VTODO/VEVENT) feeds.
+
+Files are read line by line into records, validated against TodoSerializer
+in batches and inserted with one bulk_create per batch, so memory stays
+bounded by the batch size rather than the file size. Each record carries a
+source uid (the CSV uid/id column, the iCalendar UID, or a hash of the row)
+stored on Todo.source_uid; re-importing a file skips records that already
+exist, and a failed import can simply be run again.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import re
+from datetime import datetime
+
+from django.db import transaction
+
+from .models import TaskCounter, Todo
+from .serializers import TodoSerializer
+from .signals import bulk_todo_changes, todos_bulk_changed
+
+IMPORT_FIELDS = ('title', 'description', 'status', 'priority', 'category', 'custom_category', 'due_date')
+IMPORT_INPUTS = ('csv', 'ics')
+
+# Inverse of exports.ICAL_STATUSES; VEVENTs have no completion state and import as Open
+ICAL_TODO_STATUSES = {'NEEDS-ACTION': 'Open', 'IN-PROCESS': 'In Progress', 'COMPLETED': 'Done'}
+
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_input(filename, content_type=''):
+    """Guess the input format of an upload from its name or content type"""
+    if filename.lower().endswith(('.ics', '.ical', '.ifb')) or content_type.startswith('text/calendar'):
+        return 'ics'
+    return 'csv'
+
+
+def read_csv(stream):
+    """Yield (line, source uid, record) for each row of a CSV text stream with a header row"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        record = {field: row[field] for field in IMPORT_FIELDS if row.get(field)}
+        yield reader.line_num, row.get('uid') or row.get('id') or None, record
+
+
+def unfold(stream):
+    """Yield (line number, logical line) from iCalendar text, joining folded lines"""
+    current, start = None, 0
+    for number, raw in enumerate(stream, 1):
+        raw = raw.rstrip('\r\n')
+        if raw[:1] in (' ', '\t') and current is not None:
+            current += raw[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = raw, number
+    if current:
+        yield start, current
+
+
+def parse_content_line(line):
+    """Split 'NAME;PARAM=x:value' into (NAME, value), ignoring colons inside quoted parameters"""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            return line[:index].split(';', 1)[0].upper(), line[index + 1:]
+    return line.split(';', 1)[0].upper(), ''
+
+
+def ical_unescape(text):
+    result, chars = [], iter(text)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            char = '\n' if char in 'nN' else char
+        result.append(char)
+    return ''.join(result)
+
+
+def ical_date(value):
+    """The date of a DATE or DATE-TIME value, or the raw value for the serializer to reject"""
+    try:
+        return datetime.strptime(value[:8], '%Y%m%d').date().isoformat()
+    except ValueError:
+        return value
+
+
+def ical_priority(value):
+    try:
+        value = int(value)
+    except ValueError:
+        return None
+    if 1 <= value <= 4:
+        return 'High'
+    if value == 5:
+        return 'Medium'
+    if 6 <= value <= 9:
+        return 'Low'
+    return None
+
+
+def ical_record(kind, properties):
+    """Map a VTODO or VEVENT's properties onto Todo fields"""
+    record = {'title': ical_unescape(properties.get('SUMMARY', ''))[:255]}
+    if properties.get('DESCRIPTION'):
+        record['description'] = ical_unescape(properties['DESCRIPTION'])
+    due = properties.get('DUE') or properties.get('DTSTART')
+    if due:
+        record['due_date'] = ical_date(due)
+    if kind == 'VTODO':
+        record['status'] = ICAL_TODO_STATUSES.get(properties.get('STATUS', '').upper(), 'Open')
+    priority = ical_priority(properties.get('PRIORITY', ''))
+    if priority:
+        record['priority'] = priority
+    if properties.get('CATEGORIES'):
+        category = ical_unescape(re.split(r'(?<!\\),', properties['CATEGORIES'])[0]).strip()
+        known = {value.lower(): value for value, _ in Todo.CATEGORY_CHOICES}
+        if category.lower() in known:
+            record['category'] = known[category.lower()]
+        elif category:
+            record['category'] = 'Other'
+            record['custom_category'] = category[:50]
+    return record
+
+
+def read_ics(stream):
+    """Yield (line, source uid, record) for each VTODO and VEVENT in an iCalendar text stream"""
+    kind, properties, nested, start = None, None, 0, 0
+    for number, line in unfold(stream):
+        name, value = parse_content_line(line)
+        if name == 'BEGIN':
+            if kind is not None:
+                # Sub-components such as VALARM
+                nested += 1
+            elif value.upper() in ('VTODO', 'VEVENT'):
+                kind, properties, start = value.upper(), {}, number
+        elif name == 'END' and kind is not None:
+            if nested:
+                nested -= 1
+                continue
+            # Cancelled events are not work to do
+            if properties.get('STATUS', '').upper() != 'CANCELLED':
+                uid = properties.get('UID')
+                # Overrides of a recurring event share its UID
+                if uid and properties.get('RECURRENCE-ID'):
+                    uid = f"{uid}/{properties['RECURRENCE-ID']}"
+                yield start, uid or None, ical_record(kind, properties)
+            kind, properties = None, None
+        elif kind is not None and not nested:
+            properties.setdefault(name, value)
+
+
+def read_records(stream, input_format):
+    return read_ics(stream) if input_format == 'ics' else read_csv(stream)
+
+
+def content_uid(record):
+    """Source uid for records without one, so identical rows still import once"""
+    digest = hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()
+    return f'sha1:{digest}'
+
+
+def import_todos(user, records, batch_size=500, progress=None):
+    """
+    Validate and insert (line, source uid, record) tuples for user in batches.
+
+    Returns a report of processed, created, skipped (already imported) and
+    invalid records plus the first MAX_REPORTED_ERRORS validation errors;
+    progress, if given, is called with the report after every batch.
+    """
+    report = {'processed': 0, 'created': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return report
+        import_batch(user, batch, report)
+        if progress:
+            progress(report)
+
+
+def import_batch(user, batch, report):
+    report['processed'] += len(batch)
+
+    serializer = TodoSerializer(data=[record for _, _, record in batch], many=True)
+    if serializer.is_valid():
+        valid = list(zip(batch, serializer.validated_data))
+    else:
+        # Validate again without the failing rows; many=True is all-or-nothing
+        failed = {index for index, errors in enumerate(serializer.errors) if errors}
+        for index in sorted(failed):
+            report['invalid'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': batch[index][0], 'errors': serializer.errors[index]})
+        batch = [item for index, item in enumerate(batch) if index not in failed]
+        serializer = TodoSerializer(data=[record for _, _, record in batch], many=True)
+        serializer.is_valid(raise_exception=True)
+        valid = list(zip(batch, serializer.validated_data))
+
+    todos = {}
+    for (_, uid, record), data in valid:
+        uid = (uid or content_uid(record))[:255]
+        todos.setdefault(uid, Todo(user=user, source_uid=uid, **data))
+
+    with transaction.atomic(), bulk_todo_changes():
+        existing = set(
+            Todo.objects.filter(user=user, source_uid__in=list(todos)).values_list('source_uid', flat=True)
+        )
+        new = [todo for uid, todo in todos.items() if uid not in existing]
+        # ignore_conflicts covers rows a concurrent import inserted since the lookup
+        Todo.objects.bulk_create(new, batch_size=500, ignore_conflicts=True)
+        # bulk_create gives each todo its own created_at; a row with another one was
+        # inserted by that concurrent import, which has already counted it
+        inserted_at = {todo.source_uid: todo.created_at for todo in new}
+        rows = [
+            (pk, status) for pk, status, uid, created_at in
+            Todo.objects.filter(user=user, source_uid__in=list(inserted_at))
+            .values_list('id', 'status', 'source_uid', 'created_at')
+            if created_at == inserted_at[uid]
+        ] if new else []
+        created = [pk for pk, _ in rows]
+        if created:
+            todos_bulk_changed.send(
+                sender=Todo, user=user, created=created, updated=[], deleted=[],
+                counter_deltas=TaskCounter.status_deltas(added=[status for _, status in rows])
+            )
+
+    report['created'] += len(created)
+    report['skipped'] += len(valid) - len(created)
@@ -0,0 +1,180 @@
+"""
+Background jobs stored in the database and run by ``manage.py run_worker``.
+
+Functions become tasks with the @task decorator and are queued with
+enqueue(); no broker is needed. A worker claims a job with a conditional
+UPDATE, which is atomic on every backend, and holds it for
+TODO_JOB_VISIBILITY_TIMEOUT seconds. A job whose worker dies is claimed
+again once that lease expires, so tasks must be safe to run twice. Failed
+jobs are retried with exponential backoff until max_attempts.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job, JobInput
+
+logger = logging.getLogger('todo.jobs')
+
+_tasks = {}
+
+
+def task(name):
+    """Register a function as the task called name; it is called as func(job, **payload)"""
+    def register(func):
+        _tasks[name] = func
+        func.task_name = name
+        return func
+    return register
+
+
+def get_task(name):
+    return _tasks.get(name)
+
+
+def enqueue(name, user=None, delay=None, max_attempts=None, **payload):
+    """
+    Queue a task by name with a JSON-serializable payload and return the Job.
+
+    The row is written in the caller's transaction, so a job queued by a
+    request that rolls back never runs.
+    """
+    if name not in _tasks:
+        raise KeyError(f"Unknown task {name!r}")
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        user=user,
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.TODO_JOB_MAX_ATTEMPTS,
+    )
+
+
+def claimable(now):
+    """Queued jobs that are due, and running jobs whose lease has expired"""
+    return Q(status='queued', run_at__lte=now) | Q(status='running', locked_until__lt=now)
+
+
+def claim(worker_id, candidates=10):
+    """Lease the next due job to worker_id, or return None when there is none"""
+    now = timezone.now()
+    pending = (
+        Job.objects.filter(claimable(now))
+        .order_by('run_at', 'id')
+        .values_list('id', flat=True)[:candidates]
+    )
+    for pk in pending:
+        token = f'{worker_id}:{uuid.uuid4().hex[:8]}'
+        # Another worker may claim the same row first; only one UPDATE matches
+        claimed = Job.objects.filter(claimable(now), pk=pk).update(
+            status='running',
+            locked_by=token,
+            locked_until=now + timedelta(seconds=settings.TODO_JOB_VISIBILITY_TIMEOUT),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _update(job, **fields):
+    """Write fields if job is still leased to the worker that claimed it"""
+    updated = Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(**fields)
+    if not updated:
+        logger.warning("Lost the lease on job %s (%s) before it finished", job.pk, job.name)
+    return bool(updated)
+
+
+def _finish(job, **fields):
+    """Record a job's final state and drop its input, which no attempt will read again"""
+    finished = _update(job, finished_at=timezone.now(), locked_until=None, **fields)
+    if finished:
+        JobInput.objects.filter(job_id=job.pk).delete()
+    return finished
+
+
+def report_progress(job, progress):
+    """Store progress for status polling and extend the job's lease"""
+    job.progress = progress
+    _update(
+        job,
+        progress=progress,
+        locked_until=timezone.now() + timedelta(seconds=settings.TODO_JOB_VISIBILITY_TIMEOUT),
+    )
+
+
+def run(job):
+    """Run a claimed job and record its result, a retry or its failure"""
+    func = get_task(job.name)
+    if func is None:
+        return _finish(job, status='failed', error=f"Unknown task {job.name!r}")
+    if job.attempts > job.max_attempts:
+        # Its worker died or overran the visibility timeout on the last attempt
+        return _finish(job, status='failed', error=job.error or "Lease expired")
+
+    started = time.perf_counter()
+    try:
+        result = func(job, **job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.name, job.attempts)
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = settings.TODO_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            return _update(
+                job, status='queued', error=error, run_at=now + timedelta(seconds=delay),
+                locked_by='', locked_until=None,
+            )
+        return _finish(job, status='failed', error=error)
+
+    logger.info("Job %s (%s) done in %.3fs", job.pk, job.name, time.perf_counter() - started)
+    return _finish(job, status='done', result=result)
+
+
+def prune_jobs():
+    """Delete finished jobs older than TODO_JOB_RETENTION_DAYS; returns the number deleted"""
+    cutoff = timezone.now() - timedelta(days=settings.TODO_JOB_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(status__in=('done', 'failed'), finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def work(worker_id=None, burst=False, max_jobs=None, should_stop=None):
+    """
+    Claim and run jobs until stopped, returning the number run.
+
+    burst returns as soon as the queue is empty instead of polling every
+    TODO_JOB_POLL_INTERVAL seconds; should_stop is checked between jobs.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    last_prune = 0.0
+    while max_jobs is None or processed < max_jobs:
+        if should_stop and should_stop():
+            break
+        # Long-running process: drop connections that are broken or past CONN_MAX_AGE
+        close_old_connections()
+        job = claim(worker_id)
+        if job is None:
+            if burst:
+                break
+            if time.monotonic() - last_prune > 3600:
+                prune_jobs()
+                last_prune = time.monotonic()
+            time.sleep(settings.TODO_JOB_POLL_INTERVAL)
+            continue
+        run(job)
+        processed += 1
+    return processed
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from todo import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API hot paths against a seeded throwaway database and print a JSON report"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help="Users to seed (default 5)")
+        parser.add_argument('--todos', type=int, default=200, help="Todos per user (default 200)")
+        parser.add_argument('--requests', type=int, default=50, help="Timed requests per scenario (default 50)")
+        parser.add_argument('--warmup', type=int, default=5, help="Untimed requests per scenario (default 5)")
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help="Only run this scenario; repeat for several"
+        )
+        parser.add_argument(
+            '--render-rows', type=int, default=10000,
+            help="Rows in the JSON render/parse comparison; 0 skips it (default 10000)"
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=0,
+            help="Also serve the read scenarios to this many concurrent clients from a sync worker, "
+                 "ASGI with sync views and ASGI with async views; 0 skips it (default 0)"
+        )
+        parser.add_argument(
+            '--query-delay', type=float, default=20,
+            help="Milliseconds added to every query during the concurrency comparison (default 20)"
+        )
+        parser.add_argument('--output', help="Write the report to this file instead of stdout")
+        parser.add_argument('--baseline', help="Earlier report to compare against")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['requests'] < 1:
+            raise CommandError("--users and --requests must be at least 1")
+        if options['concurrency'] < 0 or options['query_delay'] < 0:
+            raise CommandError("--concurrency and --query-delay must not be negative")
+
+        known = {scenario.name for scenario in benchmarks.default_scenarios()}
+        unknown = set(options['scenarios'] or ()) - known
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}. Choose from {', '.join(sorted(known))}")
+
+        report = benchmarks.run(
+            users=options['users'],
+            todos_per_user=options['todos'],
+            requests=options['requests'],
+            warmup=options['warmup'],
+            only=options['scenarios'],
+            progress=lambda name: self.stderr.write(f"Running {name}..."),
+            render_rows=options['render_rows'],
+            concurrency=options['concurrency'],
+            query_delay=options['query_delay'] / 1000,
+        )
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                report['comparison'] = benchmarks.compare(report, json.load(f))
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Wrote benchmark report to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.imports import IMPORT_INPUTS, detect_input, import_todos, read_records
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import todos for a user from a CSV or iCalendar file; rows imported before are skipped"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="Owner of the imported todos")
+        parser.add_argument('path', help="CSV or .ics file to import")
+        parser.add_argument('--input', choices=IMPORT_INPUTS, help="File format (default: guessed from the name)")
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TODO_IMPORT_BATCH_SIZE,
+            help=f"Rows validated and inserted per batch (default {settings.TODO_IMPORT_BATCH_SIZE})"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']}")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        input_format = options['input'] or detect_input(options['path'])
+        try:
+            stream = open(options['path'], encoding='utf-8-sig', errors='replace', newline='')
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        with stream:
+            report = import_todos(
+                user, read_records(stream, input_format), batch_size=options['batch_size'],
+                progress=lambda report: self.stderr.write(
+                    f"{report['processed']} processed, {report['created']} created, "
+                    f"{report['skipped']} skipped, {report['invalid']} invalid"
+                ),
+            )
+
+        for error in report['errors']:
+            self.stderr.write(self.style.WARNING(f"Line {error['line']}: {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} todos for {user.username} "
+            f"({report['skipped']} already imported, {report['invalid']} invalid)"
+        ))
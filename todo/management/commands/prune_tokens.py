@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.authentication import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens and their blacklist entries in small batches "
+        "(a batched alternative to simplejwt's flushexpiredtokens)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Tokens deleted per transaction (default 1000)"
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        deleted = prune_expired_tokens(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens"))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from todo.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete todo tombstones older than TODO_TOMBSTONE_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} tombstones older than {settings.TODO_TOMBSTONE_RETENTION_DAYS} days"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from todo.search import rebuild_fts_index
+
+
+class Command(BaseCommand):
+    help = "Repopulate the SQLite FTS5 todo search table (Postgres indexes need no rebuild)"
+
+    def handle(self, *args, **options):
+        indexed = rebuild_fts_index()
+        if indexed is None:
+            self.stdout.write("No FTS5 search table on this database; nothing to rebuild")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} todos"))
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.jobs import enqueue
+from todo.models import TaskCounter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user task summary counters from the todo table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help="Only rebuild the counters of the user with this id",
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help="Queue the rebuild for run_worker instead of running it now",
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            user_ids = None if options['user'] is None else [options['user']]
+            job = enqueue('todos.rebuild_task_counters', user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk}"))
+            return
+
+        if options['user'] is None:
+            rebuilt = TaskCounter.rebuild_all()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt task counters for {rebuilt} users"))
+            return
+
+        try:
+            user = User.objects.get(pk=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+        counter = TaskCounter.rebuild(user)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt task counters for {user.username}: {counter.total} todos"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from todo.models import Agenda
+
+
+class Command(BaseCommand):
+    help = (
+        "Move agendas whose user's day has ended to the new day. Run it every "
+        "15 minutes or so; agendas read before it runs are rebuilt on the spot"
+    )
+
+    def handle(self, *args, **options):
+        moved = 0
+        for tz_name in Agenda.objects.values_list('timezone', flat=True).distinct().order_by():
+            moved += Agenda.roll_over(tz_name)
+        self.stdout.write(self.style.SUCCESS(f"Rolled over {moved} agendas"))
@@ -0,0 +1,34 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from todo import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs from the database until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', help="Name recorded on claimed jobs (default: host:pid)")
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty")
+        parser.add_argument('--max-jobs', type=int, help="Exit after running this many jobs")
+
+    def handle(self, *args, **options):
+        stopping = []
+
+        def stop(signum, frame):
+            # Finish the current job, then exit
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        worker_id = options['worker_id'] or jobs.default_worker_id()
+        self.stderr.write(f"Worker {worker_id} waiting for jobs")
+        processed = jobs.work(
+            worker_id=worker_id,
+            burst=options['burst'],
+            max_jobs=options['max_jobs'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} ran {processed} jobs"))
@@ -0,0 +1,184 @@
+"""
+In-process request instrumentation: per-view histograms of latency, DB
+queries, DB time, serializer time and render time, plus a query budget
+check that logs likely N+1 patterns. Fed by RequestMetricsMiddleware and
+exposed by the metrics view; numbers are per worker process.
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger('todo.metrics')
+
+MS_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket counts everything above the highest bound"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None if it is the overflow bucket)"""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            counts, total, value_sum = list(self.counts), self.total, self.sum
+        labels = [str(bound) for bound in self.bounds] + ['+Inf']
+        return {
+            'count': total,
+            'sum': round(value_sum, 3),
+            'mean': round(value_sum / total, 3) if total else None,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip(labels, counts)),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.latency_ms = Histogram(MS_BUCKETS)
+        self.db_time_ms = Histogram(MS_BUCKETS)
+        self.db_queries = Histogram(COUNT_BUCKETS)
+        self.serializer_ms = Histogram(MS_BUCKETS)
+        self.render_ms = Histogram(MS_BUCKETS)
+        self.over_budget = 0
+        self._lock = threading.Lock()
+
+    def count_over_budget(self):
+        with self._lock:
+            self.over_budget += 1
+
+    def snapshot(self):
+        with self._lock:
+            over_budget = self.over_budget
+        return {
+            'latency_ms': self.latency_ms.snapshot(),
+            'db_time_ms': self.db_time_ms.snapshot(),
+            'db_queries': self.db_queries.snapshot(),
+            'serializer_ms': self.serializer_ms.snapshot(),
+            'render_ms': self.render_ms.snapshot(),
+            'over_query_budget': over_budget,
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def for_view(self, name):
+        metrics = self._views.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self._views.setdefault(name, ViewMetrics())
+        return metrics
+
+    def snapshot(self):
+        with self._lock:
+            views = dict(self._views)
+        return {name: metrics.snapshot() for name, metrics in sorted(views.items())}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = Registry()
+
+
+class RequestStats:
+    """Counters for the request currently being handled"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = Counter()
+        self.statements = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+
+_current = ContextVar('todo_request_stats', default=None)
+
+
+def current_stats():
+    return _current.get()
+
+
+@contextmanager
+def collecting(stats):
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timer(kind):
+    """Add the time spent in the block to the current request's `kind` timing"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.timings[kind] += time.perf_counter() - started
+
+
+def record(view_name, stats, elapsed):
+    """Fold a finished request into its view's histograms and apply the query budget"""
+    metrics = registry.for_view(view_name)
+    metrics.latency_ms.observe(elapsed * 1000)
+    metrics.db_time_ms.observe(stats.db_time * 1000)
+    metrics.db_queries.observe(stats.queries)
+    metrics.serializer_ms.observe(stats.timings['serializer'] * 1000)
+    metrics.render_ms.observe(stats.timings['render'] * 1000)
+
+    budget = settings.TODO_QUERY_BUDGET
+    if budget and stats.queries > budget:
+        metrics.count_over_budget()
+        statement, repeats = stats.statements.most_common(1)[0]
+        logger.warning(
+            "%s ran %d queries (budget %d); most repeated statement ran %d times: %s",
+            view_name, stats.queries, budget, repeats, statement[:500]
+        )
@@ -0,0 +1,134 @@
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+
+
+class AdmissionControlMiddleware:
+    """
+    Answer 503 straight away once TODO_MAX_CONCURRENT_REQUESTS requests are
+    in flight in this process, so a burst is shed in microseconds instead of
+    queueing until every request times out. The limit is per process and
+    only applies under ASGI, where one process serves many requests at once.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        limit = settings.TODO_MAX_CONCURRENT_REQUESTS
+        self.slots = threading.BoundedSemaphore(limit) if limit else None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.slots is None:
+            return self.get_response(request)
+        if not self.slots.acquire(blocking=False):
+            return self.overloaded()
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+    async def __acall__(self, request):
+        if self.slots is None:
+            return await self.get_response(request)
+        if not self.slots.acquire(blocking=False):
+            return self.overloaded()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.slots.release()
+
+    def overloaded(self):
+        response = JsonResponse(
+            {"status": "error", "message": "Server is busy, please retry shortly"}, status=503
+        )
+        response['Retry-After'] = '1'
+        return response
+
+
+class RequestMetricsMiddleware:
+    """Record query count, DB time, serializer/render time and latency per resolved view"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.measure(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.measure(request):
+            return await self.get_response(request)
+
+    @contextmanager
+    def measure(self, request):
+        stats = metrics.RequestStats()
+        started = time.perf_counter()
+        with metrics.collecting(stats), ExitStack() as stack:
+            # Under ASGI these are the connections of this request's context
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats.record_query))
+            yield
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        metrics.record(match.view_name if match else 'unresolved', stats, elapsed)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after the view returns; time that step
+        stats = metrics.current_stats()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.timings['render'] += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that also runs async. WhiteNoise itself is sync
+    only, which under ASGI would move every request, not just those for
+    static files, onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0008_todo_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('priority', models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], default='Medium', max_length=10)),
+                ('category', models.CharField(choices=[('Work', 'Work'), ('Personal', 'Personal'), ('Urgent', 'Urgent'), ('Other', 'Other')], default='Work', max_length=20)),
+                ('custom_category', models.CharField(blank=True, max_length=50, null=True)),
+                ('start_date', models.DateField()),
+                ('frequency', models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly'), ('YEARLY', 'Yearly')], max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1)),
+                ('by_weekday', models.CharField(blank=True, help_text='Comma separated weekday codes (MO,TU,...) for weekly series', max_length=20)),
+                ('count', models.PositiveIntegerField(blank=True, help_text='Stop after this many occurrences', null=True)),
+                ('until', models.DateField(blank=True, help_text='Last date an occurrence may fall on', null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='todo_series', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Todo Series',
+                'verbose_name_plural': 'Todo Series',
+            },
+        ),
+        migrations.CreateModel(
+            name='TodoSeriesException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_date', models.DateField()),
+                ('cancelled', models.BooleanField(default=False)),
+                ('moved_to', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(blank=True, choices=[('Open', 'Open'), ('In Progress', 'In Progress'), ('Done', 'Done')], max_length=20, null=True)),
+                ('title', models.CharField(blank=True, max_length=255, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('priority', models.CharField(blank=True, choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], max_length=10, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='todo.todoseries')),
+            ],
+            options={
+                'verbose_name': 'Todo Series Exception',
+                'verbose_name_plural': 'Todo Series Exceptions',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='todoseries',
+            index=models.Index(fields=['user', 'start_date'], name='todo_todose_user_id_255554_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todoseriesexception',
+            index=models.Index(fields=['series', 'moved_to'], name='todo_todose_series__b9cf87_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='todoseriesexception',
+            constraint=models.UniqueConstraint(fields=('series', 'occurrence_date'), name='unique_series_occurrence'),
+        ),
+    ]
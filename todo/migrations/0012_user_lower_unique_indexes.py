@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+# Copy of todo.models.USER_LOWER_UNIQUE_CONSTRAINTS as of this migration
+USER_LOWER_UNIQUE_CONSTRAINTS = [
+    models.UniqueConstraint(Lower('username'), name='todo_user_username_lower_uniq'),
+    models.UniqueConstraint(Lower('email'), condition=~Q(email=''), name='todo_user_email_lower_uniq'),
+]
+
+
+def add_constraints(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    for constraint in USER_LOWER_UNIQUE_CONSTRAINTS:
+        schema_editor.add_constraint(User, constraint)
+
+
+def remove_constraints(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    for constraint in USER_LOWER_UNIQUE_CONSTRAINTS:
+        schema_editor.remove_constraint(User, constraint)
+
+
+class Migration(migrations.Migration):
+    """
+    Unique indexes on LOWER(username) and LOWER(email) (non-empty emails only).
+
+    Fails if existing users already differ only by case; merge or rename
+    those accounts first.
+    """
+
+    dependencies = [
+        ('todo', '0011_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraints, remove_constraints),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:10
+
+import django.db.models.deletion
+import todo.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('todo', '0012_user_lower_unique_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timezone',
+            field=models.CharField(blank=True, help_text="IANA time zone the agenda's days follow; blank for the server's", max_length=64, validators=[todo.models.validate_timezone]),
+        ),
+        migrations.CreateModel(
+            name='Agenda',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='agenda', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('day', models.DateField()),
+                ('timezone', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Agenda',
+                'verbose_name_plural': 'Agendas',
+                'indexes': [models.Index(fields=['timezone', 'day'], name='todo_agenda_timezon_10873e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AgendaEntry',
+            fields=[
+                ('todo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='agenda_entry', serialize=False, to='todo.todo')),
+                ('bucket', models.CharField(choices=[('overdue', 'Overdue'), ('today', 'Today'), ('upcoming', 'Upcoming')], max_length=10)),
+                ('due_date', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agenda_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Agenda Entry',
+                'verbose_name_plural': 'Agenda Entries',
+                'indexes': [models.Index(fields=['user', 'bucket', 'due_date'], name='todo_agenda_user_id_8c2e78_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0013_agenda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobInput',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='input', serialize=False, to='todo.job')),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Job Input',
+                'verbose_name_plural': 'Job Inputs',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_inputs(apps, schema_editor):
+    """Queued jobs keep their input as its only part"""
+    OldJobInput = apps.get_model('todo', 'OldJobInput')
+    JobInput = apps.get_model('todo', 'JobInput')
+    for old in OldJobInput.objects.iterator(chunk_size=1):
+        JobInput.objects.create(job_id=old.job_id, part=0, data=old.data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0014_jobinput'),
+    ]
+
+    operations = [
+        migrations.RenameModel('JobInput', 'OldJobInput'),
+        migrations.CreateModel(
+            name='JobInput',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inputs', to='todo.job')),
+            ],
+            options={
+                'verbose_name': 'Job Input',
+                'verbose_name_plural': 'Job Inputs',
+                'constraints': [models.UniqueConstraint(fields=('job', 'part'), name='todo_jobinput_job_part_uniq')],
+            },
+        ),
+        migrations.RunPython(copy_inputs, migrations.RunPython.noop),
+        migrations.DeleteModel('OldJobInput'),
+    ]
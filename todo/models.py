@@ -1,17 +1,69 @@
-from django.db import models
+import io
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import models, router, transaction
+from django.db.models import BooleanField, Case, Count, ExpressionWrapper, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Lower
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .signals import bulk_in_progress, todos_bulk_changed
 
 User = get_user_model()
 
+# Case-insensitive uniqueness for auth_user, added by migration 0012 since the
+# User model is not ours. Registration looks users up by the same Lower()
+# expressions (see RegisterSerializer.find_conflicts) so those lookups use these indexes.
+USER_LOWER_UNIQUE_CONSTRAINTS = [
+    models.UniqueConstraint(Lower('username'), name='todo_user_username_lower_uniq'),
+    models.UniqueConstraint(Lower('email'), condition=~Q(email=''), name='todo_user_email_lower_uniq'),
+]
+
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"{value} is not a known time zone")
+
+
+def user_today(tz_name):
+    """Today's date in an IANA time zone, or in TIME_ZONE for a blank name"""
+    return timezone.localdate(timezone=ZoneInfo(tz_name) if tz_name else None)
+
+
+def local_today(user):
+    """
+    Today in the user's profile time zone: the day the agenda, the summary
+    and every overdue flag shown to the user are computed against
+    """
+    try:
+        return user_today(user.profile.timezone)
+    except ObjectDoesNotExist:
+        return user_today('')
+
+
+async def alocal_today(user):
+    """Async local_today; reads the time zone only if the profile was not loaded with the user"""
+    if User.profile.is_cached(user):
+        return local_today(user)
+    tz_name = await Profile.objects.filter(user=user).values_list('timezone', flat=True).afirst()
+    return user_today(tz_name or '')
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile', null=True, blank=True)
     full_name = models.CharField(max_length=100, blank=True)
     bio = models.TextField(max_length=500, blank=True)
     image = models.ImageField(upload_to="user_images/", default="default.jpg", verbose_name='profile image')
     verified = models.BooleanField(default=False)
+    timezone = models.CharField(
+        max_length=64, blank=True, validators=[validate_timezone],
+        help_text="IANA time zone the agenda's days follow; blank for the server's"
+    )
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
@@ -21,9 +73,21 @@ class Profile(models.Model):
         verbose_name_plural = 'Profiles'
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.get_or_create(user=instance)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    # A new user cannot have a profile yet, so insert without looking first
+    if created and not raw:
+        Profile.objects.create(user=instance)
+
+class TodoQuerySet(models.QuerySet):
+    def with_overdue(self, today):
+        """Annotate overdue the way Todo.is_overdue computes it, against a single reference date"""
+        return self.annotate(overdue=Case(
+            When(due_date__isnull=True, then=Value(None)),
+            When(Q(due_date__lt=today) & ~Q(status='Done'), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(null=True),
+        ))
+
 
 class Todo(models.Model):
     PRIORITY_CHOICES = [
@@ -55,6 +119,10 @@ class Todo(models.Model):
     due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    # Identifies the calendar event or file row a todo was imported from, so re-imports skip it
+    source_uid = models.CharField(max_length=255, null=True, blank=True, editable=False)
+
+    objects = TodoQuerySet.as_manager()
 
     class Meta:
         ordering = ['-due_date', 'priority']
@@ -65,16 +133,649 @@ class Todo(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['priority']),
             models.Index(fields=['user']),
+            models.Index(fields=['user', 'due_date', 'id']),
+            models.Index(fields=['user', 'updated_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'source_uid'],
+                condition=models.Q(source_uid__isnull=False),
+                name='todo_unique_user_source_uid',
+            ),
         ]
 
-    @property
-    def is_overdue(self):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored owner and status so counters can be adjusted on save
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_agenda_key = instance.agenda_key()
+        instance._loaded_search_key = instance.search_key()
+        return instance
+
+    def agenda_key(self):
+        """The fields that decide whether and where the todo is on its user's agenda"""
+        return (self.__dict__.get('user_id'), self.__dict__.get('due_date'), self.__dict__.get('status'))
+
+    def search_key(self):
+        """The fields copied into the todo's full-text search row"""
+        return (self.__dict__.get('user_id'), self.__dict__.get('title'), self.__dict__.get('description'))
+
+    def is_overdue_on(self, today):
         return (
             self.due_date and
-            self.due_date < timezone.now().date() and
+            self.due_date < today and
             self.status != 'Done'
         )
 
+    @property
+    def is_overdue(self):
+        """is_overdue_on the server's date; API responses use the owner's (see local_today)"""
+        return self.is_overdue_on(timezone.localdate())
+
     def __str__(self):
         return f"{self.title} ({self.status})"
 
+
+class TodoSeries(models.Model):
+    """A recurring todo; occurrences are expanded on demand for a calendar window"""
+    FREQUENCY_CHOICES = [
+        ('DAILY', 'Daily'),
+        ('WEEKLY', 'Weekly'),
+        ('MONTHLY', 'Monthly'),
+        ('YEARLY', 'Yearly'),
+    ]
+
+    WEEKDAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='todo_series')
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    priority = models.CharField(max_length=10, choices=Todo.PRIORITY_CHOICES, default='Medium')
+    category = models.CharField(max_length=20, choices=Todo.CATEGORY_CHOICES, default='Work')
+    custom_category = models.CharField(max_length=50, blank=True, null=True)
+    start_date = models.DateField()
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(default=1)
+    by_weekday = models.CharField(
+        max_length=20, blank=True,
+        help_text="Comma separated weekday codes (MO,TU,...) for weekly series"
+    )
+    count = models.PositiveIntegerField(null=True, blank=True, help_text="Stop after this many occurrences")
+    until = models.DateField(null=True, blank=True, help_text="Last date an occurrence may fall on")
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Todo Series'
+        verbose_name_plural = 'Todo Series'
+        indexes = [
+            models.Index(fields=['user', 'start_date']),
+        ]
+
+    @property
+    def weekdays(self):
+        """Weekday numbers (Monday=0) of a weekly series, defaulting to the start date's weekday"""
+        codes = [code for code in self.by_weekday.split(',') if code]
+        if not codes:
+            return [self.start_date.weekday()]
+        return sorted(self.WEEKDAY_CODES.index(code) for code in codes)
+
+    def __str__(self):
+        return f"{self.title} ({self.get_frequency_display()})"
+
+
+class TodoSeriesException(models.Model):
+    """A sparse per-occurrence override, completion or cancellation of a series"""
+    series = models.ForeignKey(TodoSeries, on_delete=models.CASCADE, related_name='exceptions')
+    occurrence_date = models.DateField()
+    cancelled = models.BooleanField(default=False)
+    moved_to = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Todo.STATUS_CHOICES, null=True, blank=True)
+    title = models.CharField(max_length=255, null=True, blank=True)
+    description = models.TextField(null=True, blank=True)
+    priority = models.CharField(max_length=10, choices=Todo.PRIORITY_CHOICES, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Todo Series Exception'
+        verbose_name_plural = 'Todo Series Exceptions'
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'occurrence_date'], name='unique_series_occurrence'),
+        ]
+        indexes = [
+            models.Index(fields=['series', 'moved_to']),
+        ]
+
+    def __str__(self):
+        return f"{self.series.title} on {self.occurrence_date}"
+
+
+class TodoTombstone(models.Model):
+    """Record of a deleted todo, kept so delta sync clients learn about deletions"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='todo_tombstones')
+    todo_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Todo Tombstone'
+        verbose_name_plural = 'Todo Tombstones'
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Todo {self.todo_id} deleted at {self.deleted_at}"
+
+
+@receiver(post_delete, sender=Todo)
+def write_tombstone_on_delete(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone however the todo was deleted: API, admin, QuerySet.delete() or a cascade"""
+    if bulk_in_progress():
+        return
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    if issubclass(origin_model, User):
+        # The user's tombstones go with them
+        return
+    TodoTombstone.objects.create(user_id=instance.user_id, todo_id=instance.pk)
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def write_tombstones_after_bulk(sender, user, deleted=(), **kwargs):
+    TodoTombstone.objects.bulk_create(
+        [TodoTombstone(user=user, todo_id=pk) for pk in deleted], batch_size=500
+    )
+
+
+class TaskCounter(models.Model):
+    """Per-user todo counts by status, kept current by Todo signals"""
+    STATUS_FIELDS = {
+        'Open': 'open',
+        'In Progress': 'in_progress',
+        'Done': 'done',
+    }
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_counter')
+    total = models.IntegerField(default=0)
+    open = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Task Counter'
+        verbose_name_plural = 'Task Counters'
+
+    def __str__(self):
+        return f"{self.user.username}'s task counters"
+
+    @staticmethod
+    def count_expressions():
+        """Conditional aggregates producing every counter column in one query"""
+        counts = {'total': Count('id')}
+        for status, field in TaskCounter.STATUS_FIELDS.items():
+            counts[field] = Count('id', filter=Q(status=status))
+        return counts
+
+    @classmethod
+    def rebuild(cls, user):
+        """Recompute a user's counters from the todo table"""
+        # Count on the primary even inside replica_reads(); a lagging replica would store stale totals
+        todos = Todo.objects.using(router.db_for_write(cls)).filter(user=user)
+        counts = todos.aggregate(**cls.count_expressions())
+        counter, _ = cls.objects.update_or_create(user=user, defaults=counts)
+        return counter
+
+    @classmethod
+    def rebuild_all(cls):
+        """Recompute counters for every user that owns todos; returns the number of rows written"""
+        rows = (
+            Todo.objects.filter(user__isnull=False)
+            .values('user')
+            .annotate(**cls.count_expressions())
+            .order_by()
+        )
+        counters = [cls(user_id=row.pop('user'), **row) for row in rows]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(counters, batch_size=1000)
+        return len(counters)
+
+    @classmethod
+    def adjust(cls, user_id, **deltas):
+        """Apply counter increments with a single UPDATE; missing rows are built lazily on read"""
+        cls.objects.filter(user_id=user_id).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+    @classmethod
+    def status_deltas(cls, added=(), removed=()):
+        """Counter increments for todos with the added statuses appearing and the removed ones going"""
+        deltas = {'total': len(added) - len(removed)}
+        deltas.update({field: 0 for field in cls.STATUS_FIELDS.values()})
+        for status in added:
+            deltas[cls.STATUS_FIELDS[status]] += 1
+        for status in removed:
+            deltas[cls.STATUS_FIELDS[status]] -= 1
+        return {field: delta for field, delta in deltas.items() if delta}
+
+    @classmethod
+    def summary_queryset(cls, user):
+        """The user's counter row annotated with the agenda's overdue count and the day it was built for"""
+        overdue = (
+            AgendaEntry.objects.filter(user=OuterRef('user'), bucket=AgendaEntry.OVERDUE)
+            .values('user')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        agenda = Agenda.objects.filter(user=OuterRef('user'))
+        return cls.objects.filter(user=user).annotate(
+            overdue=Coalesce(Subquery(overdue), 0),
+            agenda_day=Subquery(agenda.values('day')),
+            agenda_timezone=Subquery(agenda.values('timezone')),
+        )
+
+    def agenda_is_current(self):
+        return self.agenda_day is not None and self.agenda_day == user_today(self.agenda_timezone)
+
+    def as_summary(self):
+        return {
+            'total': self.total,
+            'open': self.open,
+            'in_progress': self.in_progress,
+            'done': self.done,
+            'overdue': self.overdue,
+        }
+
+    @classmethod
+    def summary_for(cls, user):
+        """Return the summary counts for a user, building the counter row if missing"""
+        counter = cls.summary_queryset(user).first()
+        if counter is None or not counter.agenda_is_current():
+            if counter is None:
+                cls.rebuild(user)
+            Agenda.rebuild(user)
+            # Read the new rows where they were written; a replica may not have them yet
+            counter = cls.summary_queryset(user).using(router.db_for_write(cls)).get()
+        return counter.as_summary()
+
+    @classmethod
+    async def asummary_for(cls, user):
+        """Async summary_for"""
+        counter = await cls.summary_queryset(user).afirst()
+        if counter is None or not counter.agenda_is_current():
+            if counter is None:
+                await sync_to_async(cls.rebuild)(user)
+            await sync_to_async(Agenda.rebuild)(user)
+            counter = await cls.summary_queryset(user).using(router.db_for_write(cls)).aget()
+        return counter.as_summary()
+
+
+def summary_aggregates(today):
+    return {
+        **TaskCounter.count_expressions(),
+        'overdue': Count('id', filter=Q(
+            due_date__lt=today,
+            status__in=['Open', 'In Progress'],
+        )),
+    }
+
+
+def summarize_todos(user):
+    """Compute the summary counts for a user with a single conditional aggregation"""
+    return Todo.objects.filter(user=user).aggregate(**summary_aggregates(local_today(user)))
+
+
+async def asummarize_todos(user):
+    """Async summarize_todos"""
+    return await Todo.objects.filter(user=user).aaggregate(**summary_aggregates(await alocal_today(user)))
+
+
+def counters_enabled():
+    return settings.TODO_SUMMARY_COUNTERS
+
+
+@receiver(post_save, sender=Todo)
+def update_task_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or bulk_in_progress() or not counters_enabled():
+        return
+    loaded_user_id = getattr(instance, '_loaded_user_id', None)
+    loaded_status = getattr(instance, '_loaded_status', None)
+    if created:
+        if instance.user_id:
+            TaskCounter.adjust(instance.user_id, total=1, **{TaskCounter.STATUS_FIELDS[instance.status]: 1})
+    elif loaded_status is None or loaded_user_id != instance.user_id:
+        # Previous state unknown or owner changed: drop the rows and rebuild on next read
+        TaskCounter.objects.filter(user_id__in={loaded_user_id, instance.user_id} - {None}).delete()
+    elif loaded_status != instance.status and instance.user_id:
+        TaskCounter.adjust(instance.user_id, **{
+            TaskCounter.STATUS_FIELDS[loaded_status]: -1,
+            TaskCounter.STATUS_FIELDS[instance.status]: 1,
+        })
+    instance._loaded_user_id = instance.user_id
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Todo)
+def update_task_counter_on_delete(sender, instance, **kwargs):
+    if bulk_in_progress() or not counters_enabled():
+        return
+    loaded_status = getattr(instance, '_loaded_status', None)
+    user_id = getattr(instance, '_loaded_user_id', instance.user_id)
+    if not user_id:
+        return
+    if loaded_status is None:
+        TaskCounter.objects.filter(user_id=user_id).delete()
+    else:
+        TaskCounter.adjust(user_id, total=-1, **{TaskCounter.STATUS_FIELDS[loaded_status]: -1})
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def update_task_counter_after_bulk(sender, user, counter_deltas=None, **kwargs):
+    if not counters_enabled():
+        return
+    if counter_deltas is None:
+        TaskCounter.rebuild(user)
+    elif counter_deltas:
+        TaskCounter.adjust(user.pk, **counter_deltas)
+
+
+class Agenda(models.Model):
+    """The local day and time zone a user's agenda entries are bucketed for"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='agenda')
+    day = models.DateField()
+    timezone = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Agenda'
+        verbose_name_plural = 'Agendas'
+        indexes = [
+            models.Index(fields=['timezone', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}'s agenda for {self.day}"
+
+    @staticmethod
+    def horizon(day):
+        """The last due date that is upcoming on day"""
+        return day + timedelta(days=settings.TODO_AGENDA_UPCOMING_DAYS)
+
+    def bucket_for(self, due_date):
+        """The bucket of an open todo due on due_date, or None when it is past the horizon"""
+        if due_date < self.day:
+            return AgendaEntry.OVERDUE
+        if due_date == self.day:
+            return AgendaEntry.TODAY
+        if due_date <= self.horizon(self.day):
+            return AgendaEntry.UPCOMING
+        return None
+
+    @classmethod
+    def rebuild(cls, user):
+        """Re-bucket all of a user's open dated todos for today in their time zone"""
+        # Read the primary even inside replica_reads(), as TaskCounter.rebuild does
+        db = router.db_for_write(cls)
+        tz_name = Profile.objects.using(db).filter(user=user).values_list('timezone', flat=True).first() or ''
+        agenda = cls(user=user, day=user_today(tz_name), timezone=tz_name)
+        todos = (
+            Todo.objects.using(db)
+            .filter(user=user, due_date__lte=cls.horizon(agenda.day))
+            .exclude(status='Done')
+            .values_list('id', 'due_date')
+        )
+        entries = [
+            AgendaEntry(todo_id=pk, user=user, due_date=due_date, bucket=agenda.bucket_for(due_date))
+            for pk, due_date in todos
+        ]
+        with transaction.atomic(using=db):
+            AgendaEntry.objects.filter(user=user).delete()
+            AgendaEntry.objects.bulk_create(entries, batch_size=1000)
+            agenda, _ = cls.objects.update_or_create(
+                user=user, defaults={'day': agenda.day, 'timezone': tz_name}
+            )
+        return agenda
+
+    @classmethod
+    def current(cls, user):
+        """
+        The user's agenda, rebuilt first when missing or built for an
+        earlier day. Returns (agenda, rebuilt); after a rebuild the entries
+        must be read from the primary.
+        """
+        agenda = cls.objects.filter(user=user).first()
+        if agenda is None or agenda.day != user_today(agenda.timezone):
+            return cls.rebuild(user), True
+        return agenda, False
+
+    @classmethod
+    def roll_over(cls, tz_name):
+        """
+        Move every agenda in a time zone that is still on an earlier day to
+        today, with set-based updates instead of per-user rebuilds. Returns
+        the number of agendas moved.
+        """
+        day = user_today(tz_name)
+        stale = cls.objects.filter(timezone=tz_name, day__lt=day)
+        users = stale.values('user')
+        with transaction.atomic():
+            entries = AgendaEntry.objects.filter(user__in=users)
+            entries.filter(due_date__lt=day).exclude(bucket=AgendaEntry.OVERDUE).update(bucket=AgendaEntry.OVERDUE)
+            entries.filter(due_date=day).exclude(bucket=AgendaEntry.TODAY).update(bucket=AgendaEntry.TODAY)
+            # Todos that the later horizon brings into view
+            arriving = (
+                Todo.objects.filter(
+                    user__in=users, due_date__gt=day, due_date__lte=cls.horizon(day), agenda_entry__isnull=True
+                )
+                .exclude(status='Done')
+                .values_list('id', 'user', 'due_date')
+            )
+            AgendaEntry.objects.bulk_create(
+                [
+                    AgendaEntry(todo_id=pk, user_id=user_id, due_date=due_date, bucket=AgendaEntry.UPCOMING)
+                    for pk, user_id, due_date in arriving
+                ],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            return stale.update(day=day)
+
+
+class AgendaEntry(models.Model):
+    """An open, dated todo in its user's overdue, today or upcoming bucket, kept current by Todo signals"""
+    OVERDUE = 'overdue'
+    TODAY = 'today'
+    UPCOMING = 'upcoming'
+    BUCKET_CHOICES = [
+        (OVERDUE, 'Overdue'),
+        (TODAY, 'Today'),
+        (UPCOMING, 'Upcoming'),
+    ]
+
+    todo = models.OneToOneField(Todo, on_delete=models.CASCADE, primary_key=True, related_name='agenda_entry')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='agenda_entries')
+    bucket = models.CharField(max_length=10, choices=BUCKET_CHOICES)
+    due_date = models.DateField()
+
+    class Meta:
+        verbose_name = 'Agenda Entry'
+        verbose_name_plural = 'Agenda Entries'
+        indexes = [
+            models.Index(fields=['user', 'bucket', 'due_date']),
+        ]
+
+    def __str__(self):
+        return f"Todo {self.todo_id} ({self.bucket})"
+
+    @classmethod
+    def place(cls, todo, created=False):
+        """Insert, move or remove the entry of a todo that was just saved"""
+        agenda = None
+        if todo.user_id and todo.due_date and todo.status != 'Done':
+            # Users without an agenda get one built on their next read
+            agenda = Agenda.objects.filter(user_id=todo.user_id).first()
+        bucket = agenda.bucket_for(todo.due_date) if agenda else None
+        if bucket is not None:
+            cls.objects.bulk_create(
+                [cls(todo=todo, user_id=todo.user_id, due_date=todo.due_date, bucket=bucket)],
+                update_conflicts=True, unique_fields=['todo'], update_fields=['user', 'due_date', 'bucket'],
+            )
+        elif not created:
+            cls.objects.filter(todo=todo).delete()
+
+    @classmethod
+    def place_many(cls, user, todo_ids):
+        """place() for todos a bulk write created or changed, in a fixed number of queries"""
+        if not todo_ids:
+            return
+        agenda = Agenda.objects.filter(user=user).first()
+        if agenda is None:
+            return
+        todos = (
+            Todo.objects.filter(pk__in=todo_ids, user=user, due_date__lte=agenda.horizon(agenda.day))
+            .exclude(status='Done')
+            .values_list('id', 'due_date')
+        )
+        entries = [
+            cls(todo_id=pk, user=user, due_date=due_date, bucket=agenda.bucket_for(due_date))
+            for pk, due_date in todos
+        ]
+        with transaction.atomic():
+            cls.objects.filter(todo_id__in=todo_ids).delete()
+            cls.objects.bulk_create(entries, batch_size=1000)
+
+    @classmethod
+    def todos_for(cls, user):
+        """The user's agenda todos, soonest first, annotated with bucket and overdue"""
+        return (
+            Todo.objects.filter(agenda_entry__user=user)
+            .annotate(
+                bucket=F('agenda_entry__bucket'),
+                overdue=ExpressionWrapper(Q(agenda_entry__bucket=cls.OVERDUE), output_field=BooleanField()),
+            )
+            .order_by('agenda_entry__due_date', 'id')
+        )
+
+
+@receiver(post_save, sender=Todo)
+def update_agenda_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or bulk_in_progress():
+        return
+    key = instance.agenda_key()
+    # Edits to other fields leave the entry as it is
+    if key == getattr(instance, '_loaded_agenda_key', None):
+        return
+    instance._loaded_agenda_key = key
+    AgendaEntry.place(instance, created=created)
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def update_agenda_after_bulk(sender, user, created=(), updated=(), **kwargs):
+    # Deleted todos took their entries with them
+    AgendaEntry.place_many(user, [*created, *updated])
+
+
+@receiver(post_save, sender=Profile)
+def rebuild_agenda_on_timezone_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw or not instance.user_id:
+        return
+    if Agenda.objects.filter(user_id=instance.user_id).exclude(timezone=instance.timezone).exists():
+        Agenda.rebuild(instance.user)
+
+
+class Job(models.Model):
+    """A unit of background work, claimed and run by manage.py run_worker (see todo.jobs)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    # Lease of the worker running the job; it is reclaimed once locked_until passes
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    progress = models.JSONField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['status', 'locked_until']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class JobInput(models.Model):
+    """
+    A file a queued job reads, such as an import upload, stored as ordered
+    parts so neither the upload nor the worker holds all of it in memory.
+    It lives in the database because the worker may run on another host than
+    the web process that received it; jobs.run drops it once the job is finished.
+    """
+    PART_SIZE = 1024 * 1024
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='inputs')
+    part = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+
+    class Meta:
+        verbose_name = 'Job Input'
+        verbose_name_plural = 'Job Inputs'
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'part'], name='todo_jobinput_job_part_uniq'),
+        ]
+
+    @classmethod
+    def save_file(cls, job, file):
+        """Copy an uploaded file into the job's input a part at a time"""
+        # Not file.chunks(): in-memory uploads ignore its chunk size
+        file.seek(0)
+        for part, data in enumerate(iter(lambda: file.read(cls.PART_SIZE), b'')):
+            cls.objects.create(job=job, part=part, data=data)
+
+    @classmethod
+    def open(cls, job):
+        """A binary file object reading the job's input back a part at a time"""
+        return io.BufferedReader(JobInputReader(job))
+
+    def __str__(self):
+        return f"Input of job {self.job_id}, part {self.part}"
+
+
+class JobInputReader(io.RawIOBase):
+    """Raw reader over a job's input parts, fetching one part per query"""
+
+    def __init__(self, job):
+        self.parts = iter(JobInput.objects.filter(job=job).order_by('part').values_list('pk', flat=True))
+        self.pending = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            pk = next(self.parts, None)
+            if pk is None:
+                return 0
+            self.pending = memoryview(bytes(JobInput.objects.values_list('data', flat=True).get(pk=pk)))
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
@@ -0,0 +1,176 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(position):
+    """Encode a JSON-serializable position as an opaque URL-safe token"""
+    raw = json.dumps(position, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor, or raise ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        return json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError(str(exc))
+
+
+class TodoCursorPagination(BasePagination):
+    """
+    Keyset pagination over (due_date, id), newest due date first.
+
+    Undated todos sort before dated ones, which is what Postgres does for a
+    plain descending sort and lets it walk the (user, due_date, id) index
+    backwards. Pages never issue OFFSET or COUNT(*).
+    """
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    ordering = (F('due_date').desc(nulls_first=True), F('id').desc())
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_position(self, item):
+        """Return the (due_date, id) keyset position of a model instance or values() row"""
+        if isinstance(item, dict):
+            due_date, pk = item['due_date'], item['id']
+        else:
+            due_date, pk = item.due_date, item.pk
+        return [due_date.isoformat() if due_date else None, pk]
+
+    def decode_position(self, token):
+        try:
+            due_date, pk = decode_cursor(token)
+            return (date.fromisoformat(due_date) if due_date else None), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def filter_after(self, due_date, pk):
+        """Rows strictly after the given position in the pagination ordering"""
+        if due_date is None:
+            return Q(due_date__isnull=True, id__lt=pk) | Q(due_date__isnull=False)
+        return Q(due_date__lte=due_date) & (Q(due_date__lt=due_date) | Q(id__lt=pk))
+
+    def page_queryset(self, queryset, request):
+        """The rows of the requested page, plus one extra row to learn whether another page exists"""
+        self.request = request
+        self.current_page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self.filter_after(*self.decode_position(token)))
+        return queryset[:self.current_page_size + 1]
+
+    def trim_page(self, page):
+        self.next_position = None
+        if len(page) > self.current_page_size:
+            page = page[:self.current_page_size]
+            self.next_position = self.get_position(page[-1])
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.trim_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async paginate_queryset"""
+        return self.trim_page([item async for item in self.page_queryset(queryset, request)])
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(self.next_position))
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def estimated_row_count(model, using='default'):
+    """The planner's row estimate for a model's table (Postgres reltuples), or None where unavailable"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    # -1 means the table has never been vacuumed or analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over very large tables.
+
+    Unfiltered querysets use the Postgres planner estimate once the table is
+    past count_limit rows. Filtered ones count at most count_limit rows, via
+    COUNT(*) over a LIMITed subquery, and cache the result for cache_timeout
+    seconds. A count never scans more than count_limit rows, so pages past
+    count_limit / per_page are not linked.
+    """
+    count_limit = 100_000
+    cache_timeout = 60
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.count_limit:
+                return estimate
+
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        key = 'todo:admin-count:' + hashlib.md5(f'{sql}|{params}'.encode(), usedforsecurity=False).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by()[:self.count_limit].count()
+            cache.set(key, count, self.cache_timeout)
+        return count
@@ -0,0 +1,174 @@
+"""
+Lazy expansion of recurring todo series into dated occurrences.
+
+Supports the RRULE subset stored on TodoSeries: FREQ=DAILY/WEEKLY/MONTHLY/
+YEARLY with INTERVAL, BYDAY for weekly series, COUNT and UNTIL. Daily and
+weekly rules jump straight to the requested window; monthly and yearly rules
+walk from the start date, which is at most a few hundred steps. Expanded
+dates are cached per (series, version, window), where the version is the
+series' updated_at, so editing a series invalidates its cached windows.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import TodoSeries, TodoSeriesException
+
+EXPANSION_CACHE_TIMEOUT = 60 * 60
+
+
+def _last_date(series, end):
+    return min(end, series.until) if series.until else end
+
+
+def _within_count(series, index):
+    return series.count is None or index < series.count
+
+
+def _expand_daily(series, start, end):
+    step = series.interval
+    first = max(0, -(-(start - series.start_date).days // step))
+    last = _last_date(series, end)
+    index = first
+    current = series.start_date + timedelta(days=index * step)
+    while current <= last and _within_count(series, index):
+        yield current
+        index += 1
+        current += timedelta(days=step)
+
+
+def _expand_weekly(series, start, end):
+    weekdays = series.weekdays
+    week0 = series.start_date - timedelta(days=series.start_date.weekday())
+    first_week = [week0 + timedelta(days=d) for d in weekdays if week0 + timedelta(days=d) >= series.start_date]
+    last = _last_date(series, end)
+
+    # j counts weeks that recur (every `interval` weeks from the start week)
+    j = max(0, ((start - week0).days // 7) // series.interval)
+    index = 0 if j == 0 else len(first_week) + (j - 1) * len(weekdays)
+    while True:
+        week = week0 + timedelta(weeks=j * series.interval)
+        if week > last:
+            return
+        days = first_week if j == 0 else [week + timedelta(days=d) for d in weekdays]
+        for current in days:
+            if current > last or not _within_count(series, index):
+                return
+            if current >= start:
+                yield current
+            index += 1
+        j += 1
+
+
+def _expand_monthly(series, start, end, months_per_step):
+    last = _last_date(series, end)
+    anchor = series.start_date
+    index = 0
+    step = 0
+    while True:
+        month_index = anchor.month - 1 + step * months_per_step
+        year, month = anchor.year + month_index // 12, month_index % 12 + 1
+        if date(year, month, 1) > last:
+            return
+        step += 1
+        # Months without the anchor day (e.g. the 31st, Feb 29th) are skipped, as in RFC 5545
+        if anchor.day > calendar.monthrange(year, month)[1]:
+            continue
+        if not _within_count(series, index):
+            return
+        current = date(year, month, anchor.day)
+        if start <= current <= last:
+            yield current
+        index += 1
+
+
+def expand(series, start, end):
+    """Occurrence dates of a series between start and end, inclusive"""
+    if end < series.start_date or (series.until and start > series.until):
+        return []
+    start = max(start, series.start_date)
+    if series.frequency == 'DAILY':
+        dates = _expand_daily(series, start, end)
+    elif series.frequency == 'WEEKLY':
+        dates = _expand_weekly(series, start, end)
+    elif series.frequency == 'MONTHLY':
+        dates = _expand_monthly(series, start, end, series.interval)
+    else:
+        dates = _expand_monthly(series, start, end, 12 * series.interval)
+    return list(dates)
+
+
+def expansion_cache_key(series, start, end):
+    return f'todo:series:{series.pk}:{series.updated_at.timestamp()}:{start.isoformat()}:{end.isoformat()}'
+
+
+def cached_expand(series, start, end):
+    """expand() memoized per (series, version, window)"""
+    key = expansion_cache_key(series, start, end)
+    dates = cache.get(key)
+    if dates is None:
+        dates = expand(series, start, end)
+        cache.set(key, dates, EXPANSION_CACHE_TIMEOUT)
+    return dates
+
+
+def is_occurrence(series, day):
+    return day in expand(series, day, day)
+
+
+def occurrences(user, start, end):
+    """
+    Materialize a user's series occurrences that fall between start and end.
+
+    Reads the series overlapping the window and their exceptions for it in
+    two queries; nothing is stored for ordinary occurrences.
+    """
+    series_list = list(
+        TodoSeries.objects.filter(user=user, start_date__lte=end)
+        .filter(Q(until__isnull=True) | Q(until__gte=start))
+    )
+    # Exceptions may also move an occurrence from outside the window into it
+    exceptions = {
+        (exception.series_id, exception.occurrence_date): exception
+        for exception in TodoSeriesException.objects.filter(series__user=user).filter(
+            Q(occurrence_date__range=(start, end)) | Q(moved_to__range=(start, end))
+        )
+    }
+    series_by_id = {series.pk: series for series in series_list}
+    moved_in = {series_id for series_id, _ in exceptions} - set(series_by_id)
+    if moved_in:
+        series_by_id.update(TodoSeries.objects.in_bulk(moved_in))
+
+    items = []
+    seen = set()
+    for series in series_by_id.values():
+        for day in cached_expand(series, start, end):
+            seen.add((series.pk, day))
+            items.append(_occurrence(series, day, exceptions.get((series.pk, day))))
+    for (series_id, day), exception in exceptions.items():
+        if (series_id, day) not in seen and is_occurrence(series_by_id[series_id], day):
+            items.append(_occurrence(series_by_id[series_id], day, exception))
+
+    items = [item for item in items if item is not None and start <= item['date'] <= end]
+    items.sort(key=lambda item: (item['date'], item['series']))
+    return items
+
+
+def _occurrence(series, day, exception):
+    if exception is not None and exception.cancelled:
+        return None
+    overrides = exception or TodoSeriesException()
+    return {
+        'series': series.pk,
+        'occurrence_date': day,
+        'date': overrides.moved_to or day,
+        'title': overrides.title or series.title,
+        'description': overrides.description if overrides.description is not None else series.description,
+        'status': overrides.status or 'Open',
+        'priority': overrides.priority or series.priority,
+        'category': series.category,
+        'custom_category': series.custom_category,
+        'overridden': exception is not None,
+    }
@@ -0,0 +1,56 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+orjson encodes dates and datetimes itself (in the same ISO 8601 form DRF's
+fields produce, with UTC as 'Z'), so serializers that know the active
+renderer is native can hand it date/datetime objects instead of formatting
+every value in Python. Without orjson both classes behave exactly like
+DRF's JSONRenderer and JSONParser.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+# Types orjson has no encoding for (Decimal, lazy strings, querysets, ...)
+# go through DRF's encoder, which is what JSONRenderer would have done
+_fallback_encoder = JSONEncoder()
+
+
+def dumps(data, indent=False):
+    """Encode data as UTF-8 JSON bytes with orjson, or DRF's encoder without it"""
+    if orjson is None:
+        return JSONRenderer().render(data, renderer_context={'indent': 2 if indent else None})
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(data, default=_fallback_encoder.default, option=option)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson, falling back to DRF's encoder without it"""
+    native_datetimes = orjson is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson only indents by two spaces, which is fine for ?indent and the browsable API
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return dumps(data, indent=bool(indent))
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with orjson, falling back to the json module without it"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,124 @@
+"""
+Read-replica routing.
+
+Queries go to the primary ('default') unless they run inside
+replica_reads(), which the read-only endpoints enter once per request.
+Within it every read goes to one replica picked for that request. Users who
+wrote in the last TODO_READ_YOUR_WRITES_SECONDS are kept on the primary, so
+they always see their own changes; that window must be longer than the
+replicas' lag. With no replicas configured everything stays on the primary.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Profile, Todo
+from .signals import bulk_in_progress, todos_bulk_changed
+
+User = get_user_model()
+
+_read_alias = ContextVar('todo_read_alias', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def _sticky_key(user_id):
+    return f'todo:read-primary:{user_id}'
+
+
+def choose_replica(user_id):
+    """The replica to read a user's data from, or None to use the primary"""
+    replicas = replica_aliases()
+    if not replicas or cache.get(_sticky_key(user_id)):
+        return None
+    return random.choice(replicas)
+
+
+async def achoose_replica(user_id):
+    """Async choose_replica"""
+    replicas = replica_aliases()
+    if not replicas or await cache.aget(_sticky_key(user_id)):
+        return None
+    return random.choice(replicas)
+
+
+@contextmanager
+def replica_reads(alias):
+    """Send reads made inside the block to alias (None keeps them on the primary)"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def reads_from_replica(view):
+    """Run a read-only function view, called with the request first, against a replica"""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        with replica_reads(choose_replica(request.user.pk)):
+            return view(request, *args, **kwargs)
+    return wrapped
+
+
+def stick_to_primary(user_id):
+    """Keep the user's reads on the primary until the replicas have this commit"""
+    if user_id and replica_aliases():
+        transaction.on_commit(
+            lambda: cache.set(_sticky_key(user_id), True, settings.TODO_READ_YOUR_WRITES_SECONDS)
+        )
+
+
+class ReplicaRouter:
+    """Writes, migrations and reads outside replica_reads() use the primary"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def stick_after_todo_write(sender, instance, **kwargs):
+    if not bulk_in_progress():
+        stick_to_primary(instance.user_id)
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def stick_after_bulk_todo_write(sender, user, **kwargs):
+    stick_to_primary(user.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def stick_after_profile_write(sender, instance, **kwargs):
+    stick_to_primary(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def stick_after_user_write(sender, instance, update_fields=None, **kwargs):
+    # Logging in saves last_login, which none of the replica-read endpoints return
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        stick_to_primary(instance.pk)
@@ -0,0 +1,194 @@
+"""
+Ranked full-text search over todo titles and descriptions.
+
+Postgres matches a to_tsvector expression covered by a GIN index (created
+in migration 0008). SQLite uses an FTS5 shadow table, todo_todo_fts, that
+these signal handlers keep in sync. Other databases, or SQLite builds
+without FTS5, fall back to an unranked icontains scan.
+"""
+import re
+
+from django.db import connection, connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Todo
+from .signals import bulk_in_progress, todos_bulk_changed
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'todo_todo_fts'
+GIN_INDEX_NAME = 'todo_todo_search_gin'
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('title', 'description', config=SEARCH_CONFIG)
+
+
+def search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    return GinIndex(search_vector(), name=GIN_INDEX_NAME)
+
+
+def fts_available(using=connection):
+    """True when the SQLite FTS5 shadow table exists on this connection's database"""
+    if using.vendor != 'sqlite':
+        return False
+    # Introspect once per database file rather than on every save
+    known = using.__dict__.setdefault('_todo_fts_tables', {})
+    name = using.settings_dict['NAME']
+    if name not in known:
+        known[name] = FTS_TABLE in using.introspection.table_names()
+    return known[name]
+
+
+def write_connection():
+    """The connection todo rows, and so their FTS5 rows, are written through"""
+    return connections[router.db_for_write(Todo)]
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query with the web search syntax Postgres
+    accepts: every word must match, as a prefix, unless words are joined by
+    or; "quoted words" match as a phrase and -word excludes a word. Each
+    word is quoted, so FTS5 syntax in the text is matched literally.
+    """
+    terms, excluded = [], []
+    for minus, phrase, word in re.findall(r'(-?)(?:"([^"]*)"?|(\w+))', text):
+        if word.lower() == 'or' and not minus:
+            # Like websearch_to_tsquery, an or with nothing on one side is dropped
+            if terms and terms[-1] != 'OR':
+                terms.append('OR')
+            continue
+        words = re.findall(r'\w+', phrase) if phrase else [word]
+        if not any(words):
+            continue
+        term = f'"{" ".join(words)}"' if phrase else f'"{word}"*'
+        (excluded if minus else terms).append(term)
+    if terms and terms[-1] == 'OR':
+        terms.pop()
+    if not terms:
+        # FTS5 cannot match on exclusions alone
+        return ''
+    return ' NOT '.join([f'({" ".join(terms)})'] + excluded)
+
+
+def search_todos(text, limit, user=None):
+    """Return up to `limit` todos matching `text`, best match first, optionally for one user"""
+    queryset = Todo.objects.all() if user is None else Todo.objects.filter(user=user)
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        vector = search_vector()
+        return list(
+            queryset.annotate(search=vector)
+            .filter(search=query)
+            .annotate(rank=SearchRank(vector, query))
+            .order_by('-rank', '-id')[:limit]
+        )
+
+    if fts_available():
+        match = fts_query(text)
+        if not match:
+            return []
+        sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        params = [match]
+        if user is not None:
+            sql += ' AND user_id = %s'
+            params.append(user.pk)
+        sql += f' ORDER BY bm25({FTS_TABLE}) LIMIT %s'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            ranked = [row[0] for row in cursor.fetchall()]
+        todos = queryset.in_bulk(ranked)
+        return [todos[pk] for pk in ranked if pk in todos]
+
+    return list(
+        queryset.filter(Q(title__icontains=text) | Q(description__icontains=text)).order_by('-id')[:limit]
+    )
+
+
+def filter_search(queryset, text):
+    """Narrow a todo queryset to matches for text, unranked, through the same index as search_todos"""
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.annotate(search=search_vector()).filter(search=query)
+
+    if fts_available():
+        match = fts_query(text)
+        if not match:
+            return queryset.none()
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+
+
+def index_todos(ids):
+    """(Re)write the FTS5 rows of the given todos from the todo table"""
+    using = write_connection()
+    if not ids or not fts_available(using):
+        return
+    placeholders = ', '.join(['%s'] * len(ids))
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', list(ids))
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, user_id) '
+            f"SELECT id, title, COALESCE(description, ''), user_id FROM todo_todo WHERE id IN ({placeholders})",
+            list(ids)
+        )
+
+
+def unindex_todos(ids):
+    using = write_connection()
+    if not ids or not fts_available(using):
+        return
+    placeholders = ', '.join(['%s'] * len(ids))
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', list(ids))
+
+
+def rebuild_fts_index():
+    """Repopulate the whole FTS5 table; returns the number of indexed todos, or None without FTS5"""
+    using = write_connection()
+    if not fts_available(using):
+        return None
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, user_id) '
+            f"SELECT id, title, COALESCE(description, ''), user_id FROM todo_todo"
+        )
+        return cursor.rowcount
+
+
+@receiver(post_save, sender=Todo)
+def index_saved_todo(sender, instance, created, raw=False, **kwargs):
+    if raw or bulk_in_progress():
+        return
+    key = instance.search_key()
+    # Edits to other fields leave the FTS5 row as it is
+    if not created and key == getattr(instance, '_loaded_search_key', None):
+        return
+    instance._loaded_search_key = key
+    index_todos([instance.pk])
+
+
+@receiver(post_delete, sender=Todo)
+def unindex_deleted_todo(sender, instance, **kwargs):
+    if not bulk_in_progress():
+        unindex_todos([instance.pk])
+
+
+@receiver(todos_bulk_changed, sender=Todo)
+def reindex_bulk_changes(sender, created=(), updated=(), deleted=(), **kwargs):
+    changed = list(created) + list(updated)
+    # Stay under SQLite's bound parameter limit
+    for start in range(0, len(changed), 500):
+        index_todos(changed[start:start + 500])
+    for start in range(0, len(deleted), 500):
+        unindex_todos(deleted[start:start + 500])
@@ -1,17 +1,44 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import Todo, Profile
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from . import metrics
+from .authentication import PrecheckedRefreshToken
+from .models import Job, Todo, TodoSeries, TodoSeriesException, Profile
 
 User = get_user_model()
 
-class ProfileSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """Count time spent producing .data towards the request's serializer metrics"""
+    @property
+    def data(self):
+        with metrics.timer('serializer'):
+            return super().data
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
-        fields = ['full_name', 'bio', 'image', 'verified']
+        fields = ['full_name', 'bio', 'image', 'verified', 'timezone']
         read_only_fields = ['verified']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     profile = ProfileSerializer(read_only=True)
 
     class Meta:
@@ -29,12 +56,66 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         return token
 
     def validate(self, attrs):
+        # The authentication backend loads the profile with the user, so this adds no query
         data = super().validate(attrs)
         data.update({
             'user': UserSerializer(self.user).data
         })
         return data
 
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer with fewer round trips under rotation and blacklisting.
+
+    The blacklist check, the outstanding token and the user come from one
+    query, and rotation writes the outstanding rows in a single INSERT and
+    blacklists the old token in one transaction. A concurrent refresh of the
+    same token fails on the unique blacklist row instead of both succeeding.
+    """
+    token_class = PrecheckedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        jti = refresh[api_settings.JTI_CLAIM]
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+
+        outstanding = OutstandingToken.objects.select_related('user', 'blacklistedtoken').filter(jti=jti).first()
+        if outstanding is not None and hasattr(outstanding, 'blacklistedtoken'):
+            raise TokenError(_("Token is blacklisted"))
+        if outstanding is not None and outstanding.user is not None:
+            user = outstanding.user
+        else:
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+        if not api_settings.ROTATE_REFRESH_TOKENS:
+            return data
+
+        if outstanding is None:
+            outstanding = OutstandingToken(
+                user=user, jti=jti, token=attrs['refresh'], created_at=refresh.current_time,
+                expires_at=datetime_from_epoch(refresh['exp']),
+            )
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            rotated = OutstandingToken(
+                user=user, jti=refresh[api_settings.JTI_CLAIM], token=data['refresh'],
+                created_at=refresh.current_time, expires_at=datetime_from_epoch(refresh['exp']),
+            )
+            try:
+                with transaction.atomic():
+                    OutstandingToken.objects.bulk_create([outstanding, rotated] if outstanding.pk is None else [rotated])
+                    BlacklistedToken.objects.create(token=outstanding)
+            except IntegrityError:
+                raise TokenError(_("Token is blacklisted"))
+        return data
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
         write_only=True,
@@ -53,7 +134,8 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['email', 'username', 'password', 'password2']
         extra_kwargs = {
             'email': {'required': True},
-            'username': {'required': True}
+            # Uniqueness is checked case-insensitively in validate(), in the same query as email
+            'username': {'required': True, 'validators': [UnicodeUsernameValidator()]}
         }
 
     def validate_email(self, value):
@@ -61,15 +143,11 @@ class RegisterSerializer(serializers.ModelSerializer):
             validate_email(value)
         except ValidationError:
             raise serializers.ValidationError("Enter a valid email address")
-        if User.objects.filter(email__iexact=value).exists():
-            raise serializers.ValidationError("This email is already in use")
         return value
 
     def validate_username(self, value):
         if len(value) < 3:
             raise serializers.ValidationError("Username must be at least 3 characters")
-        if User.objects.filter(username__iexact=value).exists():
-            raise serializers.ValidationError("This username is already taken")
         return value
 
     def validate(self, data):
@@ -77,16 +155,46 @@ class RegisterSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 "password2": "Passwords do not match"
             })
+        errors = self.find_conflicts(data['username'], data['email'])
+        if errors:
+            raise serializers.ValidationError(errors)
         return data
 
+    def find_conflicts(self, username, email):
+        """
+        Field errors for users that already have this username or email, ignoring case.
+
+        One query, matching the Lower() expressions of the unique indexes in
+        USER_LOWER_UNIQUE_CONSTRAINTS so each side of the OR is an index lookup.
+        """
+        username_taken = Exact(Lower('username'), Lower(Value(username)))
+        email_taken = Exact(Lower('email'), Lower(Value(email)))
+        matches = (
+            User.objects
+            .filter(Q(username_taken) | (Q(email_taken) & ~Q(email='')))
+            .values_list(username_taken, email_taken)[:2]
+        )
+        errors = {}
+        for username_match, email_match in matches:
+            if username_match:
+                errors['username'] = "This username is already taken"
+            if email_match:
+                errors['email'] = "This email is already in use"
+        return errors
+
     def create(self, validated_data):
         validated_data.pop('password2')
-        user = User.objects.create_user(**validated_data)
-        return user
-
+        try:
+            # The profile is created by the post_save receiver, in the same transaction
+            with transaction.atomic():
+                return User.objects.create_user(**validated_data)
+        except IntegrityError:
+            # A concurrent registration took the name or address after validate()
+            errors = self.find_conflicts(validated_data['username'], validated_data['email'])
+            raise serializers.ValidationError(errors or "This account already exists")
 
 
-class TodoSerializer(serializers.ModelSerializer):
+class TodoSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
     overdue = serializers.SerializerMethodField()
@@ -99,9 +207,11 @@ class TodoSerializer(serializers.ModelSerializer):
             'due_date', 'created_at', 'updated_at', 'overdue', 'user'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at', 'overdue']
+        list_serializer_class = TimedListSerializer
 
     def get_overdue(self, obj):
-        return obj.is_overdue
+        today = self.context.get('today')
+        return obj.is_overdue if today is None else obj.is_overdue_on(today)
 
     def validate_status(self, value):
         if value not in dict(Todo.STATUS_CHOICES).keys():
@@ -125,4 +235,178 @@ class TodoSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 "custom_category": "Custom category is required when 'Other' is selected"
             })
-        return data
\ No newline at end of file
+        return data
+
+
+class TodoListSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only fast path for todo lists with the same output as TodoSerializer.
+
+    Works on values() rows annotated with TodoQuerySet.with_overdue, so no
+    model instances are built, overdue comes from SQL, and display labels
+    come from lookup tables instead of get_FOO_display calls per row.
+    """
+    row_fields = (
+        'id', 'title', 'description', 'status', 'priority', 'category', 'custom_category',
+        'due_date', 'created_at', 'updated_at', 'overdue', 'user'
+    )
+    status_labels = dict(Todo.STATUS_CHOICES)
+    priority_labels = dict(Todo.PRIORITY_CHOICES)
+
+    class Meta:
+        list_serializer_class = TimedListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A list shares one child serializer, so this runs once per response
+        self.tz = timezone.get_current_timezone()
+        # Set by views whose renderer encodes date/datetime objects itself
+        self.native_datetimes = self.context.get('native_datetimes', False)
+
+    def format_date(self, value):
+        if value is None or self.native_datetimes:
+            return value
+        return value.isoformat()
+
+    def format_datetime(self, value):
+        if value is None:
+            return None
+        value = value.astimezone(self.tz)
+        if self.native_datetimes:
+            return value
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'status': row['status'],
+            'status_display': self.status_labels.get(row['status'], row['status']),
+            'priority': row['priority'],
+            'priority_display': self.priority_labels.get(row['priority'], row['priority']),
+            'category': row['category'],
+            'custom_category': row['custom_category'],
+            'due_date': self.format_date(row['due_date']),
+            'created_at': self.format_datetime(row['created_at']),
+            'updated_at': self.format_datetime(row['updated_at']),
+            'overdue': row['overdue'],
+            'user': row['user'],
+        }
+
+class TodoRangeQuerySerializer(serializers.Serializer):
+    """Query parameters for the calendar date-range mode of the todo list"""
+    MAX_RANGE_DAYS = 366
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    status = serializers.ChoiceField(choices=Todo.STATUS_CHOICES, required=False)
+    priority = serializers.ChoiceField(choices=Todo.PRIORITY_CHOICES, required=False)
+    category = serializers.ChoiceField(choices=Todo.CATEGORY_CHOICES, required=False)
+
+    def validate(self, data):
+        if data['end'] < data['start']:
+            raise serializers.ValidationError({"end": "End date must not be before start date"})
+        if (data['end'] - data['start']).days >= self.MAX_RANGE_DAYS:
+            raise serializers.ValidationError({
+                "end": f"Date range cannot exceed {self.MAX_RANGE_DAYS} days"
+            })
+        return data
+
+
+class TodoBulkSerializer(serializers.Serializer):
+    """Envelope for batched todo writes; the items themselves are validated with TodoSerializer"""
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate_update(self, value):
+        id_field = serializers.IntegerField()
+        for item in value:
+            if 'id' not in item:
+                raise serializers.ValidationError("Every update needs the id of the todo to change")
+            item['id'] = id_field.run_validation(item['id'])
+        if len({item['id'] for item in value}) != len(value):
+            raise serializers.ValidationError("Each todo can only be updated once per request")
+        return value
+
+    def validate(self, data):
+        limit = settings.TODO_BULK_MAX_OPERATIONS
+        count = len(data['create']) + len(data['update']) + len(data['delete'])
+        if count == 0:
+            raise serializers.ValidationError("No operations given")
+        if count > limit:
+            raise serializers.ValidationError(f"A bulk request can contain at most {limit} operations")
+        return data
+
+
+class TodoSeriesSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = TodoSeries
+        fields = [
+            'id', 'title', 'description', 'priority', 'category', 'custom_category',
+            'start_date', 'frequency', 'interval', 'by_weekday', 'count', 'until',
+            'created_at', 'updated_at', 'user'
+        ]
+        read_only_fields = ['user', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
+
+    def validate_by_weekday(self, value):
+        codes = [code.strip().upper() for code in value.split(',') if code.strip()]
+        invalid = [code for code in codes if code not in TodoSeries.WEEKDAY_CODES]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid weekday codes: {', '.join(invalid)}")
+        return ','.join(dict.fromkeys(codes))
+
+    def validate_interval(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Interval must be at least 1")
+        return value
+
+    def validate(self, data):
+        def current(field):
+            if field in data:
+                return data[field]
+            return getattr(self.instance, field, None)
+
+        if current('category') == 'Other' and not current('custom_category'):
+            raise serializers.ValidationError({
+                "custom_category": "Custom category is required when 'Other' is selected"
+            })
+        if current('until') and current('start_date') and current('until') < current('start_date'):
+            raise serializers.ValidationError({"until": "Until must not be before the start date"})
+        if current('by_weekday') and current('frequency') != 'WEEKLY':
+            raise serializers.ValidationError({"by_weekday": "Weekdays only apply to weekly series"})
+        return data
+
+
+class TodoSeriesExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TodoSeriesException
+        fields = [
+            'occurrence_date', 'cancelled', 'moved_to', 'status', 'title', 'description',
+            'priority', 'updated_at'
+        ]
+        read_only_fields = ['updated_at']
+        # Upserts are keyed on (series, occurrence_date), so skip the unique-together check
+        validators = []
+
+
+class JobSerializer(serializers.ModelSerializer):
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'name', 'status', 'attempts', 'max_attempts', 'progress', 'result', 'error',
+            'run_at', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_error(self, obj):
+        """Last line of the traceback; the full one stays in the admin"""
+        lines = obj.error.strip().splitlines()
+        return lines[-1] if lines else None
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.dispatch import Signal
+
+# Sent by bulk write paths that bypass per-row model signals, once per batch,
+# with keyword arguments user, created, updated and deleted (lists of todo ids)
+# and optionally counter_deltas, the batch's TaskCounter.status_deltas()
+todos_bulk_changed = Signal()
+
+_bulk_in_progress = ContextVar('todo_bulk_in_progress', default=False)
+
+
+@contextmanager
+def bulk_todo_changes():
+    """Silence per-row Todo signal handlers while a bulk operation runs"""
+    token = _bulk_in_progress.set(True)
+    try:
+        yield
+    finally:
+        _bulk_in_progress.reset(token)
+
+
+def bulk_in_progress():
+    return _bulk_in_progress.get()
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Todo, TodoTombstone
+from .pagination import decode_cursor, encode_cursor
+
+# Watermark value that asks for every todo from the beginning
+INITIAL_WATERMARK = '0'
+
+
+class WatermarkExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Sync watermark is older than the tombstone retention window; do a full sync"
+    default_code = 'watermark_expired'
+
+
+def tombstone_cutoff():
+    return timezone.now() - timedelta(days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+
+
+def _decode_position(position):
+    if position is None:
+        return None
+    moment, pk = position
+    moment = parse_datetime(moment)
+    if moment is None:
+        raise ValueError("Invalid timestamp")
+    return moment, int(pk)
+
+
+def _encode_position(moment, pk):
+    return [moment.isoformat(), pk]
+
+
+def parse_watermark(token):
+    """Return the (todo, tombstone) keyset positions stored in a watermark"""
+    if token == INITIAL_WATERMARK:
+        return None, None
+    try:
+        data = decode_cursor(token)
+        issued_at = parse_datetime(data['at'])
+        todo_position = _decode_position(data['t'])
+        tombstone_position = _decode_position(data['d'])
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError({"since": "Invalid sync watermark"})
+    if issued_at is None or issued_at < tombstone_cutoff():
+        raise WatermarkExpired()
+    return todo_position, tombstone_position
+
+
+def _after(field, position):
+    moment, pk = position
+    return Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': pk})
+
+
+def changes_since(user, token, limit):
+    """
+    Todos changed and todo ids deleted after a watermark, oldest first.
+
+    Returns (todos, deleted_ids, watermark, has_more). Both streams are read
+    with keyset conditions on (updated_at, id) and (deleted_at, id).
+
+    Timestamps are taken when a row is saved, not when its transaction
+    commits, so a slow transaction can commit a row older than a position
+    already handed out. Once a stream is caught up its position is held back
+    TODO_SYNC_SAFETY_MARGIN seconds, and the next sync sends the rows of
+    that window again; clients apply changes by id, so repeats are harmless.
+    """
+    todo_position, tombstone_position = parse_watermark(token)
+
+    todos = Todo.objects.filter(user=user)
+    if todo_position:
+        todos = todos.filter(_after('updated_at', todo_position))
+    todos = list(todos.order_by('updated_at', 'id')[:limit + 1])
+
+    tombstones = TodoTombstone.objects.filter(user=user)
+    if tombstone_position:
+        tombstones = tombstones.filter(_after('deleted_at', tombstone_position))
+    tombstones = list(
+        tombstones.order_by('deleted_at', 'id').values('id', 'todo_id', 'deleted_at')[:limit + 1]
+    )
+
+    more_todos, more_tombstones = len(todos) > limit, len(tombstones) > limit
+    todos, tombstones = todos[:limit], tombstones[:limit]
+
+    if todos:
+        todo_position = (todos[-1].updated_at, todos[-1].id)
+    if tombstones:
+        tombstone_position = (tombstones[-1]['deleted_at'], tombstones[-1]['id'])
+    now = timezone.now()
+    settled = (now - timedelta(seconds=settings.TODO_SYNC_SAFETY_MARGIN), 0)
+    if todo_position and not more_todos:
+        todo_position = min(todo_position, settled)
+    if tombstone_position and not more_tombstones:
+        tombstone_position = min(tombstone_position, settled)
+    watermark = encode_cursor({
+        'at': now.isoformat(),
+        't': _encode_position(*todo_position) if todo_position else None,
+        'd': _encode_position(*tombstone_position) if tombstone_position else None,
+    })
+    return todos, [tombstone['todo_id'] for tombstone in tombstones], watermark, more_todos or more_tombstones
+
+
+def prune_tombstones():
+    """Delete tombstones older than the retention window; returns the number removed"""
+    deleted, _ = TodoTombstone.objects.filter(deleted_at__lt=tombstone_cutoff()).delete()
+    return deleted
@@ -0,0 +1,33 @@
+"""Background tasks run by manage.py run_worker; queue them with todo.jobs.enqueue"""
+import io
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .imports import import_todos, read_records
+from .jobs import report_progress, task
+from .models import JobInput, TaskCounter
+
+User = get_user_model()
+
+
+@task('todos.import_file')
+def import_file(job, user_id, input_format):
+    """Import the file stored as the job's input"""
+    user = User.objects.get(pk=user_id)
+    # Safe to retry: rows imported by an earlier attempt are skipped by source uid
+    stream = io.TextIOWrapper(JobInput.open(job), encoding='utf-8-sig', errors='replace', newline='')
+    return import_todos(
+        user, read_records(stream, input_format), batch_size=settings.TODO_IMPORT_BATCH_SIZE,
+        progress=lambda report: report_progress(job, report),
+    )
+
+
+@task('todos.rebuild_task_counters')
+def rebuild_task_counters(job, user_ids=None):
+    """Rebuild summary counters for some users, or for everyone"""
+    if user_ids is None:
+        return {'users': TaskCounter.rebuild_all()}
+    for user in User.objects.filter(pk__in=user_ids):
+        TaskCounter.rebuild(user)
+    return {'users': len(user_ids)}
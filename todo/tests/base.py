@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from todo import throttling
+
+User = get_user_model()
+
+
+class TodoAPITestCase(APITestCase):
+    """
+    APITestCase with a logged-in user. Caches and throttle buckets are
+    cleared before each test: on_commit invalidation does not run inside
+    TestCase transactions, and rolled-back users reuse the same ids.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        throttling._local_buckets.buckets.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'S3cure-pass')
+        self.client.force_authenticate(self.user)
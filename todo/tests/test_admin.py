@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from todo.models import Todo
+
+User = get_user_model()
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'S3cure-pass')
+        self.owner = User.objects.create_user('bob', 'Bob@Example.com', 'S3cure-pass')
+        Todo.objects.create(user=self.owner, title='Buy milk', due_date='2026-03-10')
+        Todo.objects.create(user=self.admin, title='File taxes')
+        self.client.force_login(self.admin)
+
+    def titles(self, response):
+        return sorted(todo.title for todo in response.context['cl'].result_list)
+
+    def test_todo_changelist_searches_owner_email_and_text(self):
+        url = reverse('admin:todo_todo_changelist')
+        self.assertEqual(self.titles(self.client.get(url, {'q': 'bob@example.com'})), ['Buy milk'])
+        self.assertEqual(self.titles(self.client.get(url, {'q': 'taxes'})), ['File taxes'])
+        response = self.client.get(url, {'due_date__isnull': 'False'})
+        self.assertEqual(self.titles(response), ['Buy milk'])
+
+    def test_profile_changelist_searches_by_email_only(self):
+        url = reverse('admin:todo_profile_changelist')
+        response = self.client.get(url, {'q': 'BOB@example.com'})
+        self.assertEqual([profile.user for profile in response.context['cl'].result_list], [self.owner])
+        self.assertEqual(list(self.client.get(url, {'q': 'bob'}).context['cl'].result_list), [])
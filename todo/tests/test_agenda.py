@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from todo.models import Agenda, AgendaEntry, Todo
+
+from .base import TodoAPITestCase
+
+# 02:00 on 11 March in Pacific/Kiritimati (UTC+14)
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+TODAY = date(2026, 3, 10)
+
+
+def days(n):
+    return TODAY + timedelta(days=n)
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class AgendaTests(TodoAPITestCase):
+    def add(self, title, due_date, **kwargs):
+        return Todo.objects.create(user=self.user, title=title, due_date=due_date, **kwargs)
+
+    def buckets(self):
+        return dict(AgendaEntry.objects.filter(user=self.user).values_list('todo__title', 'bucket'))
+
+    def test_agenda_lists_open_dated_todos_by_bucket(self, now):
+        for n in (-2, 0, 3, 7, 8):
+            self.add(f'd{n}', days(n))
+        self.add('done', days(-1), status='Done')
+        self.add('undated', None)
+
+        data = self.client.get(reverse('todo_agenda')).json()['data']
+
+        self.assertEqual(data['date'], '2026-03-10')
+        self.assertEqual([todo['title'] for todo in data['overdue']], ['d-2'])
+        self.assertEqual([todo['title'] for todo in data['today']], ['d0'])
+        self.assertEqual([todo['title'] for todo in data['upcoming']], ['d3', 'd7'])
+        self.assertTrue(data['overdue'][0]['overdue'])
+
+    def test_saves_move_entries(self, now):
+        Agenda.rebuild(self.user)
+        todo = self.add('Call', days(1))
+        self.assertEqual(self.buckets(), {'Call': 'upcoming'})
+
+        todo.due_date = days(-1)
+        todo.save()
+        self.assertEqual(self.buckets(), {'Call': 'overdue'})
+
+        todo.status = 'Done'
+        todo.save()
+        self.assertEqual(self.buckets(), {})
+
+        todo.status = 'Open'
+        todo.due_date = days(30)
+        todo.save()
+        self.assertEqual(self.buckets(), {})
+
+    def test_unrelated_edits_skip_the_agenda(self, now):
+        Agenda.rebuild(self.user)
+        todo = self.add('Call', days(1))
+        todo.title = 'Call mum'
+        with mock.patch.object(AgendaEntry, 'place') as place:
+            todo.save()
+        place.assert_not_called()
+
+    def test_bulk_places_only_the_affected_todos(self, now):
+        Agenda.rebuild(self.user)
+        todo = self.add('Existing', days(2))
+        with mock.patch.object(Agenda, 'rebuild') as rebuild:
+            response = self.client.post(reverse('task-bulk'), {
+                'create': [{'title': 'New', 'due_date': str(days(0))}],
+                'update': [{'id': todo.pk, 'due_date': str(days(-3))}],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        rebuild.assert_not_called()
+        self.assertEqual(self.buckets(), {'New': 'today', 'Existing': 'overdue'})
+
+    def test_roll_over_matches_a_rebuild(self, now):
+        for n in (-1, 0, 1, 7, 8, 9):
+            self.add(f'd{n}', days(n))
+        Agenda.rebuild(self.user)
+
+        now.return_value = NOW + timedelta(days=1)
+        call_command('roll_over_agendas', stdout=mock.Mock())
+        rolled = self.buckets()
+        self.assertEqual(Agenda.objects.get(user=self.user).day, days(1))
+        self.assertEqual(rolled['d0'], 'overdue')
+        self.assertEqual(rolled['d1'], 'today')
+        self.assertEqual(rolled['d8'], 'upcoming')
+
+        Agenda.rebuild(self.user)
+        self.assertEqual(self.buckets(), rolled)
+
+    def test_stale_agenda_is_rebuilt_on_read(self, now):
+        self.add('Call', days(0))
+        Agenda.rebuild(self.user)
+        now.return_value = NOW + timedelta(days=1)
+
+        agenda, rebuilt = Agenda.current(self.user)
+
+        self.assertTrue(rebuilt)
+        self.assertEqual(agenda.day, days(1))
+        self.assertEqual(self.buckets(), {'Call': 'overdue'})
+
+    def test_overdue_follows_the_users_time_zone_everywhere(self, now):
+        profile = self.user.profile
+        profile.timezone = 'Pacific/Kiritimati'
+        profile.save()
+        todo = self.add('Call', TODAY)
+
+        agenda = self.client.get(reverse('todo_agenda')).json()['data']
+        self.assertEqual(agenda['date'], '2026-03-11')
+        self.assertEqual([item['title'] for item in agenda['overdue']], ['Call'])
+
+        listed = self.client.get(reverse('task-list')).json()['results']
+        self.assertTrue(listed[0]['overdue'])
+        self.assertTrue(self.client.get(reverse('task-detail', args=[todo.pk])).json()['overdue'])
+        self.assertEqual(self.client.get(reverse('task_summary')).json()['data']['overdue'], 1)
+
+    def test_time_zone_change_rebuilds_the_agenda(self, now):
+        self.add('Call', TODAY)
+        Agenda.rebuild(self.user)
+        self.assertEqual(self.buckets(), {'Call': 'today'})
+
+        profile = self.user.profile
+        profile.timezone = 'Pacific/Kiritimati'
+        profile.save()
+
+        self.assertEqual(Agenda.objects.get(user=self.user).day, days(1))
+        self.assertEqual(self.buckets(), {'Call': 'overdue'})
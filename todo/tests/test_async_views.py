@@ -0,0 +1,113 @@
+import json
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from todo.models import Todo
+
+from .base import TodoAPITestCase
+
+ASYNC_VIEWS = [
+    ('get_authenticated_user', ()),
+    ('get_user_profile', ()),
+    ('task_summary', ()),
+    ('task-list', ()),
+    ('task-detail', ('todo',)),
+]
+
+
+@override_settings(ROOT_URLCONF='backend.asgi_urls')
+class AsyncViewTests(TodoAPITestCase):
+    """The async views must answer exactly as the sync views they shadow"""
+
+    def setUp(self):
+        super().setUp()
+        self.todo = Todo.objects.create(user=self.user, title='Milk', due_date=date(2026, 3, 10))
+        Todo.objects.create(user=self.user, title='Bread', status='Done')
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def url(self, name, args=()):
+        return reverse(name, args=[self.todo.pk if arg == 'todo' else arg for arg in args])
+
+    def aget(self, path, data=None, headers=None):
+        return async_to_sync(self.async_client.get)(path, data, headers={**self.auth, **(headers or {})})
+
+    def sync_get(self, path, data=None, headers=None):
+        with override_settings(ROOT_URLCONF='backend.urls'):
+            return self.client.get(path, data, headers=headers)
+
+    def test_bodies_match_the_sync_views(self):
+        for name, args in ASYNC_VIEWS:
+            with self.subTest(view=name):
+                path = self.url(name, args)
+                response, expected = self.aget(path), self.sync_get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    def test_missing_todo_matches_the_sync_404(self):
+        path = reverse('task-detail', args=[self.todo.pk + 100])
+        response, expected = self.aget(path), self.sync_get(path)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    def test_unauthenticated_requests_match_the_sync_401(self):
+        anonymous = APIClient()
+        for name, args in ASYNC_VIEWS:
+            path = self.url(name, args)
+            for headers in [{}, {'Authorization': 'Bearer not-a-token'}]:
+                with self.subTest(view=name, headers=headers):
+                    response = async_to_sync(self.async_client.get)(path, headers=headers)
+                    with override_settings(ROOT_URLCONF='backend.urls'):
+                        expected = anonymous.get(path, headers=headers)
+                    self.assertEqual(response.status_code, 401)
+                    self.assertEqual(response['WWW-Authenticate'], expected['WWW-Authenticate'])
+                    self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    def test_matching_etag_is_304(self):
+        for name, args in [('task_summary', ()), ('task-list', ()), ('task-detail', ('todo',))]:
+            with self.subTest(view=name):
+                path = self.url(name, args)
+                etag = self.aget(path)['ETag']
+                response = self.aget(path, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_list_variants_go_to_the_sync_view(self):
+        path = reverse('task-list')
+        for params in [{'q': 'milk'}, {'since': '0'}, {'start': '2026-03-01', 'end': '2026-03-31'}]:
+            with self.subTest(params=params):
+                response, expected = self.aget(path, params), self.sync_get(path, params)
+                self.assertEqual(response.status_code, 200)
+                body, expected = json.loads(response.content), json.loads(expected.content)
+                if 'since' in params:
+                    # The watermark embeds the time of the request
+                    del body['data']['watermark'], expected['data']['watermark']
+                self.assertEqual(body, expected)
+        self.assertEqual(
+            list(json.loads(self.aget(path, {'start': '2026-03-01', 'end': '2026-03-31'}).content)['data']['days']),
+            ['2026-03-10'],
+        )
+
+    def test_writes_go_to_the_sync_view(self):
+        response = async_to_sync(self.async_client.post)(
+            reverse('task-list'), {'title': 'Eggs'}, content_type='application/json', headers=self.auth
+        )
+        self.assertEqual(response.status_code, 201)
+        response = async_to_sync(self.async_client.patch)(
+            self.url('task-detail', ('todo',)), {'status': 'Done'}, content_type='application/json', headers=self.auth
+        )
+        self.assertEqual(response.status_code, 200)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.status, 'Done')
+
+    def test_other_renderings_go_to_the_sync_view(self):
+        response = self.aget(reverse('task-list'), {'format': 'api'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        response = self.aget(reverse('task_summary'), headers={'Accept': 'application/json; indent=4'})
+        self.assertIn(b'\n    ', response.content)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from todo.authentication import cached_user_key
+
+from .base import TodoAPITestCase
+
+
+class CookieJWTAuthenticationTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = str(AccessToken.for_user(self.user))
+        self.browser = APIClient(enforce_csrf_checks=True)
+        self.browser.cookies['access'] = self.token
+
+    def test_cookie_authenticates_safe_requests(self):
+        response = self.browser.get(reverse('task-list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cookie_requires_csrf_token_for_unsafe_requests(self):
+        response = self.browser.post(reverse('task-list'), {'title': 'Forged'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('CSRF', response.json()['detail'])
+
+    def test_cookie_with_csrf_token_is_accepted(self):
+        csrf_token = self.browser.get(reverse('get_csrf_token')).cookies['csrftoken'].value
+        response = self.browser.post(
+            reverse('task-list'), {'title': 'Real'}, format='json', HTTP_X_CSRFTOKEN=csrf_token
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_authorization_header_needs_no_csrf_token(self):
+        client = APIClient(enforce_csrf_checks=True)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        response = client.post(reverse('task-list'), {'title': 'Scripted'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_cached_user_is_evicted_after_commit(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        client.get(reverse('task-list'))
+        self.assertIsNotNone(cache.get(cached_user_key(self.user.pk)))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.first_name = 'Alice'
+            self.user.save()
+        self.assertIsNotNone(cache.get(cached_user_key(self.user.pk)))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(cached_user_key(self.user.pk)))
+
+
+class TokenRefreshTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def post_refresh(self, token):
+        return APIClient().post(reverse('token_refresh'), {'refresh': str(token)}, format='json')
+
+    def test_refresh_rotates_and_blacklists_the_old_token(self):
+        response = self.post_refresh(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()['refresh']
+        self.assertNotEqual(rotated, str(self.refresh))
+        self.assertEqual(AccessToken(response.json()['access'])['user_id'], self.user.pk)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=self.refresh['jti']).exists())
+        self.assertTrue(OutstandingToken.objects.filter(token=rotated, user=self.user).exists())
+
+        self.assertEqual(self.post_refresh(rotated).status_code, 200)
+
+    def test_blacklisted_token_is_rejected(self):
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 200)
+        response = self.post_refresh(self.refresh)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    def test_concurrent_refresh_of_the_same_token_fails(self):
+        create = OutstandingToken.objects.bulk_create
+
+        def other_request_wins(objs, *args, **kwargs):
+            # The other request blacklisted the token after this one looked it up
+            BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.refresh['jti']))
+            return create(objs, *args, **kwargs)
+
+        with mock.patch.object(OutstandingToken.objects, 'bulk_create', side_effect=other_request_wins):
+            response = self.post_refresh(self.refresh)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+
+    def test_inactive_user_cannot_refresh(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+
+    def test_refresh_runs_few_queries(self):
+        # Lookup, then one transaction with the rotated row and the blacklist entry
+        with self.assertNumQueries(5):
+            self.assertEqual(self.post_refresh(self.refresh).status_code, 200)
+
+
+class PruneTokensTests(TodoAPITestCase):
+    def test_only_expired_tokens_and_their_blacklist_entries_are_deleted(self):
+        expired = RefreshToken.for_user(self.user)
+        current = RefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=expired['jti']))
+
+        out = StringIO()
+        call_command('prune_tokens', batch_size=1, stdout=out)
+
+        self.assertIn('Deleted 1 expired tokens', out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [current['jti']])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_batch_size_must_be_positive(self):
+        with self.assertRaises(CommandError):
+            call_command('prune_tokens', batch_size=0)
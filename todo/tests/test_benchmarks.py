@@ -0,0 +1,35 @@
+import json
+from contextlib import nullcontext
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from todo import benchmarks
+
+
+# The test runner has already created a throwaway database
+@mock.patch('todo.benchmarks.benchmark_database', nullcontext)
+class BenchmarkCommandTests(TestCase):
+    @override_settings(TODO_RESPONSE_CACHE_ENABLED=True)
+    def test_report_covers_every_scenario_without_cache_hits(self):
+        out = StringIO()
+        call_command(
+            'benchmark_api', users=2, todos=5, requests=3, warmup=1, render_rows=10,
+            stdout=out, stderr=StringIO()
+        )
+        report = json.loads(out.getvalue())
+
+        names = {scenario.name for scenario in benchmarks.default_scenarios()}
+        self.assertEqual(set(report['results']), names)
+        for name, result in report['results'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertEqual(result['response_cache_hits'], 0, name)
+        self.assertGreaterEqual(report['results']['tasks_list']['queries_per_request'], 1)
+        self.assertEqual(report['rendering']['rows'], 10)
+
+    def test_comparison_against_a_baseline(self):
+        baseline = {'results': {'a': {'latency_ms': {'p50': 2.0}, 'queries_per_request': 3}}}
+        report = {'results': {'a': {'latency_ms': {'p50': 3.0}, 'queries_per_request': 2}}}
+        self.assertEqual(benchmarks.compare(report, baseline), {'a': {'p50_change_pct': 50.0, 'queries_change': -1}})
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.models import TaskCounter, Todo, TodoTombstone
+
+from .base import TodoAPITestCase
+
+
+class BulkTests(TodoAPITestCase):
+    def bulk(self, **operations):
+        response = self.client.post(reverse('task-bulk'), operations, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data']
+
+    def counters(self):
+        counter = TaskCounter.objects.get(user=self.user)
+        return {field: getattr(counter, field) for field in ('total', 'open', 'in_progress', 'done')}
+
+    def test_counters_follow_creates_updates_and_deletes(self):
+        TaskCounter.rebuild(self.user)
+        done = Todo.objects.create(user=self.user, title='done', status='Done')
+        doomed = Todo.objects.create(user=self.user, title='doomed')
+
+        data = self.bulk(
+            create=[{'title': 'a'}, {'title': 'b', 'status': 'In Progress'}],
+            update=[{'id': done.pk, 'status': 'Open'}],
+            delete=[doomed.pk, 0],
+        )
+
+        self.assertEqual(data['not_found'], [0])
+        self.assertEqual(self.counters(), {'total': 3, 'open': 2, 'in_progress': 1, 'done': 0})
+        TaskCounter.rebuild(self.user)
+        self.assertEqual(self.counters(), {'total': 3, 'open': 2, 'in_progress': 1, 'done': 0})
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        TaskCounter.rebuild(self.user)
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                self.bulk(create=[{'title': f'todo {n}'} for n in range(size)])
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[0], 8)
+        self.assertEqual(TaskCounter.objects.get(user=self.user).total, 22)
+
+    def test_delete_query_count_does_not_grow_with_the_batch(self):
+        TaskCounter.rebuild(self.user)
+        counts = []
+        for size in (2, 50):
+            todos = Todo.objects.bulk_create([Todo(user=self.user, title=f'todo {n}') for n in range(size)])
+            with CaptureQueriesContext(connection) as queries:
+                self.bulk(delete=[todo.pk for todo in todos])
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[0], 10)
+        self.assertEqual(TodoTombstone.objects.filter(user=self.user).count(), 52)
+
+    def test_invalid_item_rolls_back_the_batch(self):
+        response = self.client.post(
+            reverse('task-bulk'), {'create': [{'title': 'ok'}, {'title': ''}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Todo.objects.filter(user=self.user).exists())
@@ -0,0 +1,64 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from todo.caching import user_version
+from todo.models import Todo
+
+from .base import TodoAPITestCase
+
+
+@override_settings(TODO_RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Todo.objects.create(user=self.user, title='Pay rent')
+
+    def assertBumps(self, write):
+        before = user_version(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            write()
+            # Only once the write has committed
+            self.assertEqual(user_version(self.user.pk), before)
+        self.assertTrue(callbacks)
+        self.assertNotEqual(user_version(self.user.pk), before)
+
+    def test_hit_runs_no_queries(self):
+        for name in ('task-list', 'get_user_profile', 'get_authenticated_user'):
+            first = self.client.get(reverse(name))
+            self.assertNotIn('X-Response-Cache', first)
+            with self.assertNumQueries(0):
+                second = self.client.get(reverse(name))
+            self.assertEqual(second['X-Response-Cache'], 'hit')
+            self.assertEqual(second.content, first.content)
+
+    def test_cached_etag_still_answers_304(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        self.assertEqual(self.client.get(reverse('task-list'))['X-Response-Cache'], 'hit')
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_bump_the_version_after_commit(self):
+        self.assertBumps(lambda: Todo.objects.create(user=self.user, title='Buy milk'))
+        self.assertBumps(lambda: self.user.profile.save())
+        self.assertBumps(lambda: self.user.save())
+        self.assertBumps(lambda: self.client.post(
+            reverse('task-bulk'), {'create': [{'title': 'a'}, {'title': 'b'}]}, format='json'
+        ))
+
+    def test_write_serves_a_fresh_list(self):
+        self.client.get(reverse('task-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Todo.objects.create(user=self.user, title='Buy milk')
+        response = self.client.get(reverse('task-list'))
+        self.assertNotIn('X-Response-Cache', response)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    @override_settings(TODO_RESPONSE_CACHE_MAX_BYTES=10)
+    def test_large_bodies_are_not_stored(self):
+        self.client.get(reverse('task-list'))
+        self.assertNotIn('X-Response-Cache', self.client.get(reverse('task-list')))
+
+    @override_settings(TODO_RESPONSE_CACHE_ENABLED=False)
+    def test_disabled_without_a_shared_cache(self):
+        self.client.get(reverse('get_user_profile'))
+        self.assertNotIn('X-Response-Cache', self.client.get(reverse('get_user_profile')))
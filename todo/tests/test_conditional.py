@@ -0,0 +1,74 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from todo.models import Todo
+
+from .base import TodoAPITestCase
+
+
+class ConditionalGetTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.todo = Todo.objects.create(user=self.user, title='Pay rent', due_date=timezone.localdate())
+
+    def later(self, minutes):
+        return mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(minutes=minutes))
+
+    def test_list_answers_304_for_current_etag(self):
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_changes_at_day_boundary(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        with self.later(15):
+            response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_when_older_todo_is_deleted(self):
+        older = Todo.objects.create(user=self.user, title='Old', due_date=timezone.localdate())
+        Todo.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        etag = self.client.get(reverse('task-list'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('task-detail', args=[older.pk]))
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_revalidates_after_day_boundary(self):
+        url = reverse('task-detail', args=[self.todo.pk])
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        with self.later(15):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_detail_etag_changes_on_update(self):
+        url = reverse('task-detail', args=[self.todo.pk])
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {'title': 'Pay rent today'}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_summary_answers_304_until_day_boundary(self):
+        url = reverse('task_summary')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.later(15):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_in_future_is_ignored_for_list(self):
+        response = self.client.get(
+            reverse('task-list'), HTTP_IF_MODIFIED_SINCE=http_date((timezone.now() + timedelta(days=1)).timestamp())
+        )
+        self.assertEqual(response.status_code, 200)
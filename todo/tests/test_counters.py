@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from todo.models import TaskCounter, Todo, summarize_todos
+
+from .base import TodoAPITestCase
+
+User = get_user_model()
+
+
+class TaskCounterTests(TodoAPITestCase):
+    def counters(self, user=None):
+        counter = TaskCounter.objects.get(user=user or self.user)
+        return {field: getattr(counter, field) for field in ('total', 'open', 'in_progress', 'done')}
+
+    def recounted(self, user=None):
+        counts = summarize_todos(user or self.user)
+        return {field: counts[field] for field in ('total', 'open', 'in_progress', 'done')}
+
+    def test_summary_builds_the_missing_row(self):
+        Todo.objects.create(user=self.user, title='a')
+        Todo.objects.create(user=self.user, title='b', status='Done')
+        self.assertFalse(TaskCounter.objects.filter(user=self.user).exists())
+
+        data = self.client.get(reverse('task_summary')).json()['data']
+
+        self.assertEqual((data['total'], data['open'], data['done']), (2, 1, 1))
+        self.assertEqual(self.counters(), self.recounted())
+
+    def test_saves_and_deletes_adjust_the_row(self):
+        TaskCounter.rebuild(self.user)
+        todo = Todo.objects.create(user=self.user, title='a')
+        Todo.objects.create(user=self.user, title='b')
+        todo.status = 'In Progress'
+        todo.save()
+        todo.title = 'renamed'
+        todo.save()
+        Todo.objects.get(title='b').delete()
+
+        self.assertEqual(self.counters(), {'total': 1, 'open': 0, 'in_progress': 1, 'done': 0})
+        self.assertEqual(self.counters(), self.recounted())
+
+    def test_changing_owner_drops_both_rows(self):
+        bob = User.objects.create_user('bob', 'bob@example.com', 'S3cure-pass')
+        todo = Todo.objects.create(user=self.user, title='a')
+        TaskCounter.rebuild(self.user)
+        TaskCounter.rebuild(bob)
+
+        todo = Todo.objects.get(pk=todo.pk)
+        todo.user = bob
+        todo.save()
+
+        self.assertFalse(TaskCounter.objects.filter(user__in=[self.user, bob]).exists())
+        self.assertEqual(self.client.get(reverse('task_summary')).json()['data']['total'], 0)
+
+    def test_rebuild_all_matches_a_recount(self):
+        Todo.objects.create(user=self.user, title='a', status='Done')
+        TaskCounter.objects.all().delete()
+        self.assertEqual(TaskCounter.rebuild_all(), 1)
+        self.assertEqual(self.counters(), self.recounted())
+
+    @override_settings(TODO_SUMMARY_COUNTERS=False)
+    def test_disabled_counters_are_neither_kept_nor_read(self):
+        Todo.objects.create(user=self.user, title='a')
+        data = self.client.get(reverse('task_summary')).json()['data']
+        self.assertEqual(data['total'], 1)
+        self.assertFalse(TaskCounter.objects.exists())
@@ -0,0 +1,106 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from todo.events import LocalBroker
+from todo.models import Todo
+
+from .base import TodoAPITestCase, User
+
+
+class LocalBrokerTests(TestCase):
+    async def test_events_reach_only_the_users_subscribers(self):
+        broker = LocalBroker()
+        mine, theirs = broker.subscribe(1), broker.subscribe(2)
+        broker.publish(1, {'type': 'created', 'id': 5})
+        self.assertEqual(await asyncio.wait_for(mine.get(), 1), {'type': 'created', 'id': 5})
+        await asyncio.sleep(0)
+        self.assertTrue(theirs.queue.empty())
+
+        mine.close()
+        theirs.close()
+        self.assertEqual(dict(broker._subscribers), {})
+
+    async def test_a_full_queue_is_replaced_by_a_resync(self):
+        broker = LocalBroker(max_queue_size=2)
+        subscription = broker.subscribe(1)
+        for pk in range(3):
+            broker.publish(1, {'type': 'updated', 'id': pk})
+        await asyncio.sleep(0)
+        self.assertEqual(await subscription.get(), {'type': 'resync'})
+        self.assertTrue(subscription.queue.empty())
+
+
+class PublishOnCommitTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('todo.events.get_broker')
+        self.broker = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            todo = Todo.objects.create(user=self.user, title='Milk')
+        self.broker.publish.assert_not_called()
+        for callback in callbacks:
+            callback()
+        self.broker.publish.assert_called_once_with(
+            self.user.pk, {'type': 'created', 'id': todo.pk, 'updated_at': todo.updated_at.isoformat()}
+        )
+
+        self.broker.publish.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            pk = todo.pk
+            todo.delete()
+        self.broker.publish.assert_called_once_with(self.user.pk, {'type': 'deleted', 'id': pk, 'updated_at': None})
+
+    def test_bulk_changes_are_published_once_each(self):
+        todo = Todo.objects.create(user=self.user, title='Milk')
+        self.broker.publish.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('task-bulk'), {
+                'create': [{'title': 'Bread'}], 'delete': [todo.pk],
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        events = [call.args for call in self.broker.publish.call_args_list]
+        self.assertEqual(sorted(event['type'] for user_id, event in events), ['created', 'deleted'])
+        self.assertEqual({user_id for user_id, event in events}, {self.user.pk})
+
+
+@override_settings(TODO_EVENT_HEARTBEAT=0.05)
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'S3cure-pass')
+        self.broker = LocalBroker()
+        patcher = mock.patch('todo.views.get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stream_frames_events_and_heartbeats(self):
+        token = AccessToken.for_user(self.user)
+        response = await self.async_client.get(reverse('todo_events'), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+        self.assertEqual(await asyncio.wait_for(anext(chunks), 1), b': keep-alive\n\n')
+
+        event = {'type': 'updated', 'id': 7, 'updated_at': None}
+        self.broker.publish(self.user.pk + 1, {'type': 'created', 'id': 8, 'updated_at': None})
+        self.broker.publish(self.user.pk, event)
+        chunk = await asyncio.wait_for(anext(chunks), 1)
+        while chunk == b': keep-alive\n\n':
+            chunk = await asyncio.wait_for(anext(chunks), 1)
+        self.assertEqual(chunk, f'event: updated\ndata: {json.dumps(event)}\n\n'.encode())
+
+        await chunks.aclose()
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(reverse('todo_events'))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from todo.exports import CSVExporter, NDJSONExporter, aiter_export, export_queryset, iter_export
+from todo.models import Todo
+
+from .base import TodoAPITestCase
+
+
+class ExportTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        Todo.objects.create(user=self.user, title='Milk, eggs', description='Two\nlines', due_date=date(2026, 3, 10))
+        Todo.objects.create(user=self.user, title='=HYPERLINK("http://evil.example")', priority='High', status='Done')
+        Todo.objects.create(user=self.user, title='Other', category='Other', custom_category='@home')
+
+    def export(self, output):
+        response = self.client.get(reverse('task-export'), {'output': output})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="todos.{output}"')
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, body = self.export('ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Milk, eggs', '=HYPERLINK("http://evil.example")', 'Other'])
+        self.assertEqual(rows[0]['due_date'], '2026-03-10')
+        self.assertEqual(rows[0]['description'], 'Two\nlines')
+
+    def test_csv(self):
+        response, body = self.export('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['title'], 'Milk, eggs')
+        self.assertEqual(rows[0]['description'], 'Two\nlines')
+        self.assertEqual(rows[0]['due_date'], '2026-03-10')
+        # Cells a spreadsheet would run as formulas are quoted
+        self.assertEqual(rows[1]['title'], '\'=HYPERLINK("http://evil.example")')
+        self.assertEqual(rows[2]['custom_category'], "'@home")
+
+    def test_csv_cells_are_quoted_only_when_they_start_a_formula(self):
+        for value, expected in [('+1', "'+1"), ('-x', "'-x"), ('\tcmd', "'\tcmd"), ('a=b', 'a=b'), (5, 5), (None, None)]:
+            with self.subTest(value=value):
+                self.assertEqual(CSVExporter.cell(value), expected)
+
+    def test_ics(self):
+        response, body = self.export('ics')
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(body.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VTODO'), 3)
+        self.assertIn('SUMMARY:Milk\\, eggs\r\n', body)
+        self.assertIn('DESCRIPTION:Two\\nlines\r\n', body)
+        self.assertIn('DUE;VALUE=DATE:20260310\r\n', body)
+        self.assertIn('STATUS:COMPLETED\r\n', body)
+        self.assertIn('CATEGORIES:@home\r\n', body)
+
+    def test_unknown_output(self):
+        response = self.client.get(reverse('task-export'), {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_iter_export_yields_chunks_of_rows(self):
+        chunks = list(iter_export(NDJSONExporter(), export_queryset(self.user), chunk_size=2))
+        # Header, the first two rows, then the last row with the footer
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[1].count(b'\n'), 2)
+        self.assertEqual(chunks[2].count(b'\n'), 1)
+
+    def test_aiter_export_matches_iter_export(self):
+        async def collect():
+            return [chunk async for chunk in aiter_export(CSVExporter(), export_queryset(self.user), chunk_size=2)]
+
+        self.assertEqual(
+            async_to_sync(collect)(),
+            list(iter_export(CSVExporter(), export_queryset(self.user), chunk_size=2)),
+        )
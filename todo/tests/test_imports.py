@@ -0,0 +1,115 @@
+import contextvars
+import io
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from todo.imports import import_todos, read_csv, read_ics
+from todo.models import TaskCounter, Todo
+
+from .base import TodoAPITestCase
+
+CALENDAR = '''BEGIN:VCALENDAR\r
+BEGIN:VTODO\r
+UID:task-1\r
+SUMMARY:Renew passport\\, soon\r
+DESCRIPTION:Photos first\\nthen the form\r
+DUE;VALUE=DATE:20260402\r
+STATUS:IN-PROCESS\r
+PRIORITY:1\r
+CATEGORIES:Travel,Admin\r
+BEGIN:VALARM\r
+SUMMARY:Not a todo\r
+END:VALARM\r
+END:VTODO\r
+BEGIN:VEVENT\r
+UID:event-1\r
+SUMMARY:Dentist appoint\r
+ ment\r
+DTSTART:20260405T093000Z\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:event-2\r
+SUMMARY:Cancelled call\r
+STATUS:CANCELLED\r
+END:VEVENT\r
+END:VCALENDAR\r
+'''
+
+
+class ReaderTests(TodoAPITestCase):
+    def test_ics_components_become_records(self):
+        records = list(read_ics(io.StringIO(CALENDAR, newline='')))
+        self.assertEqual([(line, uid) for line, uid, _ in records], [(2, 'task-1'), (14, 'event-1')])
+        self.assertEqual(records[0][2], {
+            'title': 'Renew passport, soon',
+            'description': 'Photos first\nthen the form',
+            'due_date': '2026-04-02',
+            'status': 'In Progress',
+            'priority': 'High',
+            'category': 'Other',
+            'custom_category': 'Travel',
+        })
+        self.assertEqual(records[1][2], {'title': 'Dentist appointment', 'due_date': '2026-04-05'})
+
+    def test_csv_keeps_known_non_empty_columns(self):
+        stream = io.StringIO('title,status,due_date,colour,uid\nMilk,Done,,red,m-1\n')
+        self.assertEqual(list(read_csv(stream)), [(2, 'm-1', {'title': 'Milk', 'status': 'Done'})])
+
+
+class ImportTests(TodoAPITestCase):
+    def upload(self, name, content, **params):
+        url = reverse('task-import-file')
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def test_reimporting_a_file_skips_known_rows(self):
+        content = b'\xef\xbb\xbftitle,due_date\nMilk,2026-01-02\nBread,\nMilk,2026-01-02\n'
+        report = self.upload('todos.csv', content).json()['data']
+        self.assertEqual((report['created'], report['skipped']), (2, 1))
+
+        report = self.upload('todos.csv', content).json()['data']
+        self.assertEqual((report['processed'], report['created'], report['skipped']), (3, 0, 3))
+        self.assertEqual(Todo.objects.filter(user=self.user).count(), 2)
+
+    def test_invalid_rows_are_reported_and_the_rest_imported(self):
+        content = b'title,status\nGood,Open\n,Open\nBad status,Sleeping\n'
+        report = self.upload('todos.csv', content).json()['data']
+        self.assertEqual((report['created'], report['invalid']), (1, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [3, 4])
+
+    def test_ics_upload_is_detected_by_name(self):
+        report = self.upload('calendar.ics', CALENDAR.encode()).json()['data']
+        self.assertEqual(report['created'], 2)
+        self.assertEqual(Todo.objects.get(source_uid='task-1').status, 'In Progress')
+
+    def test_unknown_input_is_rejected(self):
+        response = self.upload('todos.txt', b'title\nx\n', input='xlsx')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batches_keep_counters_current(self):
+        TaskCounter.rebuild(self.user)
+        records = [(n, None, {'title': f'todo {n}', 'status': 'Done' if n % 2 else 'Open'}) for n in range(5)]
+        import_todos(self.user, records, batch_size=2)
+        counter = TaskCounter.objects.get(user=self.user)
+        self.assertEqual((counter.total, counter.open, counter.done), (5, 3, 2))
+
+    def test_rows_a_concurrent_import_inserted_are_not_counted_twice(self):
+        TaskCounter.rebuild(self.user)
+        bulk_create = Todo.objects.bulk_create
+
+        def after_a_concurrent_import(todos, **kwargs):
+            # Another import, in its own context, commits 'todo 1' between the lookup and the insert
+            contextvars.Context().run(
+                Todo.objects.create, user=self.user, title='todo 1', source_uid=todos[1].source_uid
+            )
+            return bulk_create(todos, **kwargs)
+
+        records = [(n, f'uid-{n}', {'title': f'todo {n}'}) for n in range(3)]
+        with mock.patch.object(Todo.objects, 'bulk_create', after_a_concurrent_import):
+            report = import_todos(self.user, records, batch_size=10)
+        self.assertEqual((report['created'], report['skipped']), (2, 1))
+        counter = TaskCounter.objects.get(user=self.user)
+        self.assertEqual((counter.total, counter.open), (3, 3))
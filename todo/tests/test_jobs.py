@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from todo.jobs import enqueue, task, work
+from todo.models import Job, JobInput, Todo
+
+from .base import TodoAPITestCase
+
+attempts = []
+
+
+@task('tests.flaky')
+def flaky(job, failures):
+    attempts.append(job.attempts)
+    if job.attempts <= failures:
+        raise RuntimeError(f'attempt {job.attempts} failed')
+    return {'attempts': job.attempts}
+
+
+class JobQueueTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        attempts.clear()
+
+    def test_job_runs_and_records_its_result(self):
+        job = enqueue('tests.flaky', failures=0)
+        self.assertEqual(work(burst=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts), ('done', {'attempts': 1}, 1))
+
+    def test_failed_job_is_retried_later(self):
+        job = enqueue('tests.flaky', failures=1)
+        work(burst=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('attempt 1 failed', job.error)
+        self.assertGreater(job.run_at, job.created_at)
+
+    def test_input_is_dropped_when_retries_are_exhausted(self):
+        job = enqueue('tests.flaky', max_attempts=1, failures=1)
+        JobInput.objects.create(job=job, data=b'payload')
+        work(burst=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertFalse(JobInput.objects.filter(job=job).exists())
+
+    def test_unknown_task_cannot_be_queued(self):
+        with self.assertRaises(KeyError):
+            enqueue('tests.missing')
+
+
+class BackgroundImportTests(TodoAPITestCase):
+    def test_background_import_reads_the_stored_upload(self):
+        upload = SimpleUploadedFile('todos.csv', b'title,due_date\nMilk,2026-01-02\nBread,\n', 'text/csv')
+        response = self.client.post(
+            reverse('task-import-file') + '?background=true', {'file': upload}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.json()['data']['job']['id'])
+        self.assertTrue(JobInput.objects.filter(job=job).exists())
+
+        work(burst=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(sorted(Todo.objects.filter(user=self.user).values_list('title', flat=True)), ['Bread', 'Milk'])
+        self.assertFalse(JobInput.objects.filter(job=job).exists())
+
+    def test_upload_is_stored_and_read_back_in_parts(self):
+        rows = ''.join(f'Task {i},\n' for i in range(200))
+        upload = SimpleUploadedFile('todos.csv', ('title,due_date\n' + rows).encode(), 'text/csv')
+        with mock.patch.object(JobInput, 'PART_SIZE', 256):
+            response = self.client.post(
+                reverse('task-import-file') + '?background=true', {'file': upload}, format='multipart'
+            )
+        job = Job.objects.get(pk=response.json()['data']['job']['id'])
+        self.assertGreater(JobInput.objects.filter(job=job).count(), 5)
+
+        work(burst=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(Todo.objects.filter(user=self.user).count(), 200)
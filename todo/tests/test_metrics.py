@@ -0,0 +1,70 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from todo import metrics
+from todo.models import Todo
+
+from .base import TodoAPITestCase
+
+
+class HistogramTests(SimpleTestCase):
+    def test_quantiles_are_bucket_upper_bounds(self):
+        histogram = metrics.Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 5)
+        self.assertEqual(snapshot['buckets'], {'1': 1, '10': 2, '100': 1, '+Inf': 1})
+        self.assertEqual((snapshot['p50'], snapshot['p90']), (10, None))
+        self.assertIsNone(metrics.Histogram((1,)).quantile(0.5))
+
+    def test_over_budget_count_is_exact_across_threads(self):
+        view_metrics = metrics.ViewMetrics()
+
+        def count():
+            for _ in range(1000):
+                view_metrics.count_over_budget()
+
+        threads = [threading.Thread(target=count) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(view_metrics.snapshot()['over_query_budget'], 8000)
+
+
+class RequestMetricsTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.reset()
+        self.user.is_staff = True
+        self.user.save()
+
+    def test_requests_are_recorded_per_view(self):
+        Todo.objects.create(user=self.user, title='a')
+        self.client.get(reverse('task-list'))
+        self.client.get(reverse('task-list'))
+
+        data = self.client.get(reverse('metrics')).json()['data']
+        view = data['task-list']
+        self.assertEqual(view['latency_ms']['count'], 2)
+        self.assertGreater(view['db_queries']['sum'], 0)
+        self.assertEqual(view['serializer_ms']['count'], 2)
+
+        self.assertEqual(self.client.delete(reverse('metrics')).status_code, 204)
+        # Only the DELETE itself, recorded once the view has returned
+        self.assertEqual(list(metrics.registry.snapshot()), ['metrics'])
+
+    @override_settings(TODO_QUERY_BUDGET=1)
+    def test_requests_over_the_query_budget_are_logged(self):
+        with self.assertLogs('todo.metrics', 'WARNING') as logs:
+            self.client.get(reverse('task-list'))
+        self.assertIn('task-list ran', logs.output[0])
+        self.assertEqual(metrics.registry.snapshot()['task-list']['over_query_budget'], 1)
+
+    def test_metrics_need_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from todo.models import Todo
+from todo.pagination import decode_cursor, encode_cursor
+
+from .base import TodoAPITestCase
+
+User = get_user_model()
+
+
+class CursorPaginationTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        start = date(2026, 1, 1)
+        todos = [Todo(user=self.user, title=f'dated {n}', due_date=start + timedelta(days=n % 3)) for n in range(6)]
+        todos += [Todo(user=self.user, title=f'undated {n}') for n in range(2)]
+        Todo.objects.bulk_create(todos)
+
+    def walk(self, page_size):
+        """Follow next links from the first page; returns the pages' (due_date, id) keys"""
+        pages = []
+        url = reverse('task-list') + f'?page_size={page_size}'
+        while url:
+            data = self.client.get(url).json()
+            pages.append([(todo['due_date'], todo['id']) for todo in data['results']])
+            url = data['next']
+        return pages
+
+    def test_pages_cover_every_todo_once_in_order(self):
+        pages = self.walk(3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        keys = [key for page in pages for key in page]
+        expected = sorted(
+            Todo.objects.filter(user=self.user).values_list('due_date', 'id'),
+            key=lambda row: (row[0] is not None, row[0] and -row[0].toordinal(), -row[1])
+        )
+        self.assertEqual(keys, [(due.isoformat() if due else None, pk) for due, pk in expected])
+
+    def test_pages_are_stable_when_earlier_rows_are_added(self):
+        first = self.client.get(reverse('task-list'), {'page_size': 4}).json()
+        Todo.objects.create(user=self.user, title='late undated')
+        second = self.client.get(first['next']).json()
+        # The new todo sorts before the cursor, so the second page neither repeats nor skips a row
+        ids = [todo['id'] for todo in first['results'] + second['results']]
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(len(set(ids)), 8)
+
+    def test_page_size_is_clamped(self):
+        response = self.client.get(reverse('task-list'), {'page_size': 0})
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_other_users_todos_are_not_listed(self):
+        bob = User.objects.create_user('bob', 'bob@example.com', 'S3cure-pass')
+        other = Todo.objects.create(user=bob, title='theirs')
+        ids = [pk for page in self.walk(50) for _, pk in page]
+        self.assertEqual(len(ids), 8)
+        self.assertNotIn(other.pk, ids)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('task-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(['2026-01-02', 7])), ['2026-01-02', 7])
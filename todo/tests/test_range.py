@@ -0,0 +1,86 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from todo.models import Todo
+from todo.serializers import TodoRangeQuerySerializer
+
+from .base import TodoAPITestCase
+
+
+class RangeQuerySerializerTests(SimpleTestCase):
+    def validate(self, **params):
+        query = TodoRangeQuerySerializer(data=params)
+        return query.is_valid(), query.errors
+
+    def test_window_up_to_the_cap_is_valid(self):
+        self.assertEqual(self.validate(start='2026-03-10', end='2026-03-10'), (True, {}))
+        # 366 days inclusive: a whole leap year
+        self.assertEqual(self.validate(start='2028-01-01', end='2028-12-31'), (True, {}))
+
+    def test_window_over_the_cap_is_rejected(self):
+        valid, errors = self.validate(start='2026-01-01', end='2027-01-02')
+        self.assertFalse(valid)
+        self.assertIn('end', errors)
+
+    def test_reversed_bounds_are_rejected(self):
+        valid, errors = self.validate(start='2026-03-10', end='2026-03-09')
+        self.assertFalse(valid)
+        self.assertIn('end', errors)
+
+    def test_invalid_and_missing_bounds_are_rejected(self):
+        for params in [{'start': '2026-02-30', 'end': '2026-03-01'}, {'start': 'soon', 'end': '2026-03-01'}, {'start': '2026-03-01'}]:
+            with self.subTest(params=params):
+                self.assertFalse(self.validate(**params)[0])
+
+    def test_filters_must_be_known_choices(self):
+        valid, errors = self.validate(start='2026-03-01', end='2026-03-31', status='Someday')
+        self.assertFalse(valid)
+        self.assertIn('status', errors)
+
+
+class RangeListTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for title, due_date, status in [
+            ('Before', date(2026, 2, 28), 'Open'),
+            ('First', date(2026, 3, 1), 'Open'),
+            ('Second', date(2026, 3, 1), 'Done'),
+            ('Last', date(2026, 3, 31), 'Open'),
+            ('After', date(2026, 4, 1), 'Open'),
+            ('Undated', None, 'Open'),
+        ]:
+            Todo.objects.create(user=self.user, title=title, due_date=due_date, status=status)
+
+    def get(self, **params):
+        return self.client.get(reverse('task-list'), params)
+
+    def test_todos_in_the_window_are_grouped_by_day(self):
+        response = self.get(start='2026-03-01', end='2026-03-31')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual((data['start'], data['end']), ('2026-03-01', '2026-03-31'))
+        self.assertEqual(list(data['days']), ['2026-03-01', '2026-03-31'])
+        self.assertEqual([todo['title'] for todo in data['days']['2026-03-01']], ['First', 'Second'])
+        self.assertEqual([todo['title'] for todo in data['days']['2026-03-31']], ['Last'])
+
+    def test_filters_apply_within_the_window(self):
+        data = self.get(start='2026-03-01', end='2026-03-31', status='Done').json()['data']
+        self.assertEqual({day: [todo['title'] for todo in todos] for day, todos in data['days'].items()}, {'2026-03-01': ['Second']})
+
+    def test_other_users_todos_are_excluded(self):
+        other = type(self.user).objects.create_user('bob', 'bob@example.com', 'S3cure-pass')
+        Todo.objects.create(user=other, title='Not mine', due_date=date(2026, 3, 15))
+        data = self.get(start='2026-03-01', end='2026-03-31').json()['data']
+        self.assertNotIn('2026-03-15', data['days'])
+
+    def test_bad_windows_are_400(self):
+        for params in [
+            {'start': '2026-03-31', 'end': '2026-03-01'},
+            {'start': '2026-01-01', 'end': '2027-06-01'},
+            {'start': 'yesterday', 'end': '2026-03-01'},
+            {'start': '2026-03-01'},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
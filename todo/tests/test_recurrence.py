@@ -0,0 +1,107 @@
+import random
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from todo.models import TodoSeries, TodoSeriesException
+from todo.recurrence import expand
+
+from .base import TodoAPITestCase
+
+
+def reference_dates(series, horizon):
+    """Every occurrence up to horizon, checked day by day against the rule"""
+    start = series.start_date
+    week0 = start - timedelta(days=start.weekday())
+    dates = []
+    day = start
+    while day <= horizon and (series.until is None or day <= series.until):
+        months = (day.year - start.year) * 12 + day.month - start.month
+        if series.frequency == 'DAILY':
+            matches = (day - start).days % series.interval == 0
+        elif series.frequency == 'WEEKLY':
+            weeks = (day - week0).days // 7
+            matches = day.weekday() in series.weekdays and weeks % series.interval == 0
+        elif series.frequency == 'MONTHLY':
+            matches = day.day == start.day and months % series.interval == 0
+        else:
+            matches = (day.month, day.day) == (start.month, start.day) and months % (12 * series.interval) == 0
+        if matches:
+            dates.append(day)
+            if series.count is not None and len(dates) == series.count:
+                break
+        day += timedelta(days=1)
+    return dates
+
+
+class ExpandTests(SimpleTestCase):
+    def check(self, series, horizon=date(2031, 1, 1), windows=40):
+        occurrences = reference_dates(series, horizon)
+        rng = random.Random(f'{series.frequency}{series.start_date}{series.interval}')
+        for _ in range(windows):
+            start = series.start_date + timedelta(days=rng.randrange(-30, 1500))
+            end = start + timedelta(days=rng.randrange(0, 400))
+            if end > horizon:
+                continue
+            expected = [day for day in occurrences if start <= day <= end]
+            self.assertEqual(expand(series, start, end), expected, f'{start}..{end}')
+
+    def test_daily(self):
+        self.check(TodoSeries(start_date=date(2026, 1, 5), frequency='DAILY', interval=3))
+
+    def test_weekly_by_weekday(self):
+        # Starts on a Wednesday, so the Monday of the first week is skipped
+        self.check(TodoSeries(start_date=date(2026, 1, 7), frequency='WEEKLY', interval=2, by_weekday='MO,WE,FR'))
+
+    def test_monthly_skips_short_months(self):
+        self.check(TodoSeries(start_date=date(2026, 1, 31), frequency='MONTHLY', interval=1))
+
+    def test_yearly_on_leap_day(self):
+        self.check(TodoSeries(start_date=date(2024, 2, 29), frequency='YEARLY', interval=1))
+
+    def test_count_and_until(self):
+        self.check(TodoSeries(start_date=date(2026, 1, 1), frequency='WEEKLY', by_weekday='TU,TH', count=25))
+        self.check(TodoSeries(start_date=date(2026, 1, 1), frequency='MONTHLY', interval=2, until=date(2027, 6, 30)))
+
+    def test_window_before_the_start(self):
+        series = TodoSeries(start_date=date(2026, 1, 1), frequency='DAILY', interval=1)
+        self.assertEqual(expand(series, date(2025, 1, 1), date(2025, 12, 31)), [])
+
+
+class OccurrencesTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.series = TodoSeries.objects.create(
+            user=self.user, title='Standup', start_date=date(2026, 3, 2), frequency='WEEKLY', by_weekday='MO,WE'
+        )
+        self.url = reverse('series-occurrences')
+
+    def occurrences(self, start, end):
+        response = self.client.get(self.url, {'start': start, 'end': end})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_exceptions_cancel_override_and_move_occurrences(self):
+        TodoSeriesException.objects.create(series=self.series, occurrence_date=date(2026, 3, 4), cancelled=True)
+        TodoSeriesException.objects.create(series=self.series, occurrence_date=date(2026, 3, 9), title='Retro')
+        # Moved from outside the window into it
+        TodoSeriesException.objects.create(
+            series=self.series, occurrence_date=date(2026, 3, 16), moved_to=date(2026, 3, 10)
+        )
+
+        data = self.occurrences('2026-03-01', '2026-03-12')
+
+        self.assertEqual(
+            [(item['date'], item['title']) for item in data],
+            [('2026-03-02', 'Standup'), ('2026-03-09', 'Retro'), ('2026-03-10', 'Standup'),
+             ('2026-03-11', 'Standup')]
+        )
+
+    def test_exceptions_must_fall_on_an_occurrence(self):
+        url = reverse('series-exceptions', args=[self.series.pk])
+        response = self.client.post(url, {'occurrence_date': '2026-03-03', 'cancelled': True}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'occurrence_date': '2026-03-04', 'cancelled': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('2026-03-04', [item['date'] for item in self.occurrences('2026-03-01', '2026-03-07')])
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from todo.models import Profile
+from todo.serializers import RegisterSerializer
+
+User = get_user_model()
+
+PASSWORD = 'S3cure-pass'
+
+
+class RegistrationTests(APITestCase):
+    def setUp(self):
+        User.objects.create_user('alice', 'alice@example.com', PASSWORD)
+
+    def register(self, username, email):
+        return self.client.post(reverse('register'), {
+            'username': username, 'email': email, 'password': PASSWORD, 'password2': PASSWORD,
+        }, format='json')
+
+    def test_registration_creates_the_user_and_one_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.register('bob', 'bob@example.com')
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username='bob')
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+        profile_inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "todo_profile"')]
+        self.assertEqual(len(profile_inserts), 1)
+
+    def test_conflicts_ignore_case(self):
+        response = self.register('ALICE', 'Alice@Example.COM')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'username', 'email'})
+
+        response = self.register('alice2', 'ALICE@example.com')
+        self.assertEqual(set(response.json()['errors']), {'email'})
+
+    def test_conflict_check_is_one_query(self):
+        serializer = RegisterSerializer()
+        with self.assertNumQueries(1):
+            errors = serializer.find_conflicts('Alice', 'nobody@example.com')
+        self.assertEqual(errors, {'username': "This username is already taken"})
+        with self.assertNumQueries(1):
+            self.assertEqual(serializer.find_conflicts('carol', 'carol@example.com'), {})
+
+    def test_rejected_registration_runs_only_the_conflict_check(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.register('Alice', 'new@example.com').status_code, 400)
+
+    def test_concurrent_registration_falls_back_to_the_unique_index(self):
+        find_conflicts = RegisterSerializer.find_conflicts
+        calls = []
+
+        def missed_first_time(serializer, username, email):
+            # validate() ran before the other registration committed
+            calls.append(username)
+            return {} if len(calls) == 1 else find_conflicts(serializer, username, email)
+
+        with mock.patch.object(RegisterSerializer, 'find_conflicts', missed_first_time):
+            response = self.register('ALICE', 'other@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'username'})
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(User.objects.count(), 1)
@@ -0,0 +1,69 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from todo.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+@skipIf(orjson is None, "orjson is not installed; the classes are DRF's own")
+class FastJSONRendererTests(SimpleTestCase):
+    def assertRendersLikeDRF(self, data):
+        fast = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        return json.loads(fast)
+
+    def test_decimal_uuid_and_lazy_strings(self):
+        value = uuid.UUID('12345678-1234-5678-1234-567812345678')
+        rendered = self.assertRendersLikeDRF({
+            'amount': Decimal('12.50'), 'id': value, 'label': gettext_lazy('Done'), 'nested': [{'n': Decimal('1')}],
+        })
+        self.assertEqual(rendered, {
+            'amount': 12.5, 'id': str(value), 'label': 'Done', 'nested': [{'n': 1.0}],
+        })
+
+    def test_dates_and_whole_second_datetimes(self):
+        rendered = self.assertRendersLikeDRF({
+            'date': date(2026, 3, 10),
+            'utc': datetime(2026, 3, 10, 8, 30, tzinfo=dt_timezone.utc),
+            'naive': datetime(2026, 3, 10, 8, 30),
+        })
+        self.assertEqual(rendered['utc'], '2026-03-10T08:30:00Z')
+
+    def test_datetimes_keep_microseconds_like_drf_fields(self):
+        # DRF's encoder truncates to milliseconds, but its DateTimeField, which
+        # native_datetimes serializers stand in for, keeps microseconds
+        value = datetime(2026, 3, 10, 8, 30, 0, 123456, tzinfo=dt_timezone.utc)
+        rendered = json.loads(FastJSONRenderer().render({'at': value}))
+        self.assertEqual(rendered['at'], serializers.DateTimeField().to_representation(value))
+
+    def test_none_renders_an_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), JSONRenderer().render(None))
+
+
+@skipIf(orjson is None, "orjson is not installed; the classes are DRF's own")
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), 'application/json', {})
+
+    def test_parses_like_drf(self):
+        body = json.dumps({'title': 'Café ☕', 'tags': [1, 2.5, None, True], 'nested': {'a': []}}).encode()
+        self.assertEqual(self.parse(FastJSONParser(), body), self.parse(JSONParser(), body))
+
+    def test_malformed_body_is_a_parse_error(self):
+        for body in [b'{"title": ', b'{"title": NaN}', b'\xff\xfe']:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as raised:
+                    self.parse(FastJSONParser(), body)
+                self.assertTrue(str(raised.exception.detail).startswith('JSON parse error - '))
+                with self.assertRaises(ParseError):
+                    self.parse(JSONParser(), body)
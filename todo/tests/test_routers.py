@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import override_settings
+from django.test.client import RequestFactory
+
+from todo.models import Profile, Todo
+from todo.routers import _sticky_key, choose_replica, reads_from_replica, replica_reads
+
+from .base import TodoAPITestCase
+
+User = get_user_model()
+
+REPLICA = 'replica1'
+
+
+# A second alias routed to by name only; nothing here opens a connection to it
+@mock.patch('todo.routers.replica_aliases', return_value=[REPLICA])
+@override_settings(TODO_READ_YOUR_WRITES_SECONDS=5)
+class ReplicaRouterTests(TodoAPITestCase):
+    def write(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    def test_reads_inside_replica_reads_go_to_the_replica(self, aliases):
+        self.assertEqual(Todo.objects.all().db, 'default')
+        with replica_reads(REPLICA):
+            self.assertEqual(Todo.objects.all().db, REPLICA)
+            self.assertEqual(Profile.objects.all().db, REPLICA)
+            self.assertEqual(router.db_for_write(Todo), 'default')
+        with replica_reads(None):
+            self.assertEqual(Todo.objects.all().db, 'default')
+
+    def test_migrations_only_run_on_the_primary(self, aliases):
+        self.assertTrue(router.allow_migrate('default', 'todo', model_name='todo'))
+        self.assertFalse(router.allow_migrate(REPLICA, 'todo', model_name='todo'))
+
+    def test_function_views_read_from_the_chosen_replica(self, aliases):
+        seen = []
+
+        @reads_from_replica
+        def view(request):
+            seen.append(Todo.objects.all().db)
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        view(request)
+        request.method = 'POST'
+        view(request)
+        self.assertEqual(seen, [REPLICA, 'default'])
+
+    def test_writes_keep_the_user_on_the_primary(self, aliases):
+        self.assertEqual(choose_replica(self.user.pk), REPLICA)
+        self.write(lambda: Todo.objects.create(user=self.user, title='Pay rent'))
+        self.assertIsNone(choose_replica(self.user.pk))
+
+        cache.delete(_sticky_key(self.user.pk))
+        self.write(lambda: self.user.profile.save())
+        self.assertIsNone(choose_replica(self.user.pk))
+
+    def test_stickiness_lasts_the_read_your_writes_window(self, aliases):
+        with mock.patch('todo.routers.cache.set') as cache_set:
+            self.write(lambda: Todo.objects.create(user=self.user, title='Pay rent'))
+        cache_set.assert_any_call(_sticky_key(self.user.pk), True, 5)
+
+    def test_other_users_and_logins_are_unaffected(self, aliases):
+        bob = User.objects.create_user('bob', 'bob@example.com', 'S3cure-pass')
+        cache.clear()
+        self.write(lambda: Todo.objects.create(user=self.user, title='Pay rent'))
+        self.assertEqual(choose_replica(bob.pk), REPLICA)
+        self.write(lambda: bob.save(update_fields=['last_login']))
+        self.assertEqual(choose_replica(bob.pk), REPLICA)
+
+
+class NoReplicaTests(TodoAPITestCase):
+    def test_everything_stays_on_the_primary(self):
+        self.assertIsNone(choose_replica(self.user.pk))
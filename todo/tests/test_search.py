@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from todo.models import Todo
+from todo.search import FTS_TABLE, fts_available, fts_query
+
+from .base import TodoAPITestCase
+
+
+class FtsQueryTests(TodoAPITestCase):
+    def test_web_search_syntax(self):
+        self.assertEqual(fts_query('milk or bread'), '("milk"* OR "bread"*)')
+        self.assertEqual(fts_query('buy milk -oat'), '("buy"* "milk"*) NOT "oat"*')
+        self.assertEqual(fts_query('"oat milk"'), '("oat milk")')
+
+    def test_dangling_operators_are_dropped(self):
+        self.assertEqual(fts_query('milk OR'), '("milk"*)')
+        self.assertEqual(fts_query('OR milk'), '("milk"*)')
+        self.assertEqual(fts_query('-milk'), '')
+
+    def test_fts_syntax_is_matched_literally(self):
+        self.assertEqual(fts_query('NEAR(a b) title:x'), '("NEAR"* "a"* "b"* "title"* "x"*)')
+
+
+class FtsSearchTests(TodoAPITestCase):
+    def setUp(self):
+        super().setUp()
+        if not fts_available():
+            self.skipTest('SQLite built without FTS5')
+        self.milk = Todo.objects.create(user=self.user, title='Buy milk')
+        self.bread = Todo.objects.create(user=self.user, title='Bake bread', description='with oat flour')
+
+    def search(self, text):
+        response = self.client.get(reverse('task-list'), {'q': text})
+        self.assertEqual(response.status_code, 200)
+        return sorted(todo['title'] for todo in response.json()['data'])
+
+    def test_user_input_never_breaks_the_match(self):
+        self.assertEqual(self.search('milk OR'), ['Buy milk'])
+        self.assertEqual(self.search('milk or bread'), ['Bake bread', 'Buy milk'])
+        self.assertEqual(self.search('b -oat'), ['Buy milk'])
+        self.assertEqual(self.search('NEAR( "milk'), [])
+
+    def test_index_is_rewritten_only_when_text_changes(self):
+        todo = Todo.objects.get(pk=self.milk.pk)
+        todo.status = 'Done'
+        with CaptureQueriesContext(connection) as queries:
+            todo.save()
+        self.assertFalse([q for q in queries.captured_queries if FTS_TABLE in q['sql']])
+
+        todo.title = 'Buy cheese'
+        todo.save()
+        self.assertEqual(self.search('cheese'), ['Buy cheese'])
+        self.assertEqual(self.search('milk'), [])
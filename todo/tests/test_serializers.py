@@ -0,0 +1,70 @@
+import json
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from todo.models import Todo
+from todo.renderers import FastJSONRenderer
+from todo.serializers import TodoListSerializer, TodoSerializer
+
+from .base import User
+
+TODAY = date(2026, 3, 10)
+
+
+class TodoListSerializerParityTests(TestCase):
+    """The values() fast path must render exactly what TodoSerializer does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'S3cure-pass')
+        for title, status, due_date in [
+            ('No due date', 'Open', None),
+            ('Late', 'Open', date(2026, 3, 9)),
+            ('Late but done', 'Done', date(2026, 3, 1)),
+            ('Due today', 'In Progress', TODAY),
+            ('Upcoming', 'Open', date(2026, 4, 1)),
+        ]:
+            Todo.objects.create(
+                user=cls.user, title=title, status=status, due_date=due_date, priority='High',
+                category='Other', custom_category='Errands', description='Notes'
+            )
+        # Microseconds and a UTC midnight exercise the 'Z' suffix and fraction formatting
+        Todo.objects.filter(title='Late').update(
+            created_at=datetime(2026, 1, 1, 0, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            updated_at=datetime(2026, 1, 1, 23, 30, tzinfo=dt_timezone.utc),
+        )
+
+    def outputs(self, native_datetimes=False):
+        todos = Todo.objects.filter(user=self.user).order_by('pk')
+        rows = todos.with_overdue(TODAY).values(*TodoListSerializer.row_fields)
+        full = TodoSerializer(todos, many=True, context={'today': TODAY}).data
+        fast = TodoListSerializer(rows, many=True, context={'native_datetimes': native_datetimes}).data
+        return full, fast
+
+    def test_fields_and_overdue_match(self):
+        full, fast = self.outputs()
+        self.assertEqual(len(fast), 5)
+        for expected, row in zip(full, fast):
+            self.assertEqual(list(row), list(expected))
+            self.assertEqual(dict(row), dict(expected))
+        self.assertEqual([row['overdue'] for row in fast], [None, True, False, False, False])
+
+    def test_datetimes_match_in_another_time_zone(self):
+        with timezone.override('America/New_York'):
+            full, fast = self.outputs()
+        self.assertEqual([dict(row) for row in fast], [dict(row) for row in full])
+        self.assertEqual(fast[1]['created_at'], '2025-12-31T19:00:00.123456-05:00')
+
+    def test_native_datetimes_render_the_same_json(self):
+        full, fast = self.outputs(native_datetimes=True)
+        self.assertIsInstance(fast[1]['created_at'], datetime)
+        if not FastJSONRenderer.native_datetimes:
+            self.skipTest("orjson is not installed")
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(fast)),
+            json.loads(JSONRenderer().render(full)),
+        )
+        self.assertEqual(json.loads(FastJSONRenderer().render(fast))[1]['updated_at'], '2026-01-01T23:30:00Z')
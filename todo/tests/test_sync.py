@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from todo.models import Todo, TodoTombstone
+
+from .base import TodoAPITestCase
+
+User = get_user_model()
+
+
+class DeltaSyncTests(TodoAPITestCase):
+    def sync(self, since='0'):
+        response = self.client.get(reverse('task-list'), {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def add(self, title):
+        return Todo.objects.create(user=self.user, title=title)
+
+    @override_settings(TODO_SYNC_PAGE_SIZE=2, TODO_SYNC_SAFETY_MARGIN=0)
+    def test_pages_follow_the_watermark(self):
+        for title in ('a', 'b', 'c'):
+            self.add(title)
+
+        first = self.sync()
+        self.assertEqual([todo['title'] for todo in first['todos']], ['a', 'b'])
+        self.assertTrue(first['has_more'])
+        second = self.sync(first['watermark'])
+        self.assertEqual([todo['title'] for todo in second['todos']], ['c'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(self.sync(second['watermark'])['todos'], [])
+
+    @override_settings(TODO_SYNC_SAFETY_MARGIN=60)
+    def test_late_commit_behind_the_watermark_is_still_sent(self):
+        first = self.add('first')
+        watermark = self.sync()['watermark']
+        # Saved before 'first' but committed after the client synced
+        late = self.add('late')
+        Todo.objects.filter(pk=late.pk).update(updated_at=first.updated_at - timedelta(seconds=1))
+
+        titles = [todo['title'] for todo in self.sync(watermark)['todos']]
+        self.assertIn('late', titles)
+
+    @override_settings(TODO_SYNC_SAFETY_MARGIN=0)
+    def test_deletions_are_reported_however_they_happen(self):
+        watermark = self.sync()['watermark']
+        todos = [self.add(title) for title in ('api', 'bulk', 'queryset')]
+
+        self.client.delete(reverse('task-detail', args=[todos[0].pk]))
+        self.client.post(reverse('task-bulk'), {'delete': [todos[1].pk]}, format='json')
+        Todo.objects.filter(pk=todos[2].pk).delete()
+
+        data = self.sync(watermark)
+        self.assertEqual(data['deleted'], [todo.pk for todo in todos])
+        self.assertEqual(TodoTombstone.objects.filter(user=self.user).count(), 3)
+
+    def test_deleting_the_user_leaves_no_tombstones(self):
+        self.add('gone')
+        self.user.delete()
+        self.assertFalse(TodoTombstone.objects.exists())
+
+    def test_invalid_watermark_is_rejected(self):
+        response = self.client.get(reverse('task-list'), {'since': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from todo.middleware import AdmissionControlMiddleware
+from todo.throttling import BucketRateThrottle, LocalBuckets, next_full
+from todo.views import health_check
+
+from .base import TodoAPITestCase
+
+RATES = {'login': '3/min', 'register': '3/min', 'reads': '3/min', 'writes': '2/min'}
+
+
+class BucketTests(SimpleTestCase):
+    def test_bucket_allows_a_burst_then_refills(self):
+        full_at = None
+        for _ in range(3):
+            allowed, full_at, wait = next_full(full_at, 100.0, 3, 60)
+            self.assertTrue(allowed)
+        allowed, _, wait = next_full(full_at, 100.0, 3, 60)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 20.0)
+        self.assertTrue(next_full(full_at, 120.0, 3, 60)[0])
+
+    def test_local_buckets_are_separate_per_key(self):
+        buckets = LocalBuckets()
+        self.assertTrue(buckets.take('a', 1, 60)[0])
+        self.assertFalse(buckets.take('a', 1, 60)[0])
+        self.assertTrue(buckets.take('b', 1, 60)[0])
+
+
+@mock.patch.dict(BucketRateThrottle.THROTTLE_RATES, RATES)
+class ThrottleTests(TodoAPITestCase):
+    def login(self, client=None, **extra):
+        return (client or APIClient()).post(
+            reverse('token_obtain_pair'), {'username': 'alice', 'password': 'wrong'}, format='json', **extra
+        )
+
+    def test_login_is_limited_per_address(self):
+        statuses = [self.login().status_code for _ in range(4)]
+        self.assertEqual(statuses, [401, 401, 401, 429])
+        self.assertIn('Retry-After', self.login())
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_forged_forwarded_for_does_not_reset_the_limit(self):
+        statuses = [
+            self.login(HTTP_X_FORWARDED_FOR=f'10.0.0.{n}, 203.0.113.7').status_code for n in range(4)
+        ]
+        self.assertEqual(statuses[-1], 429)
+
+    def test_reads_and_writes_are_limited_per_user(self):
+        self.assertEqual([self.client.get(reverse('task-list')).status_code for _ in range(4)], [200, 200, 200, 429])
+        statuses = [
+            self.client.post(reverse('task-list'), {'title': 'x'}, format='json').status_code for _ in range(3)
+        ]
+        self.assertEqual(statuses, [201, 201, 429])
+
+    def test_health_check_is_not_limited(self):
+        request = APIRequestFactory().get('/health/')
+        self.assertEqual({health_check(request).status_code for _ in range(5)}, {200})
+
+    @override_settings(TODO_THROTTLE_ENABLED=False)
+    def test_throttling_can_be_disabled(self):
+        self.assertEqual({self.client.get(reverse('task-list')).status_code for _ in range(5)}, {200})
+
+
+class AdmissionControlTests(SimpleTestCase):
+    @override_settings(TODO_MAX_CONCURRENT_REQUESTS=1)
+    def test_requests_past_the_limit_are_shed(self):
+        request = RequestFactory().get('/')
+        nested = []
+
+        def get_response(request):
+            # A second request arriving while this one is in flight
+            nested.append(middleware(request))
+            return HttpResponse()
+
+        middleware = AdmissionControlMiddleware(get_response)
+        self.assertEqual(middleware(request).status_code, 200)
+        self.assertEqual(nested[0].status_code, 503)
+        self.assertEqual(nested[0]['Retry-After'], '1')
+
+        # The slot is released afterwards
+        middleware.get_response = lambda request: HttpResponse()
+        self.assertEqual(middleware(request).status_code, 200)
+
+    @override_settings(TODO_MAX_CONCURRENT_REQUESTS=0)
+    def test_zero_disables_the_limit(self):
+        self.assertIsNone(AdmissionControlMiddleware(lambda request: HttpResponse()).slots)
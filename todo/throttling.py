@@ -0,0 +1,159 @@
+"""
+Token-bucket request throttles for DRF.
+
+Each bucket is kept as a single number, the time at which it will be full
+again (the generic cell rate algorithm), so taking a token is one read and
+one write with no lock and no per-request history. Two concurrent requests
+can both read the same value, which lets a bucket overshoot by at most the
+number of requests in flight at that moment.
+
+Buckets live in this process unless TODO_THROTTLE_CACHE names a cache, such
+as a Redis-backed one, shared by every worker. Rates come from DRF's
+DEFAULT_THROTTLE_RATES for the login, register, reads and writes scopes.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def next_full(full_at, now, limit, period):
+    """
+    Take a token from a bucket of limit tokens refilled over period seconds
+    that is full again at full_at. Returns (allowed, new full_at, seconds
+    until a token is available).
+    """
+    interval = period / limit
+    full_at = max(full_at or now, now) + interval
+    if full_at - now > period:
+        return False, None, full_at - period - now
+    return True, full_at, 0
+
+
+class LocalBuckets:
+    """Buckets in a dict shared by the threads of this process"""
+    max_keys = 100_000
+
+    def __init__(self):
+        self.buckets = {}
+
+    def take(self, key, limit, period):
+        now = time.monotonic()
+        allowed, full_at, wait = next_full(self.buckets.get(key), now, limit, period)
+        if allowed:
+            if len(self.buckets) >= self.max_keys:
+                self.prune(now)
+            self.buckets[key] = full_at
+        return allowed, wait
+
+    async def atake(self, key, limit, period):
+        return self.take(key, limit, period)
+
+    def prune(self, now):
+        # Full buckets carry no state
+        for key, full_at in list(self.buckets.items()):
+            if full_at <= now:
+                self.buckets.pop(key, None)
+
+
+class CacheBuckets:
+    """Buckets in a Django cache, shared by every worker that uses it"""
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, limit, period):
+        now = time.time()
+        allowed, full_at, wait = next_full(self.cache.get(key), now, limit, period)
+        if allowed:
+            self.cache.set(key, full_at, math.ceil(full_at - now))
+        return allowed, wait
+
+    async def atake(self, key, limit, period):
+        now = time.time()
+        allowed, full_at, wait = next_full(await self.cache.aget(key), now, limit, period)
+        if allowed:
+            await self.cache.aset(key, full_at, math.ceil(full_at - now))
+        return allowed, wait
+
+
+_local_buckets = LocalBuckets()
+
+
+def get_buckets():
+    if settings.TODO_THROTTLE_CACHE:
+        return CacheBuckets(settings.TODO_THROTTLE_CACHE)
+    return _local_buckets
+
+
+class BucketRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle that spends tokens from a bucket instead of keeping a request history"""
+    cache_format = 'todo:throttle:%(scope)s:%(ident)s'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if not settings.TODO_THROTTLE_ENABLED or self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self.wait_seconds = get_buckets().take(key, self.num_requests, self.duration)
+        return allowed
+
+    async def aallow_request(self, request, view):
+        """Async allow_request, for views outside DRF's request cycle"""
+        self.wait_seconds = None
+        if not settings.TODO_THROTTLE_ENABLED or self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self.wait_seconds = await get_buckets().atake(key, self.num_requests, self.duration)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginRateThrottle(BucketRateThrottle):
+    """Token requests per client address; each one costs a password hash"""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class RegisterRateThrottle(LoginRateThrottle):
+    """Registrations per client address"""
+    scope = 'register'
+
+
+class ReadWriteRateThrottle(BucketRateThrottle):
+    """Per-user limits, under the reads scope for safe methods and the writes scope otherwise"""
+
+    def __init__(self):
+        # The scope, and so the rate, depends on the request
+        pass
+
+    def allow_request(self, request, view):
+        self.set_scope(request)
+        return super().allow_request(request, view)
+
+    async def aallow_request(self, request, view):
+        self.set_scope(request)
+        return await super().aallow_request(request, view)
+
+    def set_scope(self, request):
+        self.scope = 'reads' if request.method in SAFE_METHODS else 'writes'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
@@ -1,27 +1,72 @@
+import asyncio
+import io
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 from django.contrib.auth import get_user_model
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import generics, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework.exceptions import PermissionDenied
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied, ValidationError
+from django.db import router, transaction
 from django.utils import timezone
-from .models import Profile, Todo
+from .models import (
+    Agenda,
+    AgendaEntry,
+    Job,
+    JobInput,
+    Profile,
+    TaskCounter,
+    Todo,
+    TodoSeries,
+    TodoSeriesException,
+    counters_enabled,
+    local_today,
+    summarize_todos
+)
 from .serializers import (
     ProfileSerializer,
     UserSerializer,
     MyTokenObtainPairSerializer,
+    MyTokenRefreshSerializer,
     RegisterSerializer,
-    TodoSerializer
+    TodoSerializer,
+    TodoListSerializer,
+    TodoRangeQuerySerializer,
+    TodoBulkSerializer,
+    TodoSeriesSerializer,
+    TodoSeriesExceptionSerializer,
+    JobSerializer
 )
+from . import metrics
+from .authentication import CookieJWTAuthentication
+from .caching import build_response, cache_on_render, cached_response, get_cached_response, response_cache_key
+from .events import get_broker
+from .jobs import enqueue
+from .imports import IMPORT_INPUTS, detect_input, import_todos, read_records
+from .exports import EXPORT_OUTPUTS, aiter_export, export_queryset, get_exporter, iter_export
+from .conditional import day_boundary, make_etag, not_modified, set_validators, todo_list_state
+from .pagination import TodoCursorPagination
+from .recurrence import is_occurrence, occurrences
+from .routers import reads_from_replica
+from .search import search_todos
+from .signals import bulk_todo_changes, todos_bulk_changed
+from .sync import changes_since
+from .throttling import LoginRateThrottle, RegisterRateThrottle
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
 User = get_user_model()
 
 @api_view(['GET'])
+@throttle_classes([])
 def health_check(request):
     """Endpoint for service health verification"""
     return Response(
@@ -29,6 +74,18 @@ def health_check(request):
         status=status.HTTP_200_OK
     )
 
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Per-view latency, query, serializer and render histograms for this worker process"""
+    if request.method == 'DELETE':
+        metrics.registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(
+        {"status": "success", "data": metrics.registry.snapshot()},
+        status=status.HTTP_200_OK
+    )
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def create_admin(request):
@@ -62,6 +119,11 @@ def create_admin(request):
 class MyTokenObtainPairView(TokenObtainPairView):
     """Custom JWT token obtain view with extended user data"""
     serializer_class = MyTokenObtainPairSerializer
+    throttle_classes = [LoginRateThrottle]
+
+class MyTokenRefreshView(TokenRefreshView):
+    """JWT refresh view that rotates and blacklists tokens in fewer queries"""
+    serializer_class = MyTokenRefreshSerializer
 
 @api_view(['GET'])
 @ensure_csrf_cookie
@@ -78,14 +140,14 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = RegisterSerializer
+    throttle_classes = (RegisterRateThrottle,)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
+            # Creates the user and, through the post_save receiver, its profile in one transaction
             user = serializer.save()
-            # Safely create a profile only if one doesn't exist
-            Profile.objects.get_or_create(user=user)
             return Response({
                 "status": "success",
                 "message": "User registered successfully",
@@ -101,22 +163,288 @@ class RegisterView(generics.CreateAPIView):
             return Response({
                 "status": "error",
                 "message": str(e),
-                "errors": serializer.errors if hasattr(serializer, 'errors') else None
+                "errors": e.detail if isinstance(e, ValidationError) else serializer.errors
             }, status=status.HTTP_400_BAD_REQUEST)
 
 class TodoViewSet(viewsets.ModelViewSet):
     """CRUD endpoints for Todo items"""
     serializer_class = TodoSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TodoCursorPagination
 
     def get_queryset(self):
         """Return only the current user's todos"""
         return Todo.objects.filter(user=self.request.user).order_by('-due_date')
 
+    def get_serializer_context(self):
+        # overdue flags follow the user's day, as the agenda and summary do
+        return {**super().get_serializer_context(), 'today': local_today(self.request.user)}
+
+    @method_decorator(reads_from_replica)
+    def list(self, request, *args, **kwargs):
+        """Paginated todo list, or a search (q), delta sync (since) or calendar range (start/end)"""
+        # Overdue flags change at the user's midnight even when no todo does
+        boundary = day_boundary()
+        key = response_cache_key(request, parts=(boundary,))
+        cached = get_cached_response(key)
+        if cached is not None:
+            return not_modified(request, cached.etag) or set_validators(build_response(cached), cached.etag)
+
+        state = todo_list_state(request.user)
+        # No Last-Modified: deleting a todo other than the newest leaves max(updated_at) as it was
+        etag = make_etag(
+            request.user.pk, state['count'], state['last_modified'],
+            boundary, request.get_full_path(), request.accepted_media_type
+        )
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        if 'q' in request.query_params:
+            response = self.list_search(request)
+        elif 'since' in request.query_params:
+            response = self.list_changes(request)
+        elif 'start' in request.query_params or 'end' in request.query_params:
+            response = self.list_range(request)
+        else:
+            response = self.list_rows(request)
+        cache_on_render(response, key, etag)
+        return set_validators(response, etag)
+
+    @method_decorator(reads_from_replica)
+    def retrieve(self, request, *args, **kwargs):
+        """Single todo, answered with 304 when the client's copy is current"""
+        instance = self.get_object()
+        # overdue can change at a day boundary without the row changing
+        boundary = day_boundary()
+        last_modified = max(instance.updated_at, boundary)
+        etag = make_etag(instance.pk, instance.updated_at, boundary, request.accepted_media_type)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return cached
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+    def list_rows(self, request):
+        """Cursor-paginated list built from values() rows with overdue computed in SQL"""
+        rows = (
+            self.get_queryset()
+            .with_overdue(local_today(request.user))
+            .values(*TodoListSerializer.row_fields)
+        )
+        page = self.paginate_queryset(rows)
+        context = {'native_datetimes': getattr(request.accepted_renderer, 'native_datetimes', False)}
+        return self.get_paginated_response(TodoListSerializer(page, many=True, context=context).data)
+
+    def list_search(self, request):
+        """Todos matching q in title or description, best match first"""
+        text = request.query_params['q'].strip()
+        if not text:
+            return Response(
+                {"status": "error", "message": "Search query must not be empty"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        todos = search_todos(text, settings.TODO_SEARCH_MAX_RESULTS, user=request.user)
+        return Response(
+            {"status": "success", "data": self.get_serializer(todos, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+    def list_changes(self, request):
+        """Todos changed and deleted since a watermark; pass since=0 for the first sync"""
+        todos, deleted, watermark, has_more = changes_since(
+            request.user, request.query_params['since'], settings.TODO_SYNC_PAGE_SIZE
+        )
+        return Response({
+            "status": "success",
+            "data": {
+                "todos": self.get_serializer(todos, many=True).data,
+                "deleted": deleted,
+                "watermark": watermark,
+                "has_more": has_more
+            }
+        }, status=status.HTTP_200_OK)
+
+    def list_range(self, request):
+        """Compact todos between start and end (inclusive), grouped by due date"""
+        query = TodoRangeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = dict(query.validated_data)
+        start, end = params.pop('start'), params.pop('end')
+
+        # Served by the (user, due_date, id) index in due_date order
+        rows = (
+            self.get_queryset()
+            .filter(due_date__range=(start, end), **params)
+            .order_by('due_date', 'id')
+            .values('id', 'title', 'status', 'priority', 'category', 'custom_category', 'due_date')
+        )
+        days = {}
+        for row in rows:
+            days.setdefault(row.pop('due_date').isoformat(), []).append(row)
+        return Response(
+            {"status": "success", "data": {"start": start, "end": end, "days": days}},
+            status=status.HTTP_200_OK
+        )
+
     def perform_create(self, serializer):
         """Automatically set the current user as todo owner"""
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create, update and delete many todos in a single transaction"""
+        envelope = TodoBulkSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        operations = envelope.validated_data
+
+        creates = TodoSerializer(data=operations['create'], many=True)
+        updates = TodoSerializer(
+            data=[{k: v for k, v in item.items() if k != 'id'} for item in operations['update']],
+            many=True,
+            partial=True
+        )
+        errors = {}
+        if not creates.is_valid():
+            errors['create'] = creates.errors
+        if not updates.is_valid():
+            errors['update'] = updates.errors
+        if errors:
+            return Response(
+                {"status": "error", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user
+        update_ids = [item['id'] for item in operations['update']]
+        with transaction.atomic(), bulk_todo_changes():
+            targets = self.get_queryset().select_for_update().in_bulk(update_ids)
+            missing = [pk for pk in update_ids if pk not in targets]
+            if missing:
+                return Response(
+                    {"status": "error", "errors": {"update": f"Todos not found: {missing}"}},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            created = Todo.objects.bulk_create(
+                [Todo(user=user, **data) for data in creates.validated_data],
+                batch_size=500
+            )
+
+            added = [todo.status for todo in created]
+            removed = []
+            updated = []
+            fields = {'updated_at'}
+            now = timezone.now()
+            for pk, data in zip(update_ids, updates.validated_data):
+                todo = targets[pk]
+                removed.append(todo.status)
+                for field, value in data.items():
+                    setattr(todo, field, value)
+                    fields.add(field)
+                todo.updated_at = now
+                added.append(todo.status)
+                updated.append(todo)
+            if updated:
+                Todo.objects.bulk_update(updated, sorted(fields), batch_size=500)
+
+            deleting = dict(
+                self.get_queryset().filter(id__in=operations['delete']).values_list('id', 'status')
+            )
+            delete_ids = list(deleting)
+            if delete_ids:
+                Todo.objects.filter(id__in=delete_ids).delete()
+                removed.extend(deleting.values())
+
+            todos_bulk_changed.send(
+                sender=Todo,
+                user=user,
+                created=[todo.id for todo in created],
+                updated=update_ids,
+                deleted=delete_ids,
+                counter_deltas=TaskCounter.status_deltas(added=added, removed=removed)
+            )
+
+        return Response({
+            "status": "success",
+            "data": {
+                "created": [{"index": index, "id": todo.id} for index, todo in enumerate(created)],
+                "updated": update_ids,
+                "deleted": delete_ids,
+                "not_found": sorted(set(operations['delete']) - set(delete_ids))
+            }
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream all of the user's todos as NDJSON, CSV or iCalendar (?output=ndjson|csv|ics)"""
+        output = request.query_params.get('output', 'ndjson')
+        exporter = get_exporter(output, request)
+        if exporter is None:
+            return Response(
+                {"status": "error", "message": f"Unknown output; choose from {', '.join(EXPORT_OUTPUTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = export_queryset(request.user)
+        chunk_size = settings.TODO_EXPORT_CHUNK_SIZE
+        # Under ASGI a synchronous iterator would be buffered whole before sending
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_export(exporter, rows, chunk_size)
+        else:
+            content = iter_export(exporter, rows, chunk_size)
+        response = StreamingHttpResponse(content, content_type=exporter.content_type)
+        response['Content-Disposition'] = f'attachment; filename="todos.{exporter.extension}"'
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Import todos from an uploaded CSV or iCalendar file; already imported rows are skipped.
+
+        Files over TODO_IMPORT_INLINE_MAX_BYTES, or any file with ?background=true,
+        are imported by a background job and answered with 202 and its status URL.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {"status": "error", "message": "Upload a CSV or iCalendar file as 'file'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if upload.size > settings.TODO_IMPORT_MAX_BYTES:
+            return Response(
+                {"status": "error", "message": f"Files are limited to {settings.TODO_IMPORT_MAX_BYTES} bytes"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        input_format = request.query_params.get('input') or detect_input(upload.name, upload.content_type or '')
+        if input_format not in IMPORT_INPUTS:
+            return Response(
+                {"status": "error", "message": f"Unknown input; choose from {', '.join(IMPORT_INPUTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if upload.size > settings.TODO_IMPORT_INLINE_MAX_BYTES or request.query_params.get('background') == 'true':
+            # Stored in the database, which the worker can reach from any host, a part at a time
+            with transaction.atomic():
+                job = enqueue('todos.import_file', user=request.user, user_id=request.user.pk, input_format=input_format)
+                JobInput.save_file(job, upload)
+            return Response({
+                "status": "success",
+                "data": {"job": JobSerializer(job).data, "url": request.build_absolute_uri(f'/api/jobs/{job.pk}/')}
+            }, status=status.HTTP_202_ACCEPTED)
+
+        # Large uploads are spooled to disk by Django and read back a line at a time
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace', newline='')
+        report = import_todos(
+            request.user, read_records(stream, input_format), batch_size=settings.TODO_IMPORT_BATCH_SIZE
+        )
+        return Response({"status": "success", "data": report}, status=status.HTTP_200_OK)
+
+    def perform_content_negotiation(self, request, force=False):
+        # Exports set their own content type; DRF only renders their errors, as JSON
+        return super().perform_content_negotiation(request, force=force or self.action == 'export')
+
     def get_object(self):
         """Ensure users can only access their own tasks."""
         obj = super().get_object()
@@ -124,8 +452,64 @@ class TodoViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("You do not have permission to view this task.")
         return obj
 
+class TodoSeriesViewSet(viewsets.ModelViewSet):
+    """CRUD endpoints for recurring todo series and their per-occurrence exceptions"""
+    serializer_class = TodoSeriesSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Return only the current user's series"""
+        return TodoSeries.objects.filter(user=self.request.user).order_by('start_date', 'id')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False)
+    def occurrences(self, request):
+        """Occurrences of every series between start and end, with exceptions applied"""
+        query = TodoRangeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = dict(query.validated_data)
+        start, end = params.pop('start'), params.pop('end')
+        items = [
+            item for item in occurrences(request.user, start, end)
+            if all(item[field] == value for field, value in params.items())
+        ]
+        return Response({"status": "success", "data": items}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post', 'delete'])
+    def exceptions(self, request, pk=None):
+        """Override, complete or cancel one occurrence (POST), or restore it (DELETE ?date=)"""
+        series = self.get_object()
+        if request.method == 'DELETE':
+            serializer = TodoSeriesExceptionSerializer(
+                data={'occurrence_date': request.query_params.get('date')}, partial=True
+            )
+            serializer.is_valid(raise_exception=True)
+            series.exceptions.filter(occurrence_date=serializer.validated_data['occurrence_date']).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = TodoSeriesExceptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        occurrence_date = data.pop('occurrence_date')
+        if not is_occurrence(series, occurrence_date):
+            return Response(
+                {"status": "error", "message": f"{occurrence_date} is not an occurrence of this series"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        exception, _ = TodoSeriesException.objects.update_or_create(
+            series=series, occurrence_date=occurrence_date, defaults=data
+        )
+        return Response(
+            {"status": "success", "data": TodoSeriesExceptionSerializer(exception).data},
+            status=status.HTTP_200_OK
+        )
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response()
+@reads_from_replica
 def get_user_profile(request):
     """Get profile data for authenticated user"""
     try:
@@ -147,6 +531,7 @@ def get_user_profile(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_response(per_user=False)
 def getRoutes(request):
     """API endpoint documentation"""
     routes = [
@@ -180,6 +565,12 @@ def getRoutes(request):
             'description': 'Retrieve/update/delete todo',
             'authentication': True
         },
+        {
+            'endpoint': '/api/todos/agenda/',
+            'methods': 'GET',
+            'description': 'Overdue, due today and upcoming todos',
+            'authentication': True
+        },
         {
             'endpoint': '/api/profile/',
             'methods': 'GET',
@@ -200,23 +591,54 @@ def getRoutes(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@reads_from_replica
 def task_summary(request):
     """Get summary statistics for user's todos"""
-    tasks = Todo.objects.filter(user=request.user)
-    summary = {
-        'total': tasks.count(),
-        'open': tasks.filter(status='Open').count(),
-        'in_progress': tasks.filter(status='In Progress').count(),
-        'done': tasks.filter(status='Done').count(),
-        'overdue': tasks.filter(due_date__lt=timezone.now(), status__in=['Open', 'In Progress']).count()
-    }
-    return Response(
+    state = todo_list_state(request.user)
+    # Overdue counts change at the user's midnight even when no todo does
+    etag = make_etag(
+        request.user.pk, state['count'], state['last_modified'],
+        day_boundary(), request.accepted_media_type
+    )
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    if counters_enabled():
+        summary = TaskCounter.summary_for(request.user)
+    else:
+        summary = summarize_todos(request.user)
+    return set_validators(Response(
         {"status": "success", "data": summary},
         status=status.HTTP_200_OK
-    )
+    ), etag)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@reads_from_replica
+def todo_agenda(request):
+    """Overdue, today's and upcoming open todos, read from the user's materialized agenda"""
+    agenda, rebuilt = Agenda.current(request.user)
+    todos = AgendaEntry.todos_for(request.user)
+    if rebuilt:
+        # Read the new entries where they were written; a replica may not have them yet
+        todos = todos.using(router.db_for_write(AgendaEntry))
+    buckets = {bucket: [] for bucket, _ in AgendaEntry.BUCKET_CHOICES}
+    rows = todos.values('bucket', *TodoListSerializer.row_fields)
+    for row in rows:
+        buckets[row.pop('bucket')].append(row)
+    return Response({
+        "status": "success",
+        "data": {
+            "date": agenda.day.isoformat(),
+            "timezone": agenda.timezone or settings.TIME_ZONE,
+            **{bucket: TodoListSerializer(rows, many=True).data for bucket, rows in buckets.items()},
+        }
+    }, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response()
+@reads_from_replica
 def get_authenticated_user(request):
     """Return authenticated user data"""
     user = request.user
@@ -225,3 +647,48 @@ def get_authenticated_user(request):
         {"status": "success", "data": serializer.data},
         status=status.HTTP_200_OK
     )
+
+async def todo_events(request):
+    """Server-sent event stream of changes to the authenticated user's todos"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"status": "error", "message": "The change feed is only served by the ASGI application"},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    try:
+        auth = await CookieJWTAuthentication().aauthenticate(request)
+    except AuthenticationFailed:
+        auth = None
+    if auth is None:
+        return JsonResponse(
+            {"status": "error", "message": "Authentication credentials were not provided or are invalid"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    subscription = get_broker().subscribe(auth[0].pk)
+
+    async def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.TODO_EVENT_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status(request, pk):
+    """Status, progress and result of one of the user's background jobs"""
+    job = get_object_or_404(Job, pk=pk, user=request.user)
+    return Response({"status": "success", "data": JobSerializer(job).data}, status=status.HTTP_200_OK)